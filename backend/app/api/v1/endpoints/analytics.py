@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Tuple
+from app.db.database import get_db
+from app.middleware.auth_middleware import auth_middleware
+from app.models.user import UserRole
+from app.schemas.analytics import AppUsageListResponse
+from app.services.app_usage_service import AppUsageService
+from app.services.hour_limit_service import as_utc
+from app.utils.utils import current_time
+from datetime import datetime, timedelta
+
+router = APIRouter()
+
+# Range used when a request gives no start date
+DEFAULT_RANGE = timedelta(days=7)
+
+
+def _date_range(
+    start_date: Optional[datetime], end_date: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    end = as_utc(end_date) if end_date else current_time()
+    start = as_utc(start_date) if start_date else end - DEFAULT_RANGE
+    if start >= end:
+        raise HTTPException(
+            status_code=400, detail="start_date must be before end_date"
+        )
+    return start, end
+
+
+@router.get("/apps/organization/{organization_id}", response_model=AppUsageListResponse)
+async def get_organization_top_apps(
+    organization_id: str,
+    start_date: Optional[datetime] = Query(
+        None, description="From this hour (default: 7 days before end_date)"
+    ),
+    end_date: Optional[datetime] = Query(None, description="Until this time"),
+    employee_id: Optional[str] = Query(None, description="Filter by employee"),
+    limit: int = Query(10, ge=1, le=100, description="Number of apps"),
+    current_user=Depends(auth_middleware),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Top apps in an organization by screenshots taken, from the hourly rollup.
+    Only admin users can view app usage.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=403, detail="Only admin users can view app usage"
+        )
+
+    start, end = _date_range(start_date, end_date)
+    try:
+        apps, total = await AppUsageService.top_apps(
+            db=db,
+            start=start,
+            end=end,
+            organization_id=organization_id,
+            employee_id=employee_id,
+            limit=limit,
+        )
+        return AppUsageListResponse(
+            apps=apps, total_screenshots=total, start_date=start, end_date=end
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/apps/project/{project_id}", response_model=AppUsageListResponse)
+async def get_project_top_apps(
+    project_id: str,
+    start_date: Optional[datetime] = Query(
+        None, description="From this hour (default: 7 days before end_date)"
+    ),
+    end_date: Optional[datetime] = Query(None, description="Until this time"),
+    employee_id: Optional[str] = Query(None, description="Filter by employee"),
+    limit: int = Query(10, ge=1, le=100, description="Number of apps"),
+    current_user=Depends(auth_middleware),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Top apps in a project by screenshots taken, from the hourly rollup.
+    Only admin users can view app usage.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=403, detail="Only admin users can view app usage"
+        )
+
+    start, end = _date_range(start_date, end_date)
+    try:
+        apps, total = await AppUsageService.top_apps(
+            db=db,
+            start=start,
+            end=end,
+            project_id=project_id,
+            employee_id=employee_id,
+            limit=limit,
+        )
+        return AppUsageListResponse(
+            apps=apps, total_screenshots=total, start_date=start, end_date=end
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,7 @@
 from datetime import timedelta
 from typing import List
 from fastapi import APIRouter, HTTPException, Depends
+from jose import JWTError
 from pydantic import BaseModel
 from sqlalchemy import select
 from app.core.mail import MailService
@@ -8,6 +9,7 @@ from app.core.security import Security
 from app.db.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.middleware.auth_middleware import auth_middleware
+from app.middleware.rate_limit import auth_rate_limit, otp_rate_limit
 from app.models.employee import Employee
 from app.schemas.employee import EmployeeResponse
 from app.schemas.organization import OrganizationResponse
@@ -72,7 +74,7 @@ class SignupRequest(BaseModel):
     role: UserRole = UserRole.USER
 
 
-@router.post("/signup")
+@router.post("/signup", dependencies=[Depends(auth_rate_limit)])
 async def signup(request: SignupRequest, db: AsyncSession = Depends(get_db)):
     try:
         if not validate_password(request.password):
@@ -83,7 +85,7 @@ async def signup(request: SignupRequest, db: AsyncSession = Depends(get_db)):
         existing_user = existing_user.scalar_one_or_none()
         if existing_user:
             raise HTTPException(status_code=400, detail="User already exists")
-        hashed_password = Security.get_password_hash(request.password)
+        hashed_password = await Security.hash_password(request.password)
         otp = generate_otp(6)
         user_dict = request.model_dump()
         user_dict.pop("password", None)
@@ -109,9 +111,10 @@ class SendOtpRequest(BaseModel):
     email: EmailStr
 
 
-@router.post("/send-otp")
+@router.post("/send-otp", dependencies=[Depends(otp_rate_limit)])
 async def send_otp(request: SendOtpRequest, db: AsyncSession = Depends(get_db)):
     try:
+        await otp_rate_limit.check("email", request.email.lower())
         # First check if it's a user
         user = await UserService.get_by_email(db, request.email.lower())
         if user:
@@ -161,11 +164,12 @@ class ResetPasswordRequest(BaseModel):
     password: str
 
 
-@router.post("/reset-password")
+@router.post("/reset-password", dependencies=[Depends(auth_rate_limit)])
 async def reset_password(
     request: ResetPasswordRequest, db: AsyncSession = Depends(get_db)
 ):
     try:
+        await auth_rate_limit.check("email", request.email.lower())
         # First check if it's a user
         user = await UserService.get_by_email(db, request.email.lower())
         if user:
@@ -173,7 +177,8 @@ async def reset_password(
                 raise HTTPException(status_code=400, detail="Invalid OTP")
             if user.otp_expiry < datetime.now():
                 raise HTTPException(status_code=400, detail="OTP expired")
-            user.hashed_password = Security.get_password_hash(request.password)
+            user.hashed_password = await Security.hash_password(request.password)
+            Security.revoke_tokens(user)
             user.otp = None
             user.otp_expiry = None
             await db.commit()
@@ -193,7 +198,8 @@ async def reset_password(
                 raise HTTPException(status_code=400, detail="Invalid OTP")
             if employee.otp_expiry < datetime.now():
                 raise HTTPException(status_code=400, detail="OTP expired")
-            employee.hashed_password = Security.get_password_hash(request.password)
+            employee.hashed_password = await Security.hash_password(request.password)
+            Security.revoke_tokens(employee)
             employee.otp = None
             employee.otp_expiry = None
             await db.commit()
@@ -214,9 +220,10 @@ class LoginRequest(BaseModel):
     password: str
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(auth_rate_limit)])
 async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
     try:
+        await auth_rate_limit.check("email", request.email.lower())
         # First check if it's a user
         user_query = await db.execute(
             select(User).where(User.email == request.email.lower())
@@ -231,13 +238,18 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
                 )
             if not user.email_verified:
                 raise HTTPException(status_code=400, detail="Email not verified")
-            password_match = Security.verify_password(
+            password_match = await Security.check_password(
                 request.password, user.hashed_password
             )
             if not password_match:
                 raise HTTPException(status_code=400, detail="Invalid password")
 
-            access_token = Security.create_access_token(user)
+            organization_ids = await OrganizationService.get_user_organization_ids(
+                db, user.id
+            )
+            access_token = Security.create_access_token(
+                user, organization_ids=organization_ids
+            )
             refresh_token = Security.create_refresh_token(user)
             user_response = UserResponse(**user.__dict__)
             organizations, total = await OrganizationService.get_user_organizations(
@@ -269,7 +281,7 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
                 )
             # if not employee.email_verified:
             #     raise HTTPException(status_code=400, detail="Email not verified")
-            password_match = Security.verify_password(
+            password_match = await Security.check_password(
                 request.password, employee.hashed_password
             )
             if not password_match:
@@ -299,9 +311,10 @@ class VerifyEmailRequest(BaseModel):
     otp: str
 
 
-@router.post("/verify-email")
+@router.post("/verify-email", dependencies=[Depends(auth_rate_limit)])
 async def verify_email(request: VerifyEmailRequest, db: AsyncSession = Depends(get_db)):
     try:
+        await auth_rate_limit.check("email", request.email.lower())
         # First check if it's a user
         user = await db.execute(select(User).where(User.email == request.email.lower()))
         user = user.scalar_one_or_none()
@@ -320,7 +333,12 @@ async def verify_email(request: VerifyEmailRequest, db: AsyncSession = Depends(g
             user.otp_expiry = None
             await db.commit()
             await db.refresh(user)
-            access_token = Security.create_access_token(user)
+            organization_ids = await OrganizationService.get_user_organization_ids(
+                db, user.id
+            )
+            access_token = Security.create_access_token(
+                user, organization_ids=organization_ids
+            )
             refresh_token = Security.create_refresh_token(user)
             user_response = UserResponse(**user.__dict__)
             return {
@@ -378,6 +396,51 @@ class LoginGoogleRequest(BaseModel):
 #     pass
 
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+
+@router.post("/refresh", dependencies=[Depends(auth_rate_limit)])
+async def refresh(request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for new tokens with up-to-date claims"""
+    try:
+        try:
+            payload = Security.verify_token(request.refresh_token)
+        except JWTError as e:
+            raise HTTPException(status_code=401, detail=str(e))
+        if "user_id" not in payload:
+            raise HTTPException(status_code=401, detail="Not a refresh token")
+
+        account_type = payload.get("account_type", "user")
+        model = Employee if account_type == "employee" else User
+        account = await db.execute(select(model).where(model.id == payload["user_id"]))
+        account = account.scalar_one_or_none()
+
+        if not account or not account.is_active:
+            raise HTTPException(status_code=401, detail="Account is not active")
+        if payload.get("ver", 0) != account.token_version:
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+
+        organization_ids = None
+        if account_type != "employee":
+            organization_ids = await OrganizationService.get_user_organization_ids(
+                db, account.id
+            )
+
+        return {
+            "access_token": Security.create_access_token(
+                account, organization_ids=organization_ids
+            ),
+            "refresh_token": Security.create_refresh_token(account),
+            "account_type": account_type,
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 class LogoutRequest(BaseModel):
     refresh_token: str
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.db.database import get_db
@@ -11,6 +11,7 @@ from app.schemas.employee import (
     EmployeeListResponse,
 )
 from app.services.employee_service import EmployeeService
+from app.utils.http_cache import conditional_response
 
 router = APIRouter()
 
@@ -57,6 +58,8 @@ async def create_employee(
 @router.get("/organization/{organization_id}", response_model=EmployeeListResponse)
 async def get_organization_employees(
     organization_id: str,
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     current_user=Depends(auth_middleware),
@@ -78,6 +81,13 @@ async def get_organization_employees(
         )
 
     try:
+        version = await EmployeeService.get_organization_employees_version(
+            db=db, organization_id=organization_id
+        )
+        not_modified = conditional_response(request, response, version, page, size)
+        if not_modified is not None:
+            return not_modified
+
         skip = (page - 1) * size
         employees, total = await EmployeeService.get_organization_employees(
             db=db, organization_id=organization_id, skip=skip, limit=size
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.db.database import get_db
@@ -12,6 +12,7 @@ from app.schemas.organization import (
 )
 from app.services.organization_service import OrganizationService
 from app.services.user_service import UserService
+from app.utils.http_cache import conditional_response
 
 router = APIRouter()
 
@@ -46,6 +47,8 @@ async def create_organization(
 
 @router.get("/", response_model=OrganizationListResponse)
 async def get_user_organizations(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     current_user=Depends(auth_middleware),
@@ -56,6 +59,13 @@ async def get_user_organizations(
     """
     print("current_user", current_user)
     try:
+        version = await OrganizationService.get_user_organizations_version(
+            db=db, user_id=current_user.id
+        )
+        not_modified = conditional_response(request, response, version, page, size)
+        if not_modified is not None:
+            return not_modified
+
         skip = (page - 1) * size
         organizations, total = await OrganizationService.get_user_organizations(
             db=db, user_id=current_user.id, skip=skip, limit=size
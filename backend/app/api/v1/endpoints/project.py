@@ -1,7 +1,8 @@
 # app/api/v1/endpoints/project.py
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from app.db.database import get_db
 from app.middleware.auth_middleware import auth_middleware
 from app.models.user import UserRole
@@ -10,14 +11,34 @@ from app.schemas.project import (
     ProjectUpdate,
     ProjectResponse,
     ProjectListResponse,
+    ProjectEmployeeResponse,
     AssignEmployeeRequest,
     RemoveEmployeeRequest,
 )
 from app.services.project_service import ProjectService
+from app.utils.http_cache import conditional_response
 
 router = APIRouter()
 
 
+def employee_responses(
+    project, assigned_at: Dict[Tuple[str, str], datetime]
+) -> List[ProjectEmployeeResponse]:
+    """A project's employees with the time each was assigned (the project's
+    creation when unknown), from ProjectService.get_assigned_at"""
+    return [
+        ProjectEmployeeResponse(
+            id=employee.id,
+            name=employee.name,
+            email=employee.email,
+            assigned_at=assigned_at.get((str(project.id), str(employee.id)))
+            or project.created_at,
+            is_active=employee.is_active,
+        )
+        for employee in project.employees
+    ]
+
+
 @router.post("/", response_model=ProjectResponse)
 async def create_project(
     project_data: ProjectCreate,
@@ -54,6 +75,8 @@ async def create_project(
 @router.get("/organization/{organization_id}", response_model=ProjectListResponse)
 async def get_organization_projects(
     organization_id: str,
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     current_user=Depends(auth_middleware),
@@ -74,34 +97,28 @@ async def get_organization_projects(
         )
 
     try:
+        version = await ProjectService.get_organization_projects_version(
+            db=db, organization_id=organization_id
+        )
+        not_modified = conditional_response(request, response, version, page, size)
+        if not_modified is not None:
+            return not_modified
+
         skip = (page - 1) * size
         projects, total = await ProjectService.get_organization_projects(
             db=db, organization_id=organization_id, skip=skip, limit=size
         )
 
+        assigned_at = await ProjectService.get_assigned_at(
+            db, [project.id for project in projects]
+        )
         project_responses = []
         for project in projects:
             response_data = ProjectResponse.model_validate(project)
             if project.organization:
                 response_data.organization_name = project.organization.name
 
-            # Format employee data with assigned_at field
-            employee_responses = []
-            for employee in project.employees:
-                # Get the assigned_at from the association table
-                assigned_at = await ProjectService.get_employee_assigned_at(
-                    db=db, project_id=project.id, employee_id=employee.id
-                )
-                employee_response = {
-                    "id": employee.id,
-                    "name": employee.name,
-                    "email": employee.email,
-                    "assigned_at": assigned_at or project.created_at,
-                    "is_active": employee.is_active,
-                }
-                employee_responses.append(employee_response)
-
-            response_data.employees = employee_responses
+            response_data.employees = employee_responses(project, assigned_at)
             project_responses.append(response_data)
 
         return ProjectListResponse(
@@ -125,7 +142,7 @@ async def get_project(
     Only admin users or organization creators can view project details.
     """
     try:
-        project = await ProjectService.get_by_id(db, project_id)
+        project = await ProjectService.get_by_id_shared(db, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
@@ -143,23 +160,9 @@ async def get_project(
         if project.organization:
             response_data.organization_name = project.organization.name
 
-        # Format employee data with assigned_at field
-        employee_responses = []
-        for employee in project.employees:
-            # Get the assigned_at from the association table
-            assigned_at = await ProjectService.get_employee_assigned_at(
-                db=db, project_id=project.id, employee_id=employee.id
-            )
-            employee_response = {
-                "id": employee.id,
-                "name": employee.name,
-                "email": employee.email,
-                "assigned_at": assigned_at or project.created_at,
-                "is_active": employee.is_active,
-            }
-            employee_responses.append(employee_response)
-
-        response_data.employees = employee_responses
+        response_data.employees = employee_responses(
+            project, await ProjectService.get_assigned_at(db, [project.id])
+        )
 
         return response_data
     except HTTPException as e:
@@ -194,23 +197,9 @@ async def update_project(
         if project.organization:
             response_data.organization_name = project.organization.name
 
-        # Format employee data with assigned_at field
-        employee_responses = []
-        for employee in project.employees:
-            # Get the assigned_at from the association table
-            assigned_at = await ProjectService.get_employee_assigned_at(
-                db=db, project_id=project.id, employee_id=employee.id
-            )
-            employee_response = {
-                "id": employee.id,
-                "name": employee.name,
-                "email": employee.email,
-                "assigned_at": assigned_at or project.created_at,
-                "is_active": employee.is_active,
-            }
-            employee_responses.append(employee_response)
-
-        response_data.employees = employee_responses
+        response_data.employees = employee_responses(
+            project, await ProjectService.get_assigned_at(db, [project.id])
+        )
 
         return response_data
     except HTTPException as e:
@@ -354,7 +343,7 @@ async def get_project_employees(
     Only admin users or organization creators can view project employees.
     """
     try:
-        project = await ProjectService.get_by_id(db, project_id)
+        project = await ProjectService.get_by_id_shared(db, project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import List, Optional
 from app.db.database import get_db
 from app.middleware.auth_middleware import auth_middleware
+from app.middleware.rate_limit import upload_rate_limit
 from app.models.user import UserRole
 from app.schemas.screenshot import (
     ScreenshotCreate,
@@ -11,16 +13,35 @@ from app.schemas.screenshot import (
     ScreenshotListResponse,
     ScreenshotFilters,
     ScreenshotUploadRequest,
+    ScreenshotAppResponse,
 )
+from app.services.screenshot_app_service import ScreenshotAppService
+from app.services.screenshot_query import ScreenshotRow
 from app.services.screenshot_service import ScreenshotService
+from app.core.storage import get_s3_client, screenshot_key
 from datetime import datetime
-import boto3
 import os
 
 router = APIRouter()
 
 
-@router.post("/upload", response_model=ScreenshotResponse)
+def _list_response(
+    screenshots: List[ScreenshotRow], total: int, page: int, size: int
+) -> Response:
+    """Serialize a ScreenshotListResponse straight from list rows"""
+    return Response(
+        content=to_json(
+            {"screenshots": screenshots, "total": total, "page": page, "size": size}
+        ),
+        media_type="application/json",
+    )
+
+
+@router.post(
+    "/upload",
+    response_model=ScreenshotResponse,
+    dependencies=[Depends(upload_rate_limit)],
+)
 async def upload_screenshot(
     upload_data: ScreenshotUploadRequest,
     current_user=Depends(auth_middleware),
@@ -98,6 +119,7 @@ async def get_employee_screenshots(
     task_id: Optional[str] = Query(None, description="Filter by task"),
     permission: Optional[bool] = Query(None, description="Filter by permission status"),
     app: Optional[str] = Query(None, description="Filter by application name"),
+    app_id: Optional[str] = Query(None, description="Filter by catalog app ID"),
     os: Optional[str] = Query(None, description="Filter by operating system"),
     start_date: Optional[datetime] = Query(None, description="Filter from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter to this date"),
@@ -124,6 +146,7 @@ async def get_employee_screenshots(
             task_id=task_id,
             permission=permission,
             app=app,
+            app_id=app_id,
             os=os,
             start_date=start_date,
             end_date=end_date,
@@ -136,18 +159,7 @@ async def get_employee_screenshots(
             db=db, employee_id=employee_id, filters=filters, skip=skip, limit=size
         )
 
-        screenshot_responses = []
-        for screenshot in screenshots:
-            response_data = ScreenshotResponse.model_validate(screenshot)
-
-            screenshot_responses.append(response_data)
-
-        return ScreenshotListResponse(
-            screenshots=screenshot_responses,
-            total=total,
-            page=page,
-            size=size,
-        )
+        return _list_response(screenshots, total, page, size)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -165,6 +177,7 @@ async def get_organization_screenshots(
     task_id: Optional[str] = Query(None, description="Filter by task"),
     permission: Optional[bool] = Query(None, description="Filter by permission status"),
     app: Optional[str] = Query(None, description="Filter by application name"),
+    app_id: Optional[str] = Query(None, description="Filter by catalog app ID"),
     os: Optional[str] = Query(None, description="Filter by operating system"),
     start_date: Optional[datetime] = Query(None, description="Filter from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter to this date"),
@@ -192,6 +205,7 @@ async def get_organization_screenshots(
             task_id=task_id,
             permission=permission,
             app=app,
+            app_id=app_id,
             os=os,
             start_date=start_date,
             end_date=end_date,
@@ -208,18 +222,38 @@ async def get_organization_screenshots(
             limit=size,
         )
 
-        screenshot_responses = []
         for screenshot in screenshots:
-            response_data = ScreenshotResponse.model_validate(screenshot)
-            response_data.path = f"https://sixeye-audio-files.s3.us-east-1.amazonaws.com/screenshots/{response_data.path}"
+            screenshot.path = f"https://sixeye-audio-files.s3.us-east-1.amazonaws.com/screenshots/{screenshot.path}"
+
+        return _list_response(screenshots, total, page, size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-            screenshot_responses.append(response_data)
 
-        return ScreenshotListResponse(
-            screenshots=screenshot_responses,
-            total=total,
-            page=page,
-            size=size,
+@router.get(
+    "/organization/{organization_id}/apps", response_model=List[ScreenshotAppResponse]
+)
+async def get_organization_apps(
+    organization_id: str,
+    q: Optional[str] = Query(
+        None, max_length=100, description="Text the app name contains"
+    ),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of apps"),
+    current_user=Depends(auth_middleware),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Autocomplete app names seen in an organization's screenshots.
+    Only admin users can view organization apps.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=403, detail="Only admin users can view organization apps"
+        )
+
+    try:
+        return await ScreenshotAppService.search_apps(
+            db=db, organization_id=organization_id, q=q, limit=limit
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -238,6 +272,7 @@ async def get_project_screenshots(
     task_id: Optional[str] = Query(None, description="Filter by task"),
     permission: Optional[bool] = Query(None, description="Filter by permission status"),
     app: Optional[str] = Query(None, description="Filter by application name"),
+    app_id: Optional[str] = Query(None, description="Filter by catalog app ID"),
     os: Optional[str] = Query(None, description="Filter by operating system"),
     start_date: Optional[datetime] = Query(None, description="Filter from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter to this date"),
@@ -265,6 +300,7 @@ async def get_project_screenshots(
             task_id=task_id,
             permission=permission,
             app=app,
+            app_id=app_id,
             os=os,
             start_date=start_date,
             end_date=end_date,
@@ -277,18 +313,7 @@ async def get_project_screenshots(
             db=db, project_id=project_id, filters=filters, skip=skip, limit=size
         )
 
-        screenshot_responses = []
-        for screenshot in screenshots:
-            response_data = ScreenshotResponse.model_validate(screenshot)
-
-            screenshot_responses.append(response_data)
-
-        return ScreenshotListResponse(
-            screenshots=screenshot_responses,
-            total=total,
-            page=page,
-            size=size,
-        )
+        return _list_response(screenshots, total, page, size)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -306,6 +331,7 @@ async def get_task_screenshots(
     project_id: Optional[str] = Query(None, description="Filter by project"),
     permission: Optional[bool] = Query(None, description="Filter by permission status"),
     app: Optional[str] = Query(None, description="Filter by application name"),
+    app_id: Optional[str] = Query(None, description="Filter by catalog app ID"),
     os: Optional[str] = Query(None, description="Filter by operating system"),
     start_date: Optional[datetime] = Query(None, description="Filter from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter to this date"),
@@ -333,6 +359,7 @@ async def get_task_screenshots(
             project_id=project_id,
             permission=permission,
             app=app,
+            app_id=app_id,
             os=os,
             start_date=start_date,
             end_date=end_date,
@@ -345,18 +372,7 @@ async def get_task_screenshots(
             db=db, task_id=task_id, filters=filters, skip=skip, limit=size
         )
 
-        screenshot_responses = []
-        for screenshot in screenshots:
-            response_data = ScreenshotResponse.model_validate(screenshot)
-
-            screenshot_responses.append(response_data)
-
-        return ScreenshotListResponse(
-            screenshots=screenshot_responses,
-            total=total,
-            page=page,
-            size=size,
-        )
+        return _list_response(screenshots, total, page, size)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -430,18 +446,11 @@ async def delete_screenshot(
 
 @router.post("/s3/presigned-url")
 async def get_presigned_url(file_name: str, content_type: str):
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        region_name=os.getenv("AWS_REGION"),
-    )
-
-    presigned_url = s3_client.generate_presigned_url(
+    presigned_url = get_s3_client().generate_presigned_url(
         "put_object",
         Params={
             "Bucket": os.getenv("AWS_S3_BUCKET"),
-            "Key": "screenshots/" + file_name,
+            "Key": screenshot_key(file_name),
             "ContentType": content_type,
         },
         ExpiresIn=3600,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.db.database import get_db
@@ -14,6 +14,7 @@ from app.schemas.task import (
     CreateDefaultTaskRequest,
 )
 from app.services.task_service import TaskService
+from app.utils.http_cache import conditional_response
 
 router = APIRouter()
 
@@ -87,6 +88,8 @@ async def create_default_task(
 @router.get("/project/{project_id}", response_model=TaskListResponse)
 async def get_project_tasks(
     project_id: str,
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     current_user=Depends(auth_middleware),
@@ -108,6 +111,13 @@ async def get_project_tasks(
         )
 
     try:
+        version = await TaskService.get_project_tasks_version(
+            db=db, project_id=project_id
+        )
+        not_modified = conditional_response(request, response, version, page, size)
+        if not_modified is not None:
+            return not_modified
+
         skip = (page - 1) * size
         tasks, total = await TaskService.get_project_tasks(
             db=db, project_id=project_id, skip=skip, limit=size
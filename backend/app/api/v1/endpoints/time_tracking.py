@@ -1,8 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, WebSocket, status
+from fastapi import WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-from app.db.database import get_db
+from typing import List, Optional
+from app.core.config import settings
+from app.core.events import presence_broker
+from app.core.response_cache import (
+    data_versions,
+    employee_summary_cache,
+    request_key,
+    time_report_aggregate_cache,
+    time_report_cache,
+)
+from app.db.database import get_db, AsyncSessionLocal
 from app.middleware.auth_middleware import auth_middleware
+from app.middleware.rate_limit import report_concurrency
 from app.models.user import UserRole
 from app.schemas.time_tracking import (
     ClockInRequest,
@@ -15,13 +28,35 @@ from app.schemas.time_tracking import (
     CurrentSessionResponse,
     TimeReportRequest,
     TimeTrackingUpdate,
+    ActiveSessionResponse,
+    TimesheetAnomalyListResponse,
 )
+from app.services.organization_service import OrganizationService
 from app.services.time_tracking_service import TimeTrackingService
+from app.services.report_engine import ReportEngine
+from app.services.timesheet_anomaly_service import KINDS, TimesheetAnomalyService
+from app.services.hour_limit_service import HourLimitService, as_utc
+from app.services.heartbeat_service import HeartbeatService
+from app.utils.utils import current_time
 from datetime import datetime
+import asyncio
+import json
 
 router = APIRouter()
 
 
+async def report_version(db: AsyncSession, report_request: TimeReportRequest):
+    """Data version of the organizations a report covers, for its cache key"""
+    return data_versions.key(
+        await TimeTrackingService.covered_organizations(
+            db,
+            project_id=report_request.project_id,
+            task_id=report_request.task_id,
+            employee_ids=report_request.employee_ids,
+        )
+    )
+
+
 @router.post("/clock-in/{employee_id}", response_model=TimeTrackingResponse)
 async def clock_in_employee(
     employee_id: str,
@@ -141,7 +176,11 @@ async def get_employee_time_logs(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/employees/summary", response_model=EmployeeTimeListResponse)
+@router.get(
+    "/employees/summary",
+    response_model=EmployeeTimeListResponse,
+    dependencies=[Depends(report_concurrency, scope="function")],
+)
 async def get_all_employees_time_summary(
     start_date: Optional[datetime] = Query(None, description="Filter from this date"),
     end_date: Optional[datetime] = Query(None, description="Filter to this date"),
@@ -172,10 +211,15 @@ async def get_all_employees_time_summary(
         )
 
         skip = (page - 1) * size
-        employee_summaries, total = (
-            await TimeTrackingService.get_all_employees_time_summary(
+        # Only changes in the organizations the summary covers invalidate it
+        organization_ids = await TimeTrackingService.covered_organizations(
+            db, project_id=project_id, task_id=task_id
+        )
+        employee_summaries, total = await employee_summary_cache.get_or_compute(
+            (request_key(filters), skip, size, data_versions.key(organization_ids)),
+            lambda: TimeTrackingService.get_all_employees_time_summary(
                 db=db, filters=filters, skip=skip, limit=size
-            )
+            ),
         )
 
         return EmployeeTimeListResponse(
@@ -215,13 +259,22 @@ async def get_current_session(
             raise HTTPException(status_code=404, detail="No active session found")
 
         # Calculate current duration
-        current_time = datetime.utcnow()
-        duration = current_time - current_session.clock_in
+        now = current_time()
+        duration = now - as_utc(current_session.clock_in)
         current_duration_minutes = int(duration.total_seconds() / 60)
         current_duration_hours = round(current_duration_minutes / 60, 2)
 
         # Check if on break
-        is_on_break = current_session.break_start and not current_session.break_end
+        is_on_break = bool(
+            current_session.break_start and not current_session.break_end
+        )
+
+        # Remaining allowance under project/task hour limits
+        remaining_today, remaining_week = (
+            await HourLimitService.get_remaining_allowance(
+                db=db, session=current_session, now=now
+            )
+        )
 
         return CurrentSessionResponse(
             employee_id=current_session.employee_id,
@@ -234,6 +287,8 @@ async def get_current_session(
             break_start=current_session.break_start,
             break_duration_minutes=current_session.break_duration_minutes,
             notes=current_session.notes,
+            remaining_minutes_today=remaining_today,
+            remaining_minutes_this_week=remaining_week,
         )
     except HTTPException as e:
         raise e
@@ -299,6 +354,25 @@ async def end_break(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/heartbeat/{employee_id}")
+async def heartbeat(
+    employee_id: str,
+    current_user=Depends(auth_middleware),
+):
+    """
+    Record that an employee's tracker is still running.
+    Heartbeats are batched in memory; sessions without one for longer than the
+    organization's idle timeout are clocked out automatically.
+    """
+    if current_user.role != UserRole.ADMIN and current_user.id != employee_id:
+        raise HTTPException(
+            status_code=403, detail="You can only send heartbeats for yourself"
+        )
+
+    HeartbeatService.record(employee_id)
+    return {"message": "Heartbeat received"}
+
+
 @router.put("/entry/{entry_id}", response_model=TimeTrackingResponse)
 async def update_time_entry(
     entry_id: str,
@@ -366,7 +440,7 @@ async def delete_time_entry(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/report")
+@router.post("/report", dependencies=[Depends(report_concurrency, scope="function")])
 async def generate_time_report(
     report_request: TimeReportRequest,
     current_user=Depends(auth_middleware),
@@ -382,10 +456,224 @@ async def generate_time_report(
         )
 
     try:
-        report = await TimeTrackingService.generate_time_report(
-            db=db, report_request=report_request
+        report = await time_report_cache.get_or_compute(
+            (request_key(report_request), await report_version(db, report_request)),
+            lambda: TimeTrackingService.generate_time_report(
+                db=db, report_request=report_request
+            ),
         )
 
         return report
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/report/aggregate",
+    dependencies=[Depends(report_concurrency, scope="function")],
+)
+async def generate_aggregate_time_report(
+    report_request: TimeReportRequest,
+    current_user=Depends(auth_middleware),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Time report totals without the entry log: per employee, project, day and
+    week, with overtime, utilization and overlapping entries.
+    Only admin users can generate reports.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=403, detail="Only admin users can generate time reports"
+        )
+
+    try:
+        return await time_report_aggregate_cache.get_or_compute(
+            (request_key(report_request), await report_version(db, report_request)),
+            lambda: ReportEngine.generate_report(db=db, report_request=report_request),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get(
+    "/anomalies",
+    response_model=TimesheetAnomalyListResponse,
+    dependencies=[Depends(report_concurrency, scope="function")],
+)
+async def get_timesheet_anomalies(
+    organization_id: str = Query(..., description="Organization to scan"),
+    start_date: datetime = Query(..., description="Entries clocked in from this date"),
+    end_date: datetime = Query(..., description="Entries clocked in before this date"),
+    kinds: Optional[List[str]] = Query(
+        None, description="Only these kinds (default: all)"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Anomalies listed"),
+    current_user=Depends(auth_middleware),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Overlapping entries, overlong sessions, breaks longer than their session
+    and clock-outs before clock-ins across an organization.
+    Only admin users can scan timesheets.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=403, detail="Only admin users can scan timesheets"
+        )
+    start, end = as_utc(start_date), as_utc(end_date)
+    if start >= end:
+        raise HTTPException(
+            status_code=400, detail="start_date must be before end_date"
+        )
+    unknown = set(kinds or ()) - set(KINDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown anomaly kinds: {', '.join(sorted(unknown))}",
+        )
+
+    try:
+        anomalies, counts = await TimesheetAnomalyService.scan_organization(
+            db=db,
+            organization_id=organization_id,
+            start=start,
+            end=end,
+            kinds=kinds,
+            limit=limit,
+        )
+        return TimesheetAnomalyListResponse(
+            anomalies=anomalies, counts=counts, start_date=start, end_date=end
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _presence_snapshot(organization_id: str) -> list:
+    """Load open sessions on a short-lived session so streams never pin a connection"""
+    async with AsyncSessionLocal() as db:
+        sessions = await TimeTrackingService.get_organization_active_sessions(
+            db=db, organization_id=organization_id
+        )
+    return jsonable_encoder(sessions)
+
+
+@router.get(
+    "/organization/{organization_id}/presence",
+    response_model=List[ActiveSessionResponse],
+)
+async def get_organization_presence(
+    organization_id: str,
+    current_user=Depends(auth_middleware),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get everyone currently clocked in to an organization.
+    Only admin users or organization creators can view presence.
+    """
+    can_manage = await OrganizationService.can_user_manage_organization(
+        db=db, user_id=current_user.id, organization_id=organization_id
+    )
+    if not can_manage:
+        raise HTTPException(
+            status_code=403,
+            detail="You don't have permission to view presence in this organization",
+        )
+
+    try:
+        return await TimeTrackingService.get_organization_active_sessions(
+            db=db, organization_id=organization_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/organization/{organization_id}/presence/stream")
+async def stream_organization_presence(
+    organization_id: str,
+    current_user=Depends(auth_middleware),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream clock-in, clock-out and break events as server-sent events.
+    The first event is a snapshot of open sessions; a comment line is sent
+    every few seconds to keep proxies from closing the connection.
+    Only admin users or organization creators can view presence.
+    """
+    can_manage = await OrganizationService.can_user_manage_organization(
+        db=db, user_id=current_user.id, organization_id=organization_id
+    )
+    if not can_manage:
+        raise HTTPException(
+            status_code=403,
+            detail="You don't have permission to view presence in this organization",
+        )
+
+    # Give the connection back to the pool; the stream can stay open for hours
+    await db.close()
+
+    async def event_stream():
+        queue = presence_broker.subscribe(organization_id)
+        try:
+            snapshot = await _presence_snapshot(organization_id)
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.presence_keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            presence_broker.unsubscribe(organization_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/organization/{organization_id}/presence/ws")
+async def presence_websocket(
+    websocket: WebSocket,
+    organization_id: str,
+    token: str = Query(..., description="JWT access token"),
+):
+    """
+    Push clock-in, clock-out and break events over a WebSocket.
+    Browsers cannot set headers on WebSockets, so the token is a query parameter.
+    Only admin users or organization creators can view presence.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            current_user = await auth_middleware(token=token, db=db)
+            can_manage = await OrganizationService.can_user_manage_organization(
+                db=db, user_id=current_user.id, organization_id=organization_id
+            )
+        except HTTPException:
+            can_manage = False
+
+    if not can_manage:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    queue = presence_broker.subscribe(organization_id)
+    try:
+        snapshot = await _presence_snapshot(organization_id)
+        await websocket.send_json({"type": "snapshot", "sessions": snapshot})
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.presence_keepalive_seconds
+                )
+            except asyncio.TimeoutError:
+                event = {"type": "keepalive"}
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        presence_broker.unsubscribe(organization_id, queue)
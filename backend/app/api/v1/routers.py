@@ -7,6 +7,7 @@ from app.api.v1.endpoints import (
     task,
     time_tracking,
     screenshot,
+    analytics,
 )
 
 # from app.api.v1.endpoints import users
@@ -27,4 +28,5 @@ router.include_router(
     time_tracking.router, prefix="/time-tracking", tags=["time-tracking"]
 )
 router.include_router(screenshot.router, prefix="/screenshots", tags=["screenshots"])
+router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 # router.include_router(users.router, prefix="/users", tags=["users"])
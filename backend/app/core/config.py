@@ -25,9 +25,19 @@ class Settings(BaseSettings):
     postgres_db: Optional[str] = "fastapi_db"
 
     # JWT environment variable mappings
-    jwt_secret_key: str = "your-secret-key-here-change-in-production"
+    # Required for HS* algorithms; there is no default, so a missing key
+    # stops startup instead of signing with a known secret
+    jwt_secret_key: Optional[str] = None
     jwt_algorithm: str = "HS256"
     jwt_access_token_expire_minutes: int = 30
+    # Asymmetric signing (RS256/ES256...): new tokens are signed with the
+    # private key and carry `jwt_signing_kid`; every <kid>.pem in the public
+    # key directory is accepted, so old keys keep working during a rotation
+    jwt_signing_kid: Optional[str] = None
+    jwt_private_key_file: Optional[str] = None
+    jwt_public_keys_dir: Optional[str] = None
+    jwt_verify_cache_size: int = 10000  # verified tokens kept until they expire
+    jwt_max_organization_claims: int = 100  # org IDs embedded in an access token
 
     # CORS settings
     cors_origins: list = [
@@ -47,6 +57,96 @@ class Settings(BaseSettings):
     smtp_server_password: Optional[str] = None
     smtp_sender_email: Optional[str] = None
 
+    # Hour limits (seconds before cached running totals are re-read from the DB)
+    hour_limit_cache_ttl_seconds: int = 300
+
+    # Live presence feed
+    presence_queue_size: int = 100
+    presence_keepalive_seconds: int = 15
+    presence_pg_bridge_enabled: bool = False  # fan out via LISTEN/NOTIFY
+
+    # Heartbeats and auto clock out of stale sessions
+    heartbeat_flush_interval_seconds: int = 15
+    session_sweep_interval_seconds: int = 60
+    # Default for orgs that set none; None leaves them alone (opt-in, since
+    # only clients that send heartbeats keep their sessions open)
+    session_idle_timeout_minutes: Optional[int] = None
+
+    # Batched writes for high-volume client data (screenshot metadata, ...)
+    write_buffer_batch_size: int = 500
+    write_buffer_flush_interval_ms: int = 200
+    write_buffer_max_pending: int = 10000
+    # Screenshots become readable only after the next flush when enabled
+    screenshot_write_buffer_enabled: bool = False
+    # App names of screenshot uploads resolved to catalog IDs, per worker
+    screenshot_app_cache_size: int = 10000
+
+    # Thread pools for blocking work (password hashing, SMTP, S3 deletes)
+    bcrypt_max_workers: int = 4
+    mail_max_workers: int = 2
+    storage_max_workers: int = 2
+
+    # Query budget / N+1 detection (debug and test environments)
+    query_debug: bool = False  # X-Query-Count header and repeated-query logging
+    query_repeat_threshold: int = 3
+    # Prebuilt list statements kept per query builder, one per filter shape
+    query_builder_max_shapes: int = 256
+
+    # Rate limits: token buckets of "<requests>/<seconds>"; "" disables one
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"  # "postgres" shares buckets across workers
+    rate_limit_max_keys: int = 100000  # memory backend
+    rate_limit_auth_per_ip: str = "300/60"  # login, signup, OTP, password reset
+    rate_limit_auth_per_email: str = "10/300"  # password and OTP guesses
+    rate_limit_otp_per_ip: str = "30/600"  # each OTP sends an email
+    rate_limit_otp_per_email: str = "3/600"
+    rate_limit_upload_per_principal: str = "60/60"
+    rate_limit_upload_per_organization: str = "6000/60"
+    rate_limit_upload_per_ip: str = "3000/60"
+    # Heavy reports: requests in flight per organization (0 disables)
+    report_concurrency_per_organization: int = 2
+    report_concurrency_retry_after_seconds: int = 5
+    # Aggregated reports: overtime is time past a workday or workweek, and
+    # utilization is worked time over one workday per business day
+    report_workday_minutes: int = 480
+    report_workweek_minutes: int = 2400
+    report_max_overlaps: int = 100  # overlapping entries listed per report
+    # Reports count days in the employee's time zone, else the organization's,
+    # else this one
+    default_timezone: str = "UTC"
+    # Timesheet anomaly scans: sessions longer than this are flagged
+    timesheet_max_session_hours: int = 16
+    timesheet_anomaly_scan_batch_size: int = 5000  # rows fetched per round trip
+
+    # Cached responses of the time summary and report endpoints. Entries are
+    # dropped when time data changes; the TTL bounds staleness from changes
+    # made on other workers
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 500  # per endpoint
+    response_cache_ttl_seconds: int = 60
+    # Concurrent identical reads (employee tasks, project lookups) share a query
+    single_flight_enabled: bool = True
+
+    # Monthly partitions of screenshots and time_tracking. time_tracking months
+    # older than the retention are detached and dropped as a whole (0 keeps
+    # everything); screenshot months are dropped by the archival job below
+    partition_months_ahead: int = 3
+    partition_maintenance_interval_seconds: int = 86400
+    partition_detach_only: bool = False  # keep expired months as plain tables
+    time_tracking_partition_retention_months: int = 0
+
+    # Screenshot retention: screenshots older than their organization's
+    # screenshot_retention_days are archived in batches after their stored
+    # objects are purged
+    screenshot_retention_days: int = 0  # default when an org sets none, 0 keeps all
+    screenshot_archival_interval_seconds: int = 3600
+    screenshot_archival_batch_size: int = 1000  # rows per DELETE, keys per S3 call
+    screenshot_archival_delete_rate: str = "5/1"  # S3 delete calls per second
+
+    # Hourly app usage rolled up from screenshot metadata
+    app_usage_flush_interval_seconds: int = 15
+    screenshot_interval_seconds: int = 30  # desktop capture interval, for minutes
+
     # Server settings
     host: str = "0.0.0.0"
     port: int = 8000
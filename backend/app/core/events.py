@@ -0,0 +1,98 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+import asyncpg
+from app.core.config import settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+PRESENCE_CHANNEL = "momentum_presence"
+
+
+class PresenceBroker:
+    """In-process pub/sub for clock-in, clock-out and break events.
+
+    Subscribers get a bounded queue per organization; slow consumers lose their
+    oldest events instead of growing memory. With presence_pg_bridge_enabled,
+    events go through Postgres NOTIFY so every worker's subscribers see them.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._listeners: List[Callable[[str, dict], None]] = []
+        self._connection: Optional[asyncpg.Connection] = None
+        self._notify_lock = asyncio.Lock()
+
+    def subscribe(self, organization_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[organization_id].add(queue)
+        return queue
+
+    def unsubscribe(self, organization_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(organization_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[organization_id]
+
+    def add_listener(self, listener: Callable[[str, dict], None]) -> None:
+        """Call `listener(organization_id, event)` for every event delivered"""
+        self._listeners.append(listener)
+
+    async def publish(self, organization_id: str, event: dict) -> None:
+        if self._connection is None:
+            self._deliver(organization_id, event)
+            return
+
+        payload = json.dumps({"organization_id": organization_id, "event": event})
+        async with self._notify_lock:
+            await self._connection.execute(
+                "SELECT pg_notify($1, $2)", PRESENCE_CHANNEL, payload
+            )
+
+    def _deliver(self, organization_id: str, event: dict) -> None:
+        for listener in self._listeners:
+            try:
+                listener(organization_id, event)
+            except Exception as e:
+                logger.error(f"Presence listener failed: {str(e)}")
+        for queue in self._subscribers.get(organization_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            message = json.loads(payload)
+            self._deliver(message["organization_id"], message["event"])
+        except Exception as e:
+            logger.error(f"Invalid presence notification: {str(e)}")
+
+    async def start(self) -> None:
+        if not settings.presence_pg_bridge_enabled:
+            return
+
+        dsn = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self._connection = await asyncpg.connect(dsn)
+        await self._connection.add_listener(PRESENCE_CHANNEL, self._on_notify)
+        logger.info("Presence feed bridged via LISTEN/NOTIFY")
+
+    async def stop(self) -> None:
+        if self._connection is None:
+            return
+
+        connection, self._connection = self._connection, None
+        try:
+            await connection.remove_listener(PRESENCE_CHANNEL, self._on_notify)
+        finally:
+            await connection.close()
+
+
+presence_broker = PresenceBroker(queue_size=settings.presence_queue_size)
@@ -22,7 +22,9 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     error_schema = ErrorSchema(
         status=exc.status_code, message=exc.detail, success=False, errors=None
     ).model_dump()
-    return JSONResponse(status_code=exc.status_code, content=error_schema)
+    return JSONResponse(
+        status_code=exc.status_code, content=error_schema, headers=exc.headers
+    )
 
 
 async def validation_exception_handler(request: Request, exc: ValidationException):
@@ -1,6 +1,8 @@
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import asyncio
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
 from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
 from typing import Dict, Optional, List
@@ -8,10 +10,17 @@ import logging
 import ssl
 import os
 from datetime import datetime
+from app.core.config import settings
+from app.core.metrics import MAIL_QUEUE_DEPTH
 
 
 logger = logging.getLogger(__name__)
 
+# smtplib blocks; send on a small pool so requests are not held up by SMTP
+mail_executor = ThreadPoolExecutor(
+    max_workers=settings.mail_max_workers, thread_name_prefix="mail"
+)
+
 
 class MailService:
     def __init__(self):
@@ -49,42 +58,54 @@ class MailService:
 
             msg.attach(MIMEText(html_content, "html"))
 
-            context = ssl.create_default_context()
-
-            with smtplib.SMTP_SSL(
-                self.smtp_server, self.smtp_port, context=context
-            ) as server:
-
-                try:
-                    server.login(self.sender_email, self.smtp_password)
-                except smtplib.SMTPAuthenticationError:
-                    logger.error("SMTP Authentication failed")
-                    return False
-                except Exception as e:
-                    logger.error(f"SMTP Login error: {str(e)}")
-                    return False
-
-                recipients = [to_email]
-                if cc:
-                    recipients.extend(cc)
-                if bcc:
-                    recipients.extend(bcc)
-
-                try:
-                    server.sendmail(self.sender_email, recipients, msg.as_string())
-                    logger.info(f"Email sent successfully to {to_email}")
-                    return True
-                except smtplib.SMTPRecipientsRefused as e:
-                    logger.error(f"SMTP Recipients Refused: {str(e)}")
-                    return False
-                except smtplib.SMTPException as e:
-                    logger.error(f"SMTP Error: {str(e)}")
-                    return False
+            recipients = [to_email]
+            if cc:
+                recipients.extend(cc)
+            if bcc:
+                recipients.extend(bcc)
+
+            MAIL_QUEUE_DEPTH.inc()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    mail_executor, self._deliver, to_email, recipients, msg
+                )
+            finally:
+                MAIL_QUEUE_DEPTH.dec()
 
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
 
+    def _deliver(
+        self, to_email: str, recipients: List[str], msg: MIMEMultipart
+    ) -> bool:
+        """Blocking SMTP send, run on mail_executor"""
+        context = ssl.create_default_context()
+
+        with smtplib.SMTP_SSL(
+            self.smtp_server, self.smtp_port, context=context
+        ) as server:
+
+            try:
+                server.login(self.sender_email, self.smtp_password)
+            except smtplib.SMTPAuthenticationError:
+                logger.error("SMTP Authentication failed")
+                return False
+            except Exception as e:
+                logger.error(f"SMTP Login error: {str(e)}")
+                return False
+
+            try:
+                server.sendmail(self.sender_email, recipients, msg.as_string())
+                logger.info(f"Email sent successfully to {to_email}")
+                return True
+            except smtplib.SMTPRecipientsRefused as e:
+                logger.error(f"SMTP Recipients Refused: {str(e)}")
+                return False
+            except smtplib.SMTPException as e:
+                logger.error(f"SMTP Error: {str(e)}")
+                return False
+
     def get_template(self, template_name: str, template_data: Dict) -> str:
         template = self.env.get_template(f"{template_name}.html")
         html_content = template.render(**template_data)
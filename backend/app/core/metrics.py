@@ -0,0 +1,166 @@
+# Prometheus metrics shared across the app
+from prometheus_client import Counter, Gauge, Histogram
+
+HEARTBEATS_RECEIVED = Counter(
+    "momentum_heartbeats_received_total",
+    "Heartbeats received from desktop clients",
+)
+HEARTBEATS_FLUSHED = Counter(
+    "momentum_heartbeats_flushed_total",
+    "Heartbeats written to open sessions",
+)
+HEARTBEATS_PENDING = Gauge(
+    "momentum_heartbeats_pending",
+    "Employees with a heartbeat waiting to be flushed",
+)
+SESSIONS_AUTO_CLOSED = Counter(
+    "momentum_sessions_auto_closed_total",
+    "Open sessions closed by the idle sweeper",
+)
+SESSION_SWEEPS = Counter(
+    "momentum_session_sweeps_total",
+    "Idle sweeper runs",
+)
+
+WRITE_BUFFER_PENDING = Gauge(
+    "momentum_write_buffer_pending_rows",
+    "Rows waiting in a write buffer",
+    ["table"],
+)
+WRITE_BUFFER_DROPPED = Counter(
+    "momentum_write_buffer_dropped_rows_total",
+    "Rows rejected because a write buffer was full or its batch failed",
+    ["table"],
+)
+WRITE_BUFFER_FLUSH_SECONDS = Histogram(
+    "momentum_write_buffer_flush_seconds",
+    "Time to write one batch from a write buffer",
+    ["table"],
+)
+WRITE_BUFFER_BATCH_ROWS = Histogram(
+    "momentum_write_buffer_batch_rows",
+    "Rows per batch written from a write buffer",
+    ["table"],
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000),
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "momentum_http_request_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    "momentum_http_request_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+HTTP_REQUEST_QUERY_SECONDS = Histogram(
+    "momentum_http_request_query_seconds",
+    "Time spent in SQL statements per request",
+    ["method", "route"],
+)
+
+DB_STATEMENT_SECONDS = Histogram(
+    "momentum_db_statement_seconds",
+    "SQL statement duration by operation",
+    ["operation"],
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "momentum_db_pool_checkout_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+DB_POOL_IN_USE = Gauge(
+    "momentum_db_pool_in_use",
+    "Connections currently checked out of the pool",
+)
+
+BCRYPT_QUEUE_DEPTH = Gauge(
+    "momentum_bcrypt_queue_depth",
+    "Password hashes queued or running on the bcrypt thread pool",
+)
+MAIL_QUEUE_DEPTH = Gauge(
+    "momentum_mail_queue_depth",
+    "Emails queued or being sent on the mail thread pool",
+)
+
+TOKEN_VERIFICATIONS = Counter(
+    "momentum_token_verifications_total",
+    "Access token checks, by whether the signature came from the cache",
+    ["result"],
+)
+
+RATE_LIMITED = Counter(
+    "momentum_rate_limited_total",
+    "Requests rejected by a rate limit, by policy and bucket key",
+    ["policy", "key"],
+)
+CONCURRENCY_IN_FLIGHT = Gauge(
+    "momentum_concurrency_in_flight",
+    "Requests running under a per-organization concurrency cap",
+    ["policy"],
+)
+CONCURRENCY_REJECTED = Counter(
+    "momentum_concurrency_rejected_total",
+    "Requests rejected because their organization was at its concurrency cap",
+    ["policy"],
+)
+
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "momentum_response_cache_lookups_total",
+    "Cached endpoint lookups, by hit, miss or coalesced into a running miss",
+    ["cache", "result"],
+)
+RESPONSE_CACHE_EVICTIONS = Counter(
+    "momentum_response_cache_evictions_total",
+    "Entries dropped to keep a response cache within its size",
+    ["cache"],
+)
+RESPONSE_CACHE_ENTRIES = Gauge(
+    "momentum_response_cache_entries",
+    "Entries held by a response cache",
+    ["cache"],
+)
+
+SINGLE_FLIGHT_CALLS = Counter(
+    "momentum_single_flight_calls_total",
+    "Calls to coalesced service methods, by whether they ran the query or "
+    "shared one already in flight",
+    ["method", "result"],
+)
+
+SCREENSHOTS_ARCHIVED = Counter(
+    "momentum_screenshots_archived_total",
+    "Screenshots removed by retention, by batched delete or dropped partition",
+    ["method"],
+)
+STORAGE_OBJECTS_PURGED = Counter(
+    "momentum_storage_objects_purged_total",
+    "Stored screenshot objects deleted by retention, by result",
+    ["result"],
+)
+SCREENSHOT_ARCHIVAL_LAST_SUCCESS = Gauge(
+    "momentum_screenshot_archival_last_success_timestamp_seconds",
+    "When the screenshot archival job last finished a full pass",
+)
+
+QUERY_BUILDER_LOOKUPS = Counter(
+    "momentum_query_builder_lookups_total",
+    "Prebuilt list statements looked up by filter shape, by hit or miss",
+    ["builder", "result"],
+)
+DB_COMPILED_CACHE = Counter(
+    "momentum_db_compiled_cache_total",
+    "Statements executed, by whether SQLAlchemy reused their compiled SQL",
+    ["result"],
+)
+
+APP_USAGE_FLUSHED = Counter(
+    "momentum_app_usage_flushed_total",
+    "Screenshots counted into the hourly app usage rollup",
+)
+APP_USAGE_PENDING = Gauge(
+    "momentum_app_usage_pending",
+    "App usage rollup rows with counts waiting to be flushed",
+)
@@ -0,0 +1,127 @@
+import logging
+import math
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Rate:
+    """`requests` per `seconds`, allowing bursts of up to `requests`"""
+
+    requests: int
+    seconds: float
+
+    @property
+    def per_second(self) -> float:
+        return self.requests / self.seconds
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> Optional["Rate"]:
+        """Parse "<requests>/<seconds>", e.g. "60/60"; empty disables the limit"""
+        if not value:
+            return None
+        requests, seconds = value.split("/")
+        return cls(int(requests), float(seconds))
+
+
+class MemoryBucketStore:
+    """Token buckets for a single process, at most `max_keys` of them; the
+    least recently used bucket is dropped to make room"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at), least recently used first
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: Rate) -> float:
+        """Take one token; returns 0 if allowed, else seconds until one is free"""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (rate.requests, now))
+        tokens = min(rate.requests, tokens + (now - updated_at) * rate.per_second)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        if allowed:
+            return 0.0
+        return (1 - tokens) / rate.per_second
+
+
+class PostgresBucketStore:
+    """Token buckets in an unlogged table, shared by every worker"""
+
+    REFILLED = (
+        "least(:capacity, b.tokens"
+        " + extract(epoch FROM clock_timestamp() - b.updated_at) * :per_second)"
+    )
+    TAKE = text(f"""
+        INSERT INTO rate_limit_buckets AS b (key, tokens, allowed, updated_at)
+        VALUES (:key, :capacity - 1, true, clock_timestamp())
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = {REFILLED} - CASE WHEN {REFILLED} >= 1 THEN 1 ELSE 0 END,
+            allowed = {REFILLED} >= 1,
+            updated_at = clock_timestamp()
+        RETURNING b.tokens, b.allowed
+        """)
+
+    async def take(self, key: str, rate: Rate) -> float:
+        try:
+            async with engine.begin() as conn:
+                tokens, allowed = (
+                    await conn.execute(
+                        self.TAKE,
+                        {
+                            "key": key,
+                            "capacity": float(rate.requests),
+                            "per_second": rate.per_second,
+                        },
+                    )
+                ).one()
+        except Exception as e:
+            # Fail open: an unavailable limiter must not take the API down
+            logger.warning(f"Rate limit check for {key} failed: {e}")
+            return 0.0
+        if allowed:
+            return 0.0
+        return (1 - tokens) / rate.per_second
+
+
+class ConcurrencyLimiter:
+    """Caps requests in flight per key, in this process"""
+
+    def __init__(self):
+        self._in_flight: Dict[str, int] = defaultdict(int)
+
+    def acquire(self, key: str, limit: int) -> bool:
+        if self._in_flight[key] >= limit:
+            return False
+        self._in_flight[key] += 1
+        return True
+
+    def release(self, key: str) -> None:
+        self._in_flight[key] -= 1
+        if self._in_flight[key] <= 0:
+            del self._in_flight[key]
+
+
+def retry_after_header(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+if settings.rate_limit_backend == "postgres":
+    bucket_store = PostgresBucketStore()
+else:
+    bucket_store = MemoryBucketStore(settings.rate_limit_max_keys)
+
+concurrency_limiter = ConcurrencyLimiter()
@@ -0,0 +1,142 @@
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Tuple,
+)
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.events import presence_broker
+from app.core.metrics import (
+    RESPONSE_CACHE_ENTRIES,
+    RESPONSE_CACHE_EVICTIONS,
+    RESPONSE_CACHE_LOOKUPS,
+)
+from app.core.single_flight import SingleFlight
+
+
+class DataVersions:
+    """Counters bumped whenever time data of an organization changes.
+
+    Cache keys include the version they were computed at, so a bump makes
+    older entries unreachable; they age out of the LRU.
+    """
+
+    def __init__(self):
+        self._organizations: Dict[str, int] = defaultdict(int)
+        self._all = 0
+
+    def bump(self, organization_id: Optional[str] = None) -> None:
+        self._all += 1
+        if organization_id:
+            self._organizations[str(organization_id)] += 1
+
+    def current(self, organization_id: Optional[str] = None) -> int:
+        """Version of one organization's data, or of every organization's"""
+        if organization_id is None:
+            return self._all
+        return self._organizations.get(str(organization_id), 0)
+
+    def key(self, organization_ids: Optional[Iterable[str]]) -> Hashable:
+        """Cache key part for data of these organizations (None: of all), so
+        changes elsewhere leave the entry reachable"""
+        if organization_ids is None:
+            return self._all
+        return tuple(
+            sorted((str(id), self.current(id)) for id in set(organization_ids))
+        )
+
+
+def _normalize(value: Any) -> Hashable:
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).isoformat()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted({_normalize(item) for item in value}))
+    return value
+
+
+def request_key(model: BaseModel) -> Tuple:
+    """Hashable key for a filter or request model; the same filters give the
+    same key regardless of list order or timezone offset"""
+    return (type(model).__name__,) + tuple(
+        sorted((name, _normalize(value)) for name, value in model.model_dump().items())
+    )
+
+
+class ResponseCache:
+    """Size-bounded LRU of computed responses with a TTL.
+
+    Concurrent misses for the same key share one computation.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (value, expires at)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._flights = SingleFlight()
+
+    async def get_or_compute(
+        self, key: Hashable, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        if not settings.response_cache_enabled or self.max_entries <= 0:
+            return await compute()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            RESPONSE_CACHE_LOOKUPS.labels(self.name, "hit").inc()
+            return entry[0]
+
+        value, shared = await self._flights.do(key, compute)
+        if shared:
+            RESPONSE_CACHE_LOOKUPS.labels(self.name, "coalesced").inc()
+            return value
+
+        RESPONSE_CACHE_LOOKUPS.labels(self.name, "miss").inc()
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            RESPONSE_CACHE_EVICTIONS.labels(self.name).inc()
+        RESPONSE_CACHE_ENTRIES.labels(self.name).set(len(self._entries))
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        RESPONSE_CACHE_ENTRIES.labels(self.name).set(0)
+
+
+data_versions = DataVersions()
+
+# Clock-ins, clock-outs, breaks and auto clock-outs reach every worker through
+# the presence feed (when bridged), so each one invalidates its own entries
+presence_broker.add_listener(
+    lambda organization_id, event: data_versions.bump(organization_id)
+)
+
+employee_summary_cache = ResponseCache(
+    "employee_summary",
+    settings.response_cache_max_entries,
+    settings.response_cache_ttl_seconds,
+)
+time_report_cache = ResponseCache(
+    "time_report",
+    settings.response_cache_max_entries,
+    settings.response_cache_ttl_seconds,
+)
+time_report_aggregate_cache = ResponseCache(
+    "time_report_aggregate",
+    settings.response_cache_max_entries,
+    settings.response_cache_ttl_seconds,
+)
@@ -1,7 +1,11 @@
 from passlib.context import CryptContext
 from datetime import timedelta, datetime, timezone
 from app.core.config import settings
-from jose import jwt
+from app.core.metrics import BCRYPT_QUEUE_DEPTH
+from app.core.tokens import current_claims, token_verifier
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import bcrypt
 import os
 
@@ -13,6 +17,26 @@ pwd_context = CryptContext(
     bcrypt__ident="2b",
 )
 
+# bcrypt is deliberately slow; run it off the event loop on a bounded pool
+bcrypt_executor = ThreadPoolExecutor(
+    max_workers=settings.bcrypt_max_workers, thread_name_prefix="bcrypt"
+)
+
+
+async def _run_bcrypt(func, *args):
+    BCRYPT_QUEUE_DEPTH.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            bcrypt_executor, func, *args
+        )
+    finally:
+        BCRYPT_QUEUE_DEPTH.dec()
+
+
+# Bump when the meaning of authorization claims changes; older tokens then
+# stop short-circuiting permission checks
+CLAIMS_VERSION = 1
+
 
 class Security:
     @staticmethod
@@ -25,12 +49,23 @@ class Security:
             plain_password.encode("utf-8"), hashed_password.encode("utf-8")
         )
 
+    @staticmethod
+    async def hash_password(password: str) -> str:
+        return await _run_bcrypt(Security.get_password_hash, password)
+
+    @staticmethod
+    async def check_password(plain_password: str, hashed_password: str) -> bool:
+        return await _run_bcrypt(
+            Security.verify_password, plain_password, hashed_password
+        )
+
     @staticmethod
     def create_access_token(
         data: dict,
         expires_delta: timedelta = timedelta(
             minutes=int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES"))
         ),
+        organization_ids: Optional[List[str]] = None,
     ):
         # Handle both users and employees
         role = getattr(
@@ -43,14 +78,18 @@ class Security:
             "id": data.id,
             "role": role,
             "account_type": account_type,
+            "ver": getattr(data, "token_version", None) or 0,
+            "cv": CLAIMS_VERSION,
         }
+        # Authorization claims; services still fall back to the DB when a
+        # claim doesn't grant access (e.g. an organization created later)
+        if account_type == "employee":
+            token_data["organization_id"] = data.organization_id
+        elif organization_ids is not None:
+            token_data["org_ids"] = organization_ids
         expire = datetime.now(timezone.utc) + expires_delta
         token_data.update({"exp": expire})
-        encoded_jwt = jwt.encode(
-            token_data,
-            os.getenv("JWT_SECRET_KEY"),
-            algorithm=os.getenv("JWT_ALGORITHM"),
-        )
+        encoded_jwt = token_verifier.sign(token_data)
         return encoded_jwt
 
     @staticmethod
@@ -66,18 +105,33 @@ class Security:
             "user_id": data.id,
             "role": role,
             "account_type": account_type,
+            "ver": getattr(data, "token_version", None) or 0,
         }
         expire = datetime.now(timezone.utc) + expires_delta
         token_data.update({"exp": expire})
-        encoded_jwt = jwt.encode(
-            token_data,
-            os.getenv("JWT_SECRET_KEY"),
-            algorithm=os.getenv("JWT_ALGORITHM"),
-        )
+        encoded_jwt = token_verifier.sign(token_data)
         return encoded_jwt
 
     @staticmethod
     def verify_token(token: str) -> dict:
-        return jwt.decode(
-            token, os.getenv("JWT_SECRET_KEY"), algorithms=[os.getenv("JWT_ALGORITHM")]
+        return token_verifier.verify(token)
+
+    @staticmethod
+    def revoke_tokens(account) -> None:
+        """Invalidate every token issued so far to a user or employee"""
+        account.token_version = (account.token_version or 0) + 1
+
+    @staticmethod
+    def claims_allow(user_id: str, organization_id: Optional[str] = None) -> bool:
+        """True if the current request's token proves `user_id` is an admin or
+        manages `organization_id`, so no DB lookup is needed"""
+        claims = current_claims.get()
+        if not claims or claims.get("cv") != CLAIMS_VERSION:
+            return False
+        if claims.get("id") != user_id or claims.get("account_type") != "user":
+            return False
+        if claims.get("role") == "admin":
+            return True
+        return organization_id is not None and organization_id in claims.get(
+            "org_ids", ()
         )
@@ -0,0 +1,99 @@
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.metrics import SINGLE_FLIGHT_CALLS
+from app.db.database import Base
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one.
+
+    The first caller runs the function; callers arriving while it runs wait
+    for its result (or exception) instead of repeating the work. If the
+    running call is cancelled, a waiting caller takes over and runs it again.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Run `fn` once per key at a time; returns (result, shared)"""
+        while True:
+            call = self._calls.get(key)
+            if call is None:
+                break
+            try:
+                return await asyncio.shield(call), True
+            except asyncio.CancelledError:
+                if not call.cancelled():
+                    raise
+                # The caller running it went away; try again ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody may be waiting; don't log it as never retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+async def _adopt(db: AsyncSession, value: Any) -> Any:
+    """Merge ORM objects loaded by another session into `db`, without a query"""
+    if isinstance(value, Base):
+        return await db.merge(value, load=False)
+    if isinstance(value, (list, tuple)):
+        return type(value)([await _adopt(db, item) for item in value])
+    return value
+
+
+def single_flight(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Decorator for read-only service methods taking a `db` session.
+
+    Concurrent calls with the same arguments share one query; the waiting
+    callers get the rows merged into their own session. Only use it where no
+    caller modifies the returned objects.
+    """
+    flights = SingleFlight()
+    signature = inspect.signature(fn)
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        db = bound.arguments["db"]
+        if not settings.single_flight_enabled or db.new or db.dirty or db.deleted:
+            return await fn(*args, **kwargs)
+
+        key = tuple(
+            (parameter, value)
+            for parameter, value in bound.arguments.items()
+            if parameter != "db"
+        )
+        result, shared = await flights.do(key, lambda: fn(*args, **kwargs))
+        SINGLE_FLIGHT_CALLS.labels(name, "shared" if shared else "leader").inc()
+        if shared:
+            result = await _adopt(db, result)
+        return result
+
+    return wrapper
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterable, List, Set
+import boto3
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCREENSHOT_PREFIX = "screenshots/"
+
+# S3 accepts at most this many keys per DeleteObjects call
+MAX_DELETE_KEYS = 1000
+
+# boto3 blocks; storage calls made outside request presigning run here
+storage_executor = ThreadPoolExecutor(
+    max_workers=settings.storage_max_workers, thread_name_prefix="storage"
+)
+
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """Create the S3 client once and reuse it for every presign"""
+    return boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION"),
+        # Set for S3-compatible storage (MinIO, the benchmark fleet's stand-in)
+        endpoint_url=os.getenv("AWS_S3_ENDPOINT_URL"),
+    )
+
+
+def screenshot_key(path: str) -> str:
+    return SCREENSHOT_PREFIX + path
+
+
+def _delete_keys(bucket: str, keys: List[str]) -> Set[str]:
+    response = get_s3_client().delete_objects(
+        Bucket=bucket,
+        Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+    )
+    failed = {error["Key"] for error in response.get("Errors", [])}
+    for error in response.get("Errors", [])[:3]:
+        logger.warning(f"Failed to delete {error['Key']}: {error.get('Message')}")
+    return set(keys) - failed
+
+
+async def delete_objects(keys: Iterable[str]) -> Set[str]:
+    """Delete up to MAX_DELETE_KEYS objects in one request; returns the keys
+    that are gone. Missing objects count as deleted. Without a configured
+    bucket nothing was ever uploaded, so every key counts as deleted."""
+    keys = list(dict.fromkeys(keys))
+    bucket = os.getenv("AWS_S3_BUCKET")
+    if not bucket or not keys:
+        return set(keys)
+    if len(keys) > MAX_DELETE_KEYS:
+        raise ValueError(f"At most {MAX_DELETE_KEYS} keys per request")
+    return await asyncio.get_running_loop().run_in_executor(
+        storage_executor, _delete_keys, bucket, keys
+    )
@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from app.core.config import settings
+from app.core.metrics import TOKEN_VERIFICATIONS
+
+logger = logging.getLogger(__name__)
+
+# Claims of the access token that authenticated the current request
+current_claims: ContextVar[Optional[dict]] = ContextVar("current_claims", default=None)
+
+
+class TokenVerifier:
+    """Signs and verifies JWTs with keys loaded once, not on every request.
+
+    HS* algorithms use `jwt_secret_key`. RS*/ES* algorithms sign with
+    `jwt_private_key_file` and verify against every `<kid>.pem` in
+    `jwt_public_keys_dir`, chosen by the token's `kid` header.
+
+    Verified payloads are kept in a small LRU keyed by the token's hash until
+    the token expires, so repeat requests skip signature checks entirely.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: Optional[str] = None,
+        signing_kid: Optional[str] = None,
+        private_key_file: Optional[str] = None,
+        public_keys_dir: Optional[str] = None,
+        cache_size: int = 10000,
+    ):
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self.signing_kid = signing_kid
+        self.private_key_file = private_key_file
+        self.public_keys_dir = public_keys_dir
+        self.cache_size = cache_size
+        self._signing_key: Optional[Key] = None
+        self._keys: Dict[Optional[str], Key] = {}
+        self._cache: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self.load_keys()
+
+    @classmethod
+    def from_settings(cls) -> "TokenVerifier":
+        return cls(
+            algorithm=settings.jwt_algorithm,
+            secret_key=settings.jwt_secret_key,
+            signing_kid=settings.jwt_signing_kid,
+            private_key_file=settings.jwt_private_key_file,
+            public_keys_dir=settings.jwt_public_keys_dir,
+            cache_size=settings.jwt_verify_cache_size,
+        )
+
+    @property
+    def asymmetric(self) -> bool:
+        return not self.algorithm.startswith("HS")
+
+    def load_keys(self) -> None:
+        """(Re)read key material, e.g. after adding a key for rotation"""
+        keys: Dict[Optional[str], Key] = {}
+        if self.asymmetric:
+            if not self.private_key_file:
+                raise ValueError(f"{self.algorithm} needs JWT_PRIVATE_KEY_FILE")
+            with open(self.private_key_file) as f:
+                self._signing_key = jwk.construct(f.read(), self.algorithm)
+            keys[self.signing_kid] = self._signing_key.public_key()
+
+            if self.public_keys_dir:
+                for name in sorted(os.listdir(self.public_keys_dir)):
+                    kid, ext = os.path.splitext(name)
+                    if ext != ".pem":
+                        continue
+                    with open(os.path.join(self.public_keys_dir, name)) as f:
+                        keys[kid] = jwk.construct(f.read(), self.algorithm)
+        else:
+            if not self.secret_key:
+                raise ValueError("JWT_SECRET_KEY is not set")
+            self._signing_key = jwk.construct(self.secret_key, self.algorithm)
+            keys[self.signing_kid] = self._signing_key
+
+        self._keys = keys
+        self._cache.clear()
+        logger.info(f"Loaded {len(keys)} JWT verification key(s) for {self.algorithm}")
+
+    def sign(self, claims: dict) -> str:
+        headers = {"kid": self.signing_kid} if self.signing_kid else None
+        return jwt.encode(
+            claims, self._signing_key, algorithm=self.algorithm, headers=headers
+        )
+
+    def _key_for(self, token: str) -> Key:
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._keys.get(kid)
+        if key is None and kid is None and len(self._keys) == 1:
+            # Tokens issued before a kid was configured
+            key = next(iter(self._keys.values()))
+        if key is None:
+            raise JWTError(f"Unknown signing key: {kid}")
+        return key
+
+    def verify(self, token: str) -> dict:
+        """Return the token's claims, raising JWTError if it is not valid.
+
+        The returned dict may be shared between requests; don't modify it.
+        """
+        digest = hashlib.sha256(token.encode()).digest()
+        cached = self._cache.get(digest)
+        if cached is not None:
+            payload, expires_at = cached
+            if expires_at > time.time():
+                self._cache.move_to_end(digest)
+                TOKEN_VERIFICATIONS.labels("cached").inc()
+                return payload
+            del self._cache[digest]
+
+        payload = jwt.decode(token, self._key_for(token), algorithms=[self.algorithm])
+        TOKEN_VERIFICATIONS.labels("verified").inc()
+
+        expires_at = payload.get("exp")
+        if self.cache_size > 0 and expires_at is not None and "nbf" not in payload:
+            self._cache[digest] = (payload, float(expires_at))
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return payload
+
+
+token_verifier = TokenVerifier.from_settings()
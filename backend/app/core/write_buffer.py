@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+import asyncpg
+from fastapi import HTTPException
+from sqlalchemy import Table, insert
+from app.core.background import PeriodicTask
+from app.core.metrics import (
+    WRITE_BUFFER_BATCH_ROWS,
+    WRITE_BUFFER_DROPPED,
+    WRITE_BUFFER_FLUSH_SECONDS,
+    WRITE_BUFFER_PENDING,
+)
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer:
+    """Coalesce append-only rows and write them in batches.
+
+    Rows are flushed every `flush_interval_ms` or as soon as `batch_size` rows
+    are waiting, using COPY through the asyncpg connection and falling back to
+    a multi-row INSERT. A batch the database rejects is retried row by row, so
+    only the rows it rejects are dropped. At most `max_pending` rows are held
+    in memory; beyond that `add` rejects with 503 so clients back off and
+    retry.
+
+    Rows must carry every column in `columns` (including ids and timestamps),
+    since COPY skips server and Python-side defaults. `on_written` is called
+    with the rows of each batch once they are stored.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        columns: Sequence[str],
+        batch_size: int = 500,
+        flush_interval_ms: int = 200,
+        max_pending: int = 10000,
+        on_written: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    ):
+        self.table = table
+        self.on_written = on_written
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._rows: Deque[Dict[str, Any]] = deque()
+        self._lock = asyncio.Lock()
+        self._size_flush: Optional[asyncio.Task] = None
+        self._use_copy = True
+        self._ticker = PeriodicTask(
+            f"write-buffer-{table.name}", flush_interval_ms / 1000, self.flush
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        if len(self._rows) >= self.max_pending:
+            WRITE_BUFFER_DROPPED.labels(self.table.name).inc()
+            raise HTTPException(
+                status_code=503, detail="Server is busy, please retry shortly"
+            )
+
+        self._rows.append(row)
+        WRITE_BUFFER_PENDING.labels(self.table.name).set(len(self._rows))
+
+        if len(self._rows) >= self.batch_size and (
+            self._size_flush is None or self._size_flush.done()
+        ):
+            self._size_flush = asyncio.create_task(self._flush_logged())
+
+    def start(self) -> None:
+        self._ticker.start()
+
+    async def stop(self) -> None:
+        """Stop the timer and write everything still buffered"""
+        await self._ticker.stop()
+        if self._size_flush is not None:
+            await asyncio.gather(self._size_flush, return_exceptions=True)
+        await self.flush()
+
+    async def _flush_logged(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Flushing {self.table.name} buffer failed: {str(e)}")
+
+    async def flush(self) -> int:
+        """Write all buffered rows; returns the number of rows written"""
+        written = 0
+        async with self._lock:
+            while self._rows:
+                batch = [
+                    self._rows.popleft()
+                    for _ in range(min(self.batch_size, len(self._rows)))
+                ]
+                WRITE_BUFFER_PENDING.labels(self.table.name).set(len(self._rows))
+
+                started = time.perf_counter()
+                try:
+                    await self._write(batch)
+                except Exception as e:
+                    if self._is_transient(e):
+                        self._requeue(batch)
+                        raise
+                    # Some row is bad; write the others one at a time
+                    logger.warning(
+                        f"Batch of {len(batch)} {self.table.name} rows rejected, "
+                        f"writing them one by one: {str(e)}"
+                    )
+                    batch = await self._write_each(batch)
+
+                WRITE_BUFFER_FLUSH_SECONDS.labels(self.table.name).observe(
+                    time.perf_counter() - started
+                )
+                WRITE_BUFFER_BATCH_ROWS.labels(self.table.name).observe(len(batch))
+                written += len(batch)
+                if self.on_written is not None and batch:
+                    try:
+                        self.on_written(batch)
+                    except Exception as e:
+                        # The rows are stored; don't write them again
+                        logger.error(
+                            f"on_written failed for {len(batch)} "
+                            f"{self.table.name} rows: {str(e)}"
+                        )
+        return written
+
+    async def _write_each(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert rows one per transaction; returns the rows written.
+
+        Rows the database rejects are dropped, since retrying them would block
+        every row queued behind them. On a transient error the rows not yet
+        written go back in the buffer.
+        """
+        written = []
+        async with engine.connect() as conn:
+            for i, row in enumerate(batch):
+                try:
+                    await conn.execute(
+                        insert(self.table),
+                        {column: row.get(column) for column in self.columns},
+                    )
+                    await conn.commit()
+                except Exception as e:
+                    if self._is_transient(e):
+                        self._requeue(batch[i:])
+                        raise
+                    await conn.rollback()
+                    WRITE_BUFFER_DROPPED.labels(self.table.name).inc()
+                    logger.error(f"Dropped a {self.table.name} row: {str(e)}")
+                    continue
+                written.append(row)
+        return written
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        return isinstance(
+            error,
+            (
+                OSError,
+                asyncio.TimeoutError,
+                asyncpg.PostgresConnectionError,
+                asyncpg.InterfaceError,
+            ),
+        ) or getattr(error, "connection_invalidated", False)
+
+    def _requeue(self, batch: List[Dict[str, Any]]) -> None:
+        """Put a failed batch back in front, dropping what no longer fits"""
+        room = max(self.max_pending - len(self._rows), 0)
+        if room < len(batch):
+            WRITE_BUFFER_DROPPED.labels(self.table.name).inc(len(batch) - room)
+            logger.error(
+                f"Dropped {len(batch) - room} {self.table.name} rows after a failed flush"
+            )
+        self._rows.extendleft(reversed(batch[:room]))
+        WRITE_BUFFER_PENDING.labels(self.table.name).set(len(self._rows))
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        async with engine.connect() as conn:
+            if self._use_copy:
+                try:
+                    raw = await conn.get_raw_connection()
+                    await raw.driver_connection.copy_records_to_table(
+                        self.table.name,
+                        records=[
+                            tuple(row.get(column) for column in self.columns)
+                            for row in batch
+                        ],
+                        columns=self.columns,
+                    )
+                    return
+                except AttributeError:
+                    # Not running on asyncpg; use INSERT from now on
+                    self._use_copy = False
+
+            await conn.execute(
+                insert(self.table),
+                [{column: row.get(column) for column in self.columns} for row in batch],
+            )
+            await conn.commit()
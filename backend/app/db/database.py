@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import text
 from app.core.config import settings
+from app.db.instrumentation import InstrumentedPool, instrument_engine
 import logging
 import os
 from dotenv import load_dotenv
@@ -23,7 +24,9 @@ engine = create_async_engine(
     echo=False,  # Set to True for SQL query logging
     pool_pre_ping=True,
     pool_recycle=300,
+    poolclass=InstrumentedPool,
 )
+instrument_engine(engine.sync_engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -0,0 +1,98 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.metrics import (
+    DB_COMPILED_CACHE,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_IN_USE,
+    DB_STATEMENT_SECONDS,
+)
+
+
+@dataclass
+class QueryStats:
+    """Statements run while handling one request"""
+
+    count: int = 0
+    seconds: float = 0.0
+    # Executions per statement text; only collected when query_debug is on
+    statements: Optional[Counter] = None
+
+    def record(self, statement: str, elapsed: float = 0.0) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        if self.statements is not None:
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements run at least `threshold` times, usually an N+1 loop"""
+        if not self.statements:
+            return []
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+# Set by the metrics middleware for the duration of a request
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+_CACHE_RESULTS = {
+    CacheStats.CACHE_HIT: "hit",
+    CacheStats.CACHE_MISS: "miss",
+    CacheStats.CACHING_DISABLED: "disabled",
+    CacheStats.NO_CACHE_KEY: "no_key",
+    CacheStats.NO_DIALECT_SUPPORT: "unsupported",
+}
+
+
+def _record_compiled_cache(context) -> None:
+    """Count whether the statement's SQL came from the compiled cache. Plain
+    text() and driver-level statements have no cache key."""
+    result = _CACHE_RESULTS.get(getattr(context, "cache_hit", None))
+    if result is not None:
+        DB_COMPILED_CACHE.labels(result).inc()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_started")
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    DB_STATEMENT_SECONDS.labels(operation).observe(elapsed)
+    if context is not None:
+        _record_compiled_cache(context)
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach statement timing and pool gauges to a (sync) engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    DB_POOL_IN_USE.set_function(lambda: engine.pool.checkedout())
@@ -0,0 +1,92 @@
+"""Add columns and indexes the models gained to an existing database.
+
+create_all() at startup only creates missing tables, so tables created by an
+older version lack later columns (users.token_version, organizations.timezone,
+time_tracking.last_heartbeat_at, ...) and indexes. This compares every table
+that exists with its model and adds what is missing:
+
+    python -m app.db.migrate_columns --dry-run   # print the SQL
+    python -m app.db.migrate_columns
+
+Run it after migrate_uuid (new foreign keys are uuid columns). Every
+statement is idempotent (ADD COLUMN / CREATE INDEX IF NOT EXISTS), so it is
+safe to repeat, and missing tables are created as at startup. NOT NULL
+columns are added with their server default; one without a default is added
+as nullable, since existing rows have no value for it.
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from app.db.database import Base, engine
+from app.db.trigram import is_trigram_index, trigrams_available
+import app.models  # noqa: F401  register every table
+
+
+def plan(sync_conn) -> List[str]:
+    """SQL adding the model columns and indexes missing from existing tables"""
+    dialect = sync_conn.dialect
+    inspector = inspect(sync_conn)
+    quote = dialect.identifier_preparer.quote
+    existing = set(inspector.get_table_names())
+    trigrams = trigrams_available(sync_conn)
+
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in columns or column.primary_key:
+                continue
+            definition = str(CreateColumn(column).compile(dialect=dialect))
+            if not column.nullable and column.server_default is None:
+                definition = definition.replace(" NOT NULL", "")
+            for foreign_key in column.foreign_keys:
+                definition += (
+                    f" REFERENCES {quote(foreign_key.column.table.name)} "
+                    f"({quote(foreign_key.column.name)})"
+                )
+            statements.append(
+                f"ALTER TABLE {quote(table.name)} ADD COLUMN IF NOT EXISTS {definition}"
+            )
+
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        statements += [
+            str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+            for index in sorted(table.indexes, key=lambda index: index.name)
+            if index.name not in indexes and (trigrams or not is_trigram_index(index))
+        ]
+    return [statement.strip() for statement in statements]
+
+
+async def migrate(dry_run: bool) -> int:
+    async with engine.begin() as conn:
+        if not dry_run:
+            # New columns can reference new tables (screenshots.app_id)
+            await conn.run_sync(Base.metadata.create_all)
+        statements = await conn.run_sync(plan)
+        for statement in statements:
+            print(f"{statement};")
+            if not dry_run:
+                await conn.execute(text(statement))
+    await engine.dispose()
+    if not statements:
+        print("Every existing table matches the models")
+    elif not dry_run:
+        print(f"Applied {len(statements)} statements")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Add missing columns and indexes")
+    parser.add_argument("--dry-run", action="store_true", help="only print the SQL")
+    options = parser.parse_args(argv)
+    return asyncio.run(migrate(options.dry_run))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
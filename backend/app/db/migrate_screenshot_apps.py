@@ -0,0 +1,131 @@
+"""Add the screenshot app catalog and trigram indexes to an existing database.
+
+create_all() only creates missing tables, so databases created before the
+catalog lack screenshots.app_id and the pg_trgm indexes on app and os. This
+adds them, fills screenshot_apps with every distinct app name per
+organization, and links existing screenshots to it, one partition at a time.
+
+    python -m app.db.migrate_screenshot_apps --dry-run   # print the DDL
+    python -m app.db.migrate_screenshot_apps
+
+Every statement is idempotent, so an interrupted run can be repeated. The
+indexes are built without CONCURRENTLY (partitioned tables don't support
+it) and block writes to screenshots while they build. On a server without
+pg_trgm the trigram indexes are left out.
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List
+from sqlalchemy import inspect, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.db.database import engine
+from app.db.partitions import is_partitioned, list_partitions
+from app.db.trigram import is_trigram_index, trigrams_available
+from app.models.screenshot import Screenshot
+from app.models.screenshot_app import ScreenshotApp
+from app.utils.ids import new_id
+import app.models  # noqa: F401  register every table
+
+INSERT_BATCH = 1000
+
+
+def plan(sync_conn) -> List[str]:
+    """DDL bringing screenshots and screenshot_apps up to the models"""
+    dialect = sync_conn.dialect
+    inspector = inspect(sync_conn)
+    trigrams = trigrams_available(sync_conn)
+    if not trigrams:
+        print("-- pg_trgm is not available; skipping the trigram indexes")
+
+    def create_indexes(table) -> List[str]:
+        return [
+            str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+            for index in table.indexes
+            if trigrams or not is_trigram_index(index)
+        ]
+
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] if trigrams else []
+    if not inspector.has_table(ScreenshotApp.__tablename__):
+        statements.append(
+            str(CreateTable(ScreenshotApp.__table__).compile(dialect=dialect))
+        )
+    statements += create_indexes(ScreenshotApp.__table__)
+    statements.append(
+        f"ALTER TABLE {Screenshot.__tablename__} ADD COLUMN IF NOT EXISTS app_id "
+        f"uuid REFERENCES {ScreenshotApp.__tablename__} (id)"
+    )
+    statements += create_indexes(Screenshot.__table__)
+    return [statement.strip() for statement in statements]
+
+
+async def fill_catalog(conn) -> int:
+    """Add every organization's distinct app names not in the catalog yet"""
+    result = await conn.execute(
+        select(Screenshot.organization_id, Screenshot.app)
+        .where(Screenshot.app_id.is_(None), Screenshot.app != "")
+        .distinct()
+    )
+    names = [
+        {"id": new_id(), "organization_id": organization_id, "name": name}
+        for organization_id, name in result.all()
+    ]
+    for start in range(0, len(names), INSERT_BATCH):
+        await conn.execute(
+            insert(ScreenshotApp)
+            .values(names[start : start + INSERT_BATCH])
+            .on_conflict_do_nothing()
+        )
+    return len(names)
+
+
+async def link_screenshots(conn, table: str) -> int:
+    result = await conn.execute(text(f"""
+            UPDATE {table} AS s SET app_id = a.id
+            FROM {ScreenshotApp.__tablename__} AS a
+            WHERE s.app_id IS NULL
+              AND a.organization_id = s.organization_id
+              AND a.name = s.app
+            """))
+    return result.rowcount
+
+
+async def migrate(dry_run: bool) -> int:
+    async with engine.begin() as conn:
+        statements = await conn.run_sync(plan)
+        for statement in statements:
+            print(f"{statement};")
+            if not dry_run:
+                await conn.execute(text(statement))
+    if dry_run:
+        await engine.dispose()
+        return 0
+
+    async with engine.begin() as conn:
+        print(f"Added {await fill_catalog(conn)} app names to the catalog")
+        table = Screenshot.__tablename__
+        if await is_partitioned(conn, table):
+            tables = [
+                partition.name for partition in await list_partitions(conn, table)
+            ]
+        else:
+            tables = [table]
+    for table in tables:
+        # One transaction per partition keeps row locks short
+        async with engine.begin() as conn:
+            print(f"{table}: linked {await link_screenshots(conn, table)} screenshots")
+    await engine.dispose()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Add the screenshot app catalog")
+    parser.add_argument("--dry-run", action="store_true", help="only print the DDL")
+    options = parser.parse_args(argv)
+    return asyncio.run(migrate(options.dry_run))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
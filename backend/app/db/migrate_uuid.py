@@ -0,0 +1,101 @@
+"""Convert text primary and foreign keys to native UUID columns in place.
+
+Databases created before keys became UUIDString still have varchar ID
+columns. This converts every column the models declare as UUIDString and
+keeps the existing values, so IDs held by clients and tokens stay valid;
+only new rows get time-ordered IDs.
+
+    python -m app.db.migrate_uuid --dry-run   # print the SQL
+    python -m app.db.migrate_uuid             # apply it
+
+Everything runs in one transaction. Each table is rewritten once, which
+locks it for the duration, so large screenshots/time_tracking tables need a
+maintenance window.
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Dict, List, Set, Tuple
+from sqlalchemy import inspect, text
+from app.db.database import Base, engine
+from app.db.types import UUIDString
+import app.models  # noqa: F401  register every table
+
+
+def plan(sync_conn) -> List[str]:
+    """SQL statements converting the UUIDString columns still stored as text"""
+    inspector = inspect(sync_conn)
+    quote = sync_conn.dialect.identifier_preparer.quote
+    existing = set(inspector.get_table_names())
+
+    pending: Dict[str, List[str]] = {}
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        types = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if not isinstance(column.type, UUIDString) or column.name not in types:
+                continue
+            if types[column.name].__visit_name__.lower() != "uuid":
+                pending.setdefault(table.name, []).append(column.name)
+    if not pending:
+        return []
+
+    converted: Set[Tuple[str, str]] = {
+        (table, column) for table, columns in pending.items() for column in columns
+    }
+    foreign_keys = []
+    for table in sorted(existing):
+        for fk in inspector.get_foreign_keys(table):
+            columns = {(table, c) for c in fk["constrained_columns"]}
+            columns |= {(fk["referred_table"], c) for c in fk["referred_columns"]}
+            if columns & converted:
+                foreign_keys.append((table, fk))
+
+    statements = [
+        f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(fk['name'])}"
+        for table, fk in foreign_keys
+    ]
+    for table, columns in pending.items():
+        alterations = ", ".join(
+            f"ALTER COLUMN {quote(c)} TYPE uuid USING {quote(c)}::uuid" for c in columns
+        )
+        statements.append(f"ALTER TABLE {quote(table)} {alterations}")
+    for table, fk in foreign_keys:
+        ondelete = fk.get("options", {}).get("ondelete")
+        statements.append(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(fk['name'])} "
+            f"FOREIGN KEY ({', '.join(quote(c) for c in fk['constrained_columns'])}) "
+            f"REFERENCES {quote(fk['referred_table'])} "
+            f"({', '.join(quote(c) for c in fk['referred_columns'])})"
+            + (f" ON DELETE {ondelete}" if ondelete else "")
+        )
+    return statements
+
+
+async def migrate(dry_run: bool) -> int:
+    async with engine.begin() as conn:
+        statements = await conn.run_sync(plan)
+        if not statements:
+            print("All ID columns are already native UUIDs")
+            return 0
+        for statement in statements:
+            print(f"{statement};")
+            if not dry_run:
+                await conn.execute(text(statement))
+    await engine.dispose()
+    if not dry_run:
+        print(f"Applied {len(statements)} statements")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert text IDs to native UUIDs")
+    parser.add_argument("--dry-run", action="store_true", help="only print the SQL")
+    options = parser.parse_args(argv)
+    return asyncio.run(migrate(options.dry_run))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,443 @@
+"""Monthly range partitions for the high-volume tables.
+
+screenshots (by created_at) and time_tracking (by clock_in) are declared
+PARTITION BY RANGE with a DEFAULT partition for rows outside the months that
+exist. maintain() creates the months ahead and detaches or drops months past
+retention, so expiring a month is one DDL statement instead of a mass DELETE.
+The app runs it at startup and every partition_maintenance_interval_seconds.
+
+    python -m app.db.partitions list
+    python -m app.db.partitions maintain [--dry-run]
+    python -m app.db.partitions convert   # partition tables created before
+
+Tables without a foreign key to a partitioned parent (a partitioned table
+can't be referenced by id alone) declare it with expires_with(); their rows
+are deleted along with an expiring month, or moved next to a detached one.
+
+convert renames an existing unpartitioned table to <table>_legacy and
+attaches it as one partition covering everything up to the next month, so
+existing rows are not copied; the legacy partition is dropped like any other
+once all of it is past retention.
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.db.database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+# Any constant works; it only keeps two workers from maintaining at once
+MAINTENANCE_LOCK_ID = 0x6D6F6D70
+
+_BOUNDS = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def monthly_partitions(key: str) -> dict:
+    """__table_args__ for a table partitioned by month on `key`"""
+    return {
+        "postgresql_partition_by": f"RANGE ({key})",
+        "info": {"partition_key": key},
+    }
+
+
+def expires_with(parent: str, column: str) -> dict:
+    """__table_args__ for a table whose `column` holds ids of `parent` rows"""
+    return {"info": {"expires_with": (parent, column)}}
+
+
+def dependent_tables(parent: str) -> List[Tuple[str, str]]:
+    """(table, column) of every table declared expires_with(parent)"""
+    return [
+        (table.name, table.info["expires_with"][1])
+        for table in Base.metadata.sorted_tables
+        if table.info.get("expires_with", (None,))[0] == parent
+    ]
+
+
+def partitioned_tables() -> Dict[str, str]:
+    """Table name -> partition key column"""
+    return {
+        table.name: table.info["partition_key"]
+        for table in Base.metadata.sorted_tables
+        if "partition_key" in table.info
+    }
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_default_partitions(target, connection, tables=(), **kw):
+    for table in tables:
+        if "partition_key" in table.info:
+            connection.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {table.name}_default "
+                    f"PARTITION OF {table.name} DEFAULT"
+                )
+            )
+
+
+def month_start(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _literal(value: datetime) -> str:
+    return f"'{value.isoformat()}'"
+
+
+@dataclass
+class Partition:
+    name: str
+    lower: Optional[datetime]  # None for MINVALUE
+    upper: Optional[datetime]  # None for MAXVALUE
+    is_default: bool = False
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+async def is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    kind = await conn.scalar(
+        text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    )
+    return kind == "p"
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> List[Partition]:
+    rows = await conn.execute(
+        text("""
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(:table)
+            ORDER BY child.relname
+            """),
+        {"table": table},
+    )
+    partitions = []
+    for name, bound in rows.all():
+        if bound == "DEFAULT":
+            partitions.append(Partition(name, None, None, is_default=True))
+            continue
+        lower, upper = _BOUNDS.search(bound).groups()
+        partitions.append(Partition(name, _parse_bound(lower), _parse_bound(upper)))
+    return partitions
+
+
+def _overlaps(partition: Partition, lower: datetime, upper: datetime) -> bool:
+    if partition.is_default:
+        return False
+    return (partition.lower is None or partition.lower < upper) and (
+        partition.upper is None or partition.upper > lower
+    )
+
+
+async def create_month(
+    conn: AsyncConnection, table: str, key: str, month: datetime
+) -> Optional[str]:
+    """Create the partition for `month` unless one covers it already. Rows
+    for that month sitting in the default partition are moved into it."""
+    lower, upper = month, add_months(month, 1)
+    partitions = await list_partitions(conn, table)
+    if any(_overlaps(p, lower, upper) for p in partitions):
+        return None
+
+    name = partition_name(table, month)
+    bounds = f"FROM ({_literal(lower)}) TO ({_literal(upper)})"
+    default = next((p.name for p in partitions if p.is_default), None)
+    in_range = f"{key} >= {_literal(lower)} AND {key} < {_literal(upper)}"
+    stranded = default and await conn.scalar(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})")
+    )
+    if not stranded:
+        await conn.execute(
+            text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}")
+        )
+        return name
+
+    await conn.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    moved = await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        )
+    )
+    await conn.execute(
+        text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+    )
+    logger.info(f"Moved {moved.rowcount} rows from {default} into {name}")
+    return name
+
+
+async def ensure_months(
+    conn: AsyncConnection, start: datetime, end: datetime
+) -> List[str]:
+    """Create monthly partitions of every partitioned table from `start` to `end`"""
+    created = []
+    for table, key in partitioned_tables().items():
+        if not await is_partitioned(conn, table):
+            continue
+        month = month_start(start)
+        while month <= end:
+            name = await create_month(conn, table, key, month)
+            if name:
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+async def expired_partitions(
+    conn: AsyncConnection, table: str, before: datetime
+) -> List[Partition]:
+    """Partitions whose rows all predate `before`"""
+    return [
+        partition
+        for partition in await list_partitions(conn, table)
+        if not partition.is_default
+        and partition.upper is not None
+        and partition.upper <= before
+    ]
+
+
+async def detach_partition(
+    conn: AsyncConnection, table: str, name: str, drop: bool = True
+) -> None:
+    await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    if drop:
+        await conn.execute(text(f"DROP TABLE {name}"))
+
+
+async def expire_dependents(
+    conn: AsyncConnection, table: str, partition: str, drop: bool = True
+) -> None:
+    """Delete the rows of dependent tables that belong to `partition`'s rows,
+    or with drop=False move them into <partition>_<dependent> beside it"""
+    for dependent, column in dependent_tables(table):
+        rows = f"DELETE FROM {dependent} WHERE {column} IN (SELECT id FROM {partition})"
+        if drop:
+            result = await conn.execute(text(rows))
+        else:
+            archive = f"{partition}_{dependent}"
+            await conn.execute(
+                text(f"CREATE TABLE IF NOT EXISTS {archive} (LIKE {dependent})")
+            )
+            result = await conn.execute(
+                text(
+                    f"WITH moved AS ({rows} RETURNING *) "
+                    f"INSERT INTO {archive} SELECT * FROM moved"
+                )
+            )
+        logger.info(
+            f"{'Deleted' if drop else 'Moved'} {result.rowcount} {dependent} rows "
+            f"of {partition}"
+        )
+
+
+async def expire_months(
+    conn: AsyncConnection, table: str, before: datetime, drop: bool = True
+) -> List[str]:
+    """Detach (and drop) every partition whose rows all predate `before`,
+    along with the rows that depend on them"""
+    expired = []
+    for partition in await expired_partitions(conn, table, before):
+        await expire_dependents(conn, table, partition.name, drop)
+        await detach_partition(conn, table, partition.name, drop)
+        expired.append(partition.name)
+    return expired
+
+
+def retention_months() -> Dict[str, int]:
+    # Screenshot months also hold stored objects, so the archival job in
+    # retention_service drops them once the objects are purged
+    return {"time_tracking": settings.time_tracking_partition_retention_months}
+
+
+async def maintain(conn: AsyncConnection, now: Optional[datetime] = None) -> Dict:
+    """Create upcoming months and expire the ones past retention"""
+    locked = await conn.scalar(
+        text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}
+    )
+    if not locked:
+        return {"created": [], "expired": [], "skipped": "locked"}
+
+    current = month_start(now or datetime.now(timezone.utc))
+    created = await ensure_months(
+        conn, current, add_months(current, settings.partition_months_ahead)
+    )
+    expired = []
+    for table, months in retention_months().items():
+        if months <= 0 or not await is_partitioned(conn, table):
+            continue
+        expired += await expire_months(
+            conn,
+            table,
+            add_months(current, -months),
+            drop=not settings.partition_detach_only,
+        )
+    return {"created": created, "expired": expired}
+
+
+async def run_maintenance() -> None:
+    async with engine.begin() as conn:
+        result = await maintain(conn)
+    if result["created"] or result["expired"]:
+        logger.info(
+            f"Partitions created: {result['created']}, expired: {result['expired']}"
+        )
+
+
+partition_maintainer = PeriodicTask(
+    "partition-maintenance",
+    settings.partition_maintenance_interval_seconds,
+    run_maintenance,
+)
+
+
+async def convert(conn: AsyncConnection, table: str) -> bool:
+    """Turn an unpartitioned table into a partitioned one in place"""
+    if await is_partitioned(conn, table) or await conn.scalar(
+        text("SELECT to_regclass(:table) IS NULL"), {"table": table}
+    ):
+        return False
+
+    legacy = f"{table}_legacy"
+    key = partitioned_tables()[table]
+    # Foreign keys can't point at a partitioned table's non-unique `id`
+    for table_name, constraint in (
+        await conn.execute(
+            text(
+                "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+                "WHERE contype = 'f' AND confrelid = to_regclass(:t)"
+            ),
+            {"t": table},
+        )
+    ).all():
+        await conn.execute(
+            text(f"ALTER TABLE {table_name} DROP CONSTRAINT {constraint}")
+        )
+    # A partition's primary key must include the partition key as well
+    primary_key = await conn.scalar(
+        text(
+            "SELECT conname FROM pg_constraint "
+            "WHERE contype = 'p' AND conrelid = to_regclass(:t)"
+        ),
+        {"t": table},
+    )
+    await conn.execute(
+        text(
+            f"ALTER TABLE {table} ALTER COLUMN {key} SET NOT NULL, "
+            f"DROP CONSTRAINT {primary_key}, "
+            f"ADD CONSTRAINT {primary_key}_legacy PRIMARY KEY (id, {key})"
+        )
+    )
+    # Names of constraints and indexes must be free for the new parent
+    for (name,) in (
+        await conn.execute(
+            text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:t)"),
+            {"t": table},
+        )
+    ).all():
+        if not name.endswith("_legacy"):
+            await conn.execute(
+                text(f"ALTER TABLE {table} RENAME CONSTRAINT {name} TO {name}_legacy")
+            )
+    for (name,) in (
+        await conn.execute(
+            text(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE tablename = :t AND schemaname = current_schema()"
+            ),
+            {"t": table},
+        )
+    ).all():
+        if not name.endswith("_legacy"):
+            await conn.execute(text(f"ALTER INDEX {name} RENAME TO {name}_legacy"))
+    await conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+
+    await conn.run_sync(lambda sync_conn: Base.metadata.tables[table].create(sync_conn))
+    await conn.execute(
+        text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    )
+    upper = add_months(month_start(datetime.now(timezone.utc)), 1)
+    newest = await conn.scalar(text(f"SELECT max({key}) FROM {legacy}"))
+    if newest is not None and newest >= upper:
+        upper = add_months(month_start(newest), 1)
+    await conn.execute(
+        text(
+            f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+            f"FOR VALUES FROM (MINVALUE) TO ({_literal(upper)})"
+        )
+    )
+    return True
+
+
+async def main_async(options) -> int:
+    import app.models  # noqa: F401  register every table
+
+    async with engine.begin() as conn:
+        if options.command == "convert":
+            for table in partitioned_tables():
+                converted = await convert(conn, table)
+                print(f"{table}: {'converted' if converted else 'nothing to do'}")
+            await ensure_months(
+                conn,
+                datetime.now(timezone.utc),
+                add_months(
+                    month_start(datetime.now(timezone.utc)),
+                    settings.partition_months_ahead,
+                ),
+            )
+        elif options.command == "maintain":
+            result = await maintain(conn)
+            print(f"created: {result['created']}\nexpired: {result['expired']}")
+            if options.dry_run:
+                await conn.rollback()
+                print("(dry run, rolled back)")
+        for table in partitioned_tables():
+            if not await is_partitioned(conn, table):
+                print(f"{table}: not partitioned (run convert)")
+                continue
+            print(f"{table}:")
+            for p in await list_partitions(conn, table):
+                bounds = "DEFAULT" if p.is_default else f"{p.lower} .. {p.upper}"
+                print(f"  {p.name:32} {bounds}")
+    await engine.dispose()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Monthly partition maintenance")
+    parser.add_argument("command", choices=["list", "maintain", "convert"])
+    parser.add_argument("--dry-run", action="store_true", help="maintain only")
+    return asyncio.run(main_async(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""pg_trgm GIN indexes, which serve ILIKE '%term%' and similarity() lookups.
+
+A B-tree can't answer a pattern with a leading wildcard, so substring filters
+on free-text columns otherwise scan every row. Patterns shorter than three
+characters still fall back to a scan.
+
+The indexes are optional: on a server without pg_trgm (a build without
+contrib, like the embedded benchmark server) tables are created without them
+and a warning is logged, so substring filters scan instead.
+"""
+
+import logging
+from sqlalchemy import Index, Table, event, text
+from sqlalchemy.engine import Connection
+
+TRIGRAM_OPS = "gin_trgm_ops"
+
+logger = logging.getLogger(__name__)
+
+
+def trigrams_available(connection: Connection) -> bool:
+    """Whether the server can provide pg_trgm, cached per DBAPI connection"""
+    if "pg_trgm" not in connection.info:
+        connection.info["pg_trgm"] = bool(
+            connection.scalar(
+                text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            )
+        )
+    return connection.info["pg_trgm"]
+
+
+def _create_if_available(ddl, target, bind, **kw) -> bool:
+    # Compiling without a connection (e.g. printing DDL) keeps the index
+    return bind is None or trigrams_available(bind)
+
+
+def trigram_index(name: str, column: str) -> Index:
+    """A GIN trigram index on `column`, for __table_args__"""
+    return Index(
+        name, column, postgresql_using="gin", postgresql_ops={column: TRIGRAM_OPS}
+    ).ddl_if(callable_=_create_if_available)
+
+
+def is_trigram_index(index: Index) -> bool:
+    return TRIGRAM_OPS in index.dialect_options["postgresql"]["ops"].values()
+
+
+def uses_trigrams(table: Table) -> bool:
+    return any(is_trigram_index(index) for index in table.indexes)
+
+
+@event.listens_for(Table, "before_create")
+def _create_extension(target, connection, **kw):
+    # Also covers a single table.create(), e.g. partitions.convert()
+    if not uses_trigrams(target):
+        return
+    if trigrams_available(connection):
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    else:
+        logger.warning(
+            f"pg_trgm is not available; creating {target.name} without its "
+            "trigram indexes, so substring filters on it scan"
+        )
@@ -0,0 +1,25 @@
+import uuid
+from sqlalchemy import Uuid
+from sqlalchemy.types import TypeDecorator
+
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+class UUIDString(TypeDecorator):
+    """Native UUID column (16 bytes) that reads and writes Python strings.
+
+    IDs stay `str` everywhere in the app. A malformed ID from a URL or body
+    can't match any row, so it is bound as the nil UUID: lookups miss as
+    they did with text keys instead of failing the whole statement.
+    """
+
+    impl = Uuid(as_uuid=False)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            return NIL_UUID
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
@@ -11,9 +11,22 @@ from app.core.exception import (
     not_found_exception_handler,
 )
 from app.middleware.response_middleware import response_middleware
+from app.middleware.metrics_middleware import metrics_middleware
 from app.api.v1.routers import router as api_router
 from app.db.database import init_db, close_db
+from app.db.partitions import partition_maintainer, run_maintenance
+from app.core.events import presence_broker
+from app.services.heartbeat_service import (
+    HeartbeatService,
+    heartbeat_flusher,
+    session_sweeper,
+)
+from app.services.screenshot_service import screenshot_buffer
+from app.services.retention_service import screenshot_archiver
+from app.services.app_usage_service import AppUsageService, app_usage_flusher
+from app.services.local_time import load_database_timezones
 from contextlib import asynccontextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 # Security scheme for JWT authentication
 security = HTTPBearer(
@@ -25,7 +38,29 @@ security = HTTPBearer(
 async def lifespan(app: FastAPI):
     print("Initializing database...")
     await init_db()
+    await load_database_timezones()
+    try:
+        await run_maintenance()
+    except Exception as e:
+        print(f"Partition maintenance failed: {str(e)}")
+    partition_maintainer.start()
+    await presence_broker.start()
+    heartbeat_flusher.start()
+    session_sweeper.start()
+    screenshot_archiver.start()
+    app_usage_flusher.start()
+    if settings.screenshot_write_buffer_enabled:
+        screenshot_buffer.start()
     yield
+    await screenshot_buffer.stop()
+    await app_usage_flusher.stop()
+    await AppUsageService.run_flush()
+    await screenshot_archiver.stop()
+    await session_sweeper.stop()
+    await heartbeat_flusher.stop()
+    await partition_maintainer.stop()
+    await HeartbeatService.run_flush()
+    await presence_broker.stop()
     print("Closing database...")
     await close_db()
 
@@ -87,6 +122,16 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get(
+    "/metrics",
+    tags=["Utility"],
+    summary="Prometheus metrics",
+    response_description="Metrics in Prometheus text format",
+)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get(
     "/test-cors",
     tags=["Utility"],
@@ -129,6 +174,7 @@ app.add_exception_handler(Exception, generic_exception_handler)
 app.add_exception_handler(404, not_found_exception_handler)
 
 app.middleware("http")(response_middleware)
+app.middleware("http")(metrics_middleware)
 
 
 if __name__ == "__main__":
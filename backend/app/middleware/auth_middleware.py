@@ -1,33 +1,27 @@
 from fastapi import HTTPException, Depends
-from jose import jwt
+from jose import JWTError
+from app.core.tokens import current_claims, token_verifier
 from app.models.user import User
 from app.models.employee import Employee
 from app.db.database import get_db
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordBearer
-import os
-from dotenv import load_dotenv
-
 from app.schemas.user import UserResponse
 from app.schemas.employee import EmployeeResponse
 
-load_dotenv()
-
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
-
 
 async def auth_middleware(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
 ):
     try:
+        payload = token_verifier.verify(token)
+    except JWTError as e:
+        raise HTTPException(status_code=401, detail=str(e))
 
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
-        print("payload", payload["id"])
-
+    try:
         account_type = payload.get(
             "account_type", "user"
         )  # Default to user for backward compatibility
@@ -68,6 +62,11 @@ async def auth_middleware(
                 raise HTTPException(status_code=401, detail="User is not active")
             data = UserResponse(**user.__dict__)
 
+        # Password changes and deactivation bump the version
+        if payload.get("ver", 0) != user.token_version:
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+        current_claims.set(payload)
+
         return data
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
@@ -0,0 +1,53 @@
+from fastapi import Request
+from collections import Counter
+import logging
+import time
+from app.core.config import settings
+from app.core.metrics import (
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUEST_QUERIES,
+    HTTP_REQUEST_QUERY_SECONDS,
+)
+from app.db.instrumentation import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+def route_template(request: Request) -> str:
+    """Path template of the matched route, e.g. /api/v1/users/{user_id}
+    (low-cardinality label); path_format leaves out converters like :path"""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # FastAPI versions that keep included routers nested set scope["route"] to
+    # the route as declared, without the include prefixes; the prefixed one is
+    # the effective route context
+    context = request.scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(context, "path_format", None) or route.path_format
+
+
+async def metrics_middleware(request: Request, call_next):
+    stats = QueryStats(statements=Counter() if settings.query_debug else None)
+    token = current_query_stats.set(stats)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        if settings.query_debug:
+            response.headers["X-Query-Count"] = str(stats.count)
+        return response
+    finally:
+        current_query_stats.reset(token)
+
+        path = route_template(request)
+        HTTP_REQUEST_SECONDS.labels(request.method, path, status).observe(
+            time.perf_counter() - started
+        )
+        HTTP_REQUEST_QUERIES.labels(request.method, path).observe(stats.count)
+        HTTP_REQUEST_QUERY_SECONDS.labels(request.method, path).observe(stats.seconds)
+
+        for statement, count in stats.repeated(settings.query_repeat_threshold):
+            logger.warning(
+                f"Possible N+1 in {request.method} {path}: {count}x {statement}"
+            )
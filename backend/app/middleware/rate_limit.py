@@ -0,0 +1,149 @@
+from typing import Optional
+from fastapi import HTTPException, Request
+from jose import JWTError
+from app.core.config import settings
+from app.core.metrics import CONCURRENCY_IN_FLIGHT, CONCURRENCY_REJECTED, RATE_LIMITED
+from app.core.rate_limit import (
+    Rate,
+    bucket_store,
+    concurrency_limiter,
+    retry_after_header,
+)
+from app.core.tokens import token_verifier
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def request_claims(request: Request) -> Optional[dict]:
+    """Claims of the bearer token, if valid; authentication proper happens later"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return token_verifier.verify(token)
+    except JWTError:
+        return None
+
+
+def claims_organization(claims: Optional[dict]) -> Optional[str]:
+    """The tenant a request counts against: the employee's organization, or
+    the only organization a user owns"""
+    if not claims:
+        return None
+    if claims.get("organization_id"):
+        return claims["organization_id"]
+    organization_ids = claims.get("org_ids") or ()
+    if len(organization_ids) == 1:
+        return organization_ids[0]
+    return None
+
+
+class RateLimit:
+    """Dependency that takes a token from each configured bucket.
+
+    Buckets are keyed by the token's principal, the client IP and the
+    principal's organization. `per_email` buckets are checked by the endpoint
+    itself with `check("email", ...)`, since the address is in the body.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        per_principal: Optional[str] = None,
+        per_ip: Optional[str] = None,
+        per_organization: Optional[str] = None,
+        per_email: Optional[str] = None,
+    ):
+        self.name = name
+        self.rates = {
+            "principal": Rate.parse(per_principal),
+            "ip": Rate.parse(per_ip),
+            "organization": Rate.parse(per_organization),
+            "email": Rate.parse(per_email),
+        }
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.rate_limit_enabled:
+            return
+
+        await self.check("ip", client_ip(request))
+        if self.rates["principal"] or self.rates["organization"]:
+            claims = request_claims(request)
+            if claims:
+                await self.check("principal", claims.get("id"))
+                await self.check("organization", claims_organization(claims))
+
+    async def check(self, kind: str, value: Optional[str]) -> None:
+        rate = self.rates[kind]
+        if not settings.rate_limit_enabled or rate is None or not value:
+            return
+
+        retry_after = await bucket_store.take(f"{self.name}:{kind}:{value}", rate)
+        if retry_after > 0:
+            RATE_LIMITED.labels(self.name, kind).inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please retry later",
+                headers=retry_after_header(retry_after),
+            )
+
+
+class ConcurrencyLimit:
+    """Dependency that caps requests in flight per organization"""
+
+    def __init__(self, name: str, per_organization: int, retry_after_seconds: int):
+        self.name = name
+        self.per_organization = per_organization
+        self.retry_after_seconds = retry_after_seconds
+
+    async def __call__(self, request: Request):
+        if not settings.rate_limit_enabled or self.per_organization <= 0:
+            yield
+            return
+
+        claims = request_claims(request)
+        tenant = (
+            claims_organization(claims)
+            or (claims or {}).get("id")
+            or client_ip(request)
+        )
+        key = f"{self.name}:{tenant}"
+        if not concurrency_limiter.acquire(key, self.per_organization):
+            CONCURRENCY_REJECTED.labels(self.name).inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests running for this organization, retry later",
+                headers=retry_after_header(self.retry_after_seconds),
+            )
+
+        CONCURRENCY_IN_FLIGHT.labels(self.name).inc()
+        try:
+            yield
+        finally:
+            CONCURRENCY_IN_FLIGHT.labels(self.name).dec()
+            concurrency_limiter.release(key)
+
+
+auth_rate_limit = RateLimit(
+    "auth",
+    per_ip=settings.rate_limit_auth_per_ip,
+    per_email=settings.rate_limit_auth_per_email,
+)
+otp_rate_limit = RateLimit(
+    "send_otp",
+    per_ip=settings.rate_limit_otp_per_ip,
+    per_email=settings.rate_limit_otp_per_email,
+)
+upload_rate_limit = RateLimit(
+    "screenshot_upload",
+    per_principal=settings.rate_limit_upload_per_principal,
+    per_ip=settings.rate_limit_upload_per_ip,
+    per_organization=settings.rate_limit_upload_per_organization,
+)
+report_concurrency = ConcurrencyLimit(
+    "time_report",
+    per_organization=settings.report_concurrency_per_organization,
+    retry_after_seconds=settings.report_concurrency_retry_after_seconds,
+)
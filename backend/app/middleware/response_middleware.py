@@ -46,6 +46,11 @@ async def response_middleware(request: Request, call_next):
         json_response = JSONResponse(
             content=formatted, status_code=response.status_code
         )
+        # Keep headers set by the endpoint (ETag, Last-Modified, ...), but not
+        # the ones describing the old body
+        for key, value in response.headers.items():
+            if key not in ("content-length", "content-type"):
+                json_response.headers.append(key, value)
         for key, value in cors_headers.items():
             json_response.headers[key] = value
         return json_response
@@ -5,4 +5,8 @@ from app.models.employee import Employee
 from app.models.project import Project
 from app.models.task import Task
 from app.models.time_tracking import TimeTracking
+from app.models.time_tracking_break import TimeTrackingBreak
 from app.models.screenshot import Screenshot
+from app.models.screenshot_app import ScreenshotApp
+from app.models.app_usage import app_usage_hourly
+from app.models.rate_limit import RateLimitBucket
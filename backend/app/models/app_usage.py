@@ -0,0 +1,38 @@
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Integer,
+    Table,
+    Column,
+    Index,
+    UniqueConstraint,
+)
+from app.db.database import Base
+from app.db.types import UUIDString
+
+# Screenshots per employee, app, project and hour (UTC), kept up to date as
+# screenshots arrive. Rows outlive the screenshots they count, so app usage
+# stays reportable after retention archives them.
+app_usage_hourly = Table(
+    "app_usage_hourly",
+    Base.metadata,
+    Column("hour", DateTime(timezone=True), nullable=False),
+    Column(
+        "organization_id", UUIDString, ForeignKey("organizations.id"), nullable=False
+    ),
+    Column("employee_id", UUIDString, ForeignKey("employees.id"), nullable=False),
+    Column("project_id", UUIDString, ForeignKey("projects.id"), nullable=True),
+    Column("app_id", UUIDString, ForeignKey("screenshot_apps.id"), nullable=False),
+    Column("screenshots", Integer, nullable=False),
+    # One row per key, including screenshots without a project
+    UniqueConstraint(
+        "hour",
+        "employee_id",
+        "app_id",
+        "project_id",
+        name="uq_app_usage_hourly_key",
+        postgresql_nulls_not_distinct=True,
+    ),
+    Index("ix_app_usage_hourly_organization_hour", "organization_id", "hour"),
+    Index("ix_app_usage_hourly_project_hour", "project_id", "hour"),
+)
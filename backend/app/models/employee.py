@@ -1,29 +1,36 @@
 from datetime import datetime
-from sqlalchemy import String, Boolean, DateTime, func, ForeignKey, Text
+from sqlalchemy import String, Boolean, DateTime, Integer, func, ForeignKey, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.database import Base
-import uuid
+from app.db.types import UUIDString
+from app.utils.ids import new_id
 
 
 class Employee(Base):
     __tablename__ = "employees"
 
-    id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    id: Mapped[str] = mapped_column(UUIDString, primary_key=True, default=new_id)
 
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     email: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
 
     organization_id: Mapped[str] = mapped_column(
-        String, ForeignKey("organizations.id"), nullable=False
+        UUIDString, ForeignKey("organizations.id"), nullable=False
     )
 
+    # IANA time zone the employee's days are counted in
+    # (NULL uses the organization's)
+    timezone: Mapped[str] = mapped_column(String(64), nullable=True)
+
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     email_verified: Mapped[bool] = mapped_column(Boolean, default=False)
     otp: Mapped[str] = mapped_column(String, nullable=True, default=None)
     otp_expiry: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=None)
+    # Bumped to revoke every token issued so far
+    token_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=func.now(), nullable=False
@@ -1,23 +1,22 @@
 from datetime import datetime
-from sqlalchemy import String, Boolean, DateTime, func, Text, ForeignKey
+from sqlalchemy import String, Boolean, DateTime, func, Text, ForeignKey, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.database import Base
-import uuid
+from app.db.types import UUIDString
+from app.utils.ids import new_id
 
 
 class Organization(Base):
     __tablename__ = "organizations"
 
-    id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    id: Mapped[str] = mapped_column(UUIDString, primary_key=True, default=new_id)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     domain: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
 
     # Foreign key to the user who created the organization
     created_by: Mapped[str] = mapped_column(
-        String, ForeignKey("users.id"), nullable=False
+        UUIDString, ForeignKey("users.id"), nullable=False
     )
 
     # Timestamps
@@ -31,6 +30,18 @@ class Organization(Base):
     # Status
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
+    # Minutes without a heartbeat before open sessions that have sent one are
+    # closed (NULL uses settings.session_idle_timeout_minutes, 0 disables)
+    idle_timeout_minutes: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    # Days screenshots are kept before they are archived
+    # (NULL uses settings.screenshot_retention_days, 0 keeps them forever)
+    screenshot_retention_days: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    # IANA time zone of the organization's business days, for employees
+    # without their own (NULL uses settings.default_timezone)
+    timezone: Mapped[str] = mapped_column(String(64), nullable=True)
+
     # Relationship
     creator = relationship("User", back_populates="organizations")
     employees = relationship("Employee", back_populates="organization")
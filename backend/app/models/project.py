@@ -13,15 +13,16 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.database import Base
-import uuid
+from app.db.types import UUIDString
+from app.utils.ids import new_id
 
 
 # Association table for many-to-many relationship between projects and employees
 project_employees = Table(
     "project_employees",
     Base.metadata,
-    Column("project_id", String, ForeignKey("projects.id"), primary_key=True),
-    Column("employee_id", String, ForeignKey("employees.id"), primary_key=True),
+    Column("project_id", UUIDString, ForeignKey("projects.id"), primary_key=True),
+    Column("employee_id", UUIDString, ForeignKey("employees.id"), primary_key=True),
     Column("assigned_at", DateTime(timezone=True), default=func.now()),
     Column("is_active", Boolean, default=True),
 )
@@ -30,9 +31,7 @@ project_employees = Table(
 class Project(Base):
     __tablename__ = "projects"
 
-    id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    id: Mapped[str] = mapped_column(UUIDString, primary_key=True, default=new_id)
 
     # Project details
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -41,7 +40,7 @@ class Project(Base):
 
     # Organization relationship
     organization_id: Mapped[str] = mapped_column(
-        String, ForeignKey("organizations.id"), nullable=False
+        UUIDString, ForeignKey("organizations.id"), nullable=False
     )
 
     # Project status and settings
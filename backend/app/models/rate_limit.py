@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import String, Boolean, DateTime, Float
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.database import Base
+
+
+class RateLimitBucket(Base):
+    """Token bucket state for rate_limit_backend = "postgres".
+
+    Unlogged: losing buckets on a crash only resets the limits.
+    """
+
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    allowed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
@@ -5,37 +5,47 @@ from sqlalchemy import (
     DateTime,
     func,
     ForeignKey,
+    Index,
     Text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.database import Base
-import uuid
+from app.db.partitions import monthly_partitions
+from app.db.trigram import trigram_index
+from app.db.types import UUIDString
+from app.utils.ids import new_id
 
 
 class Screenshot(Base):
     __tablename__ = "screenshots"
-
-    id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
+    __table_args__ = (
+        # app and os filters match substrings
+        trigram_index("ix_screenshots_app_trgm", "app"),
+        trigram_index("ix_screenshots_os_trgm", "os"),
+        Index("ix_screenshots_app_id", "app_id"),
+        monthly_partitions("created_at"),
     )
 
+    id: Mapped[str] = mapped_column(UUIDString, primary_key=True, default=new_id)
+
     employee_id: Mapped[str] = mapped_column(
-        String, ForeignKey("employees.id"), nullable=False
+        UUIDString, ForeignKey("employees.id"), nullable=False
     )
 
     organization_id: Mapped[str] = mapped_column(
-        String, ForeignKey("organizations.id"), nullable=False
+        UUIDString, ForeignKey("organizations.id"), nullable=False
     )
 
-    tracking_id: Mapped[str] = mapped_column(
-        String, ForeignKey("time_tracking.id"), nullable=True
-    )
+    # No foreign key: time_tracking is partitioned, so `id` alone isn't unique
+    tracking_id: Mapped[str] = mapped_column(UUIDString, nullable=True)
 
     project_id: Mapped[str] = mapped_column(
-        String, ForeignKey("projects.id"), nullable=True
+        UUIDString, ForeignKey("projects.id"), nullable=True
     )
 
-    task_id: Mapped[str] = mapped_column(String, ForeignKey("tasks.id"), nullable=True)
+    task_id: Mapped[str] = mapped_column(
+        UUIDString, ForeignKey("tasks.id"), nullable=True
+    )
 
     path: Mapped[str] = mapped_column(String, nullable=False)
     permission: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -43,9 +53,14 @@ class Screenshot(Base):
     geo_location: Mapped[str] = mapped_column(String, nullable=True)
     ip_address: Mapped[str] = mapped_column(String, nullable=True)
     app: Mapped[str] = mapped_column(String, nullable=True)
+    # `app` in the organization's app catalog
+    app_id: Mapped[str] = mapped_column(
+        UUIDString, ForeignKey("screenshot_apps.id"), nullable=True
+    )
 
+    # Partition key, so part of the primary key
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=func.now(), nullable=False
+        DateTime(timezone=True), primary_key=True, default=func.now()
     )
 
     updated_at: Mapped[datetime] = mapped_column(
@@ -55,6 +70,10 @@ class Screenshot(Base):
     # Relationships
     employee = relationship("Employee", back_populates="screenshots")
     organization = relationship("Organization", back_populates="screenshots")
-    time_tracking = relationship("TimeTracking", back_populates="screenshots")
+    time_tracking = relationship(
+        "TimeTracking",
+        primaryjoin="foreign(Screenshot.tracking_id) == TimeTracking.id",
+        back_populates="screenshots",
+    )
     project = relationship("Project", back_populates="screenshots")
     task = relationship("Task", back_populates="screenshots")
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import String, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.database import Base
+from app.db.trigram import trigram_index
+from app.db.types import UUIDString
+from app.utils.ids import new_id
+
+
+class ScreenshotApp(Base):
+    """Distinct application names seen in an organization's screenshots"""
+
+    __tablename__ = "screenshot_apps"
+    __table_args__ = (
+        UniqueConstraint("organization_id", "name"),
+        trigram_index("ix_screenshot_apps_name_trgm", "name"),
+    )
+
+    id: Mapped[str] = mapped_column(UUIDString, primary_key=True, default=new_id)
+
+    organization_id: Mapped[str] = mapped_column(
+        UUIDString, ForeignKey("organizations.id"), nullable=False
+    )
+
+    name: Mapped[str] = mapped_column(String, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=func.now()
+    )
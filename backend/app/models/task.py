@@ -13,15 +13,16 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.database import Base
-import uuid
+from app.db.types import UUIDString
+from app.utils.ids import new_id
 
 
 # Association table for many-to-many relationship between tasks and employees
 task_employees = Table(
     "task_employees",
     Base.metadata,
-    Column("task_id", String, ForeignKey("tasks.id"), primary_key=True),
-    Column("employee_id", String, ForeignKey("employees.id"), primary_key=True),
+    Column("task_id", UUIDString, ForeignKey("tasks.id"), primary_key=True),
+    Column("employee_id", UUIDString, ForeignKey("employees.id"), primary_key=True),
     Column("assigned_at", DateTime(timezone=True), default=func.now()),
     Column("is_active", Boolean, default=True),
 )
@@ -30,9 +31,7 @@ task_employees = Table(
 class Task(Base):
     __tablename__ = "tasks"
 
-    id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    id: Mapped[str] = mapped_column(UUIDString, primary_key=True, default=new_id)
 
     # Task details
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -41,7 +40,7 @@ class Task(Base):
 
     # Project relationship (tasks always belong to a project)
     project_id: Mapped[str] = mapped_column(
-        String, ForeignKey("projects.id"), nullable=False
+        UUIDString, ForeignKey("projects.id"), nullable=False
     )
 
     # Task status and settings
@@ -1,37 +1,47 @@
 from datetime import datetime
 from sqlalchemy import (
-    String,
     Boolean,
     DateTime,
     func,
     ForeignKey,
+    Index,
     Text,
     Integer,
     Numeric,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.database import Base
-import uuid
+from app.db.partitions import monthly_partitions
+from app.db.types import UUIDString
+from app.utils.ids import new_id
 
 
 class TimeTracking(Base):
     __tablename__ = "time_tracking"
-
-    id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
+    __table_args__ = (
+        # Per-employee lookups in clock-in order (sessions, overlap checks)
+        Index("ix_time_tracking_employee_clock_in", "employee_id", "clock_in"),
+        monthly_partitions("clock_in"),
     )
 
+    id: Mapped[str] = mapped_column(UUIDString, primary_key=True, default=new_id)
+
     employee_id: Mapped[str] = mapped_column(
-        String, ForeignKey("employees.id"), nullable=False
+        UUIDString, ForeignKey("employees.id"), nullable=False
     )
 
-    task_id: Mapped[str] = mapped_column(String, ForeignKey("tasks.id"), nullable=True)
+    task_id: Mapped[str] = mapped_column(
+        UUIDString, ForeignKey("tasks.id"), nullable=True
+    )
 
     project_id: Mapped[str] = mapped_column(
-        String, ForeignKey("projects.id"), nullable=True
+        UUIDString, ForeignKey("projects.id"), nullable=True
     )
 
-    clock_in: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Partition key, so part of the primary key
+    clock_in: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
     clock_out: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
 
     total_hours: Mapped[float] = mapped_column(Numeric(5, 2), nullable=True)
@@ -40,12 +50,20 @@ class TimeTracking(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     notes: Mapped[str] = mapped_column(Text, nullable=True)
 
+    # The latest break (in progress while break_end is unset) and the minutes
+    # of all ended breaks, kept up to date as breaks end; every break is a
+    # TimeTrackingBreak row
     break_start: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
     break_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
     break_duration_minutes: Mapped[int] = mapped_column(Integer, nullable=True)
 
+    # Last desktop-client heartbeat, flushed in batches by HeartbeatService
+    last_heartbeat_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=func.now(), nullable=False
     )
@@ -56,4 +74,14 @@ class TimeTracking(Base):
     employee = relationship("Employee", back_populates="time_logs")
     task = relationship("Task", back_populates="time_logs")
     project = relationship("Project", back_populates="time_logs")
-    screenshots = relationship("Screenshot", back_populates="time_tracking")
+    screenshots = relationship(
+        "Screenshot",
+        primaryjoin="TimeTracking.id == foreign(Screenshot.tracking_id)",
+        back_populates="time_tracking",
+    )
+    breaks = relationship(
+        "TimeTrackingBreak",
+        primaryjoin="TimeTracking.id == foreign(TimeTrackingBreak.time_tracking_id)",
+        back_populates="time_tracking",
+        order_by="TimeTrackingBreak.break_start",
+    )
@@ -0,0 +1,47 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Index, Integer, Text, func, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.database import Base
+from app.db.partitions import expires_with
+from app.db.types import UUIDString
+from app.utils.ids import new_id
+
+
+class TimeTrackingBreak(Base):
+    """One break within a time tracking session"""
+
+    __tablename__ = "time_tracking_breaks"
+    __table_args__ = (
+        Index("ix_time_tracking_breaks_session", "time_tracking_id", "break_start"),
+        # A session has at most one break in progress
+        Index(
+            "uq_time_tracking_breaks_open",
+            "time_tracking_id",
+            unique=True,
+            postgresql_where=text("break_end IS NULL"),
+        ),
+        # Deleted with the time_tracking month of their session
+        expires_with("time_tracking", "time_tracking_id"),
+    )
+
+    id: Mapped[str] = mapped_column(UUIDString, primary_key=True, default=new_id)
+
+    # No foreign key: time_tracking is partitioned, so `id` alone isn't unique
+    time_tracking_id: Mapped[str] = mapped_column(UUIDString, nullable=False)
+
+    break_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    break_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    duration_minutes: Mapped[int] = mapped_column(Integer, nullable=True)
+    notes: Mapped[str] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=func.now()
+    )
+
+    time_tracking = relationship(
+        "TimeTracking",
+        primaryjoin="foreign(TimeTrackingBreak.time_tracking_id) == TimeTracking.id",
+        back_populates="breaks",
+    )
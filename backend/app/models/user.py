@@ -1,8 +1,9 @@
 from datetime import datetime
-from sqlalchemy import String, Boolean, DateTime, func, Enum
+from sqlalchemy import String, Boolean, DateTime, Integer, func, Enum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.database import Base
-import uuid
+from app.db.types import UUIDString
+from app.utils.ids import new_id
 import enum
 
 
@@ -18,9 +19,7 @@ class UserRole(str, enum.Enum):
 class User(Base):
     __tablename__ = "users"
 
-    id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    id: Mapped[str] = mapped_column(UUIDString, primary_key=True, default=new_id)
     name: Mapped[str] = mapped_column(String, nullable=False)
     email: Mapped[str] = mapped_column(String, nullable=False, unique=True)
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
@@ -38,6 +37,10 @@ class User(Base):
     phone_verified: Mapped[bool] = mapped_column(Boolean, default=False)
     otp: Mapped[str] = mapped_column(String, nullable=True, default=None)
     otp_expiry: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=None)
+    # Bumped to revoke every token issued so far
+    token_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     # Relationship to organizations
     organizations = relationship("Organization", back_populates="creator")
@@ -44,6 +44,8 @@ from app.schemas.time_tracking import (
     CurrentSessionResponse,
     TimeReportRequest,
     TimeTrackingUpdate,
+    PresenceEvent,
+    ActiveSessionResponse,
 )
 
 from app.schemas.screenshot import (
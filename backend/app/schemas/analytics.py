@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+
+
+class AppUsageResponse(BaseModel):
+    app_id: str
+    app: str
+    screenshots: int = Field(..., description="Screenshots taken in the app")
+    minutes: float = Field(
+        ..., description="Estimated minutes: screenshots times the capture interval"
+    )
+    employees: int = Field(..., description="Employees seen using the app")
+    share: float = Field(..., description="Fraction of all screenshots in the range")
+
+
+class AppUsageListResponse(BaseModel):
+    apps: List[AppUsageResponse]
+    total_screenshots: int
+    start_date: datetime
+    end_date: datetime
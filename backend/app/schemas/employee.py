@@ -1,11 +1,17 @@
 from pydantic import BaseModel, Field, EmailStr
 from typing import Optional
 from datetime import datetime
+from app.utils.timezones import TimezoneName
 
 
 class EmployeeBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255, description="Employee name")
     email: EmailStr = Field(..., description="Employee email address")
+    timezone: Optional[TimezoneName] = Field(
+        None,
+        description="IANA time zone reports count the employee's days in "
+        "(empty uses the organization's)",
+    )
 
 
 class EmployeeCreate(EmployeeBase):
@@ -19,6 +25,7 @@ class EmployeeUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     email: Optional[EmailStr] = None
     password: Optional[str] = Field(None, min_length=8)
+    timezone: Optional[TimezoneName] = None
     is_active: Optional[bool] = None
 
 
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+from app.utils.timezones import TimezoneName
 
 
 class OrganizationBase(BaseModel):
@@ -13,6 +14,25 @@ class OrganizationBase(BaseModel):
     domain: str = Field(
         ..., min_length=1, max_length=255, description="Organization domain"
     )
+    idle_timeout_minutes: Optional[int] = Field(
+        None,
+        ge=0,
+        le=1440,
+        description="Auto clock out after this many minutes without a heartbeat "
+        "(0 disables, empty uses the server default)",
+    )
+    screenshot_retention_days: Optional[int] = Field(
+        None,
+        ge=0,
+        le=3650,
+        description="Delete screenshots after this many days "
+        "(0 keeps them, empty uses the server default)",
+    )
+    timezone: Optional[TimezoneName] = Field(
+        None,
+        description="IANA time zone reports count days in, e.g. Europe/Berlin "
+        "(empty uses the server default)",
+    )
 
 
 class OrganizationCreate(OrganizationBase):
@@ -23,6 +43,9 @@ class OrganizationUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=255)
     description: Optional[str] = Field(None, max_length=1000)
     domain: Optional[str] = Field(None, min_length=1, max_length=255)
+    idle_timeout_minutes: Optional[int] = Field(None, ge=0, le=1440)
+    screenshot_retention_days: Optional[int] = Field(None, ge=0, le=3650)
+    timezone: Optional[TimezoneName] = None
     is_active: Optional[bool] = None
 
 
@@ -53,6 +53,7 @@ class ScreenshotResponse(BaseModel):
     geo_location: Optional[str] = None
     ip_address: Optional[str] = None
     app: Optional[str] = None
+    app_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -66,6 +67,13 @@ class ScreenshotListResponse(BaseModel):
     size: int
 
 
+class ScreenshotAppResponse(BaseModel):
+    id: str
+    name: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class ScreenshotFilters(BaseModel):
     employee_id: Optional[str] = Field(None, description="Filter by employee ID")
     organization_id: Optional[str] = Field(
@@ -78,6 +86,7 @@ class ScreenshotFilters(BaseModel):
     task_id: Optional[str] = Field(None, description="Filter by task")
     permission: Optional[bool] = Field(None, description="Filter by permission status")
     app: Optional[str] = Field(None, description="Filter by application name")
+    app_id: Optional[str] = Field(None, description="Filter by catalog app ID")
     os: Optional[str] = Field(None, description="Filter by operating system")
     start_date: Optional[datetime] = Field(None, description="Filter from this date")
     end_date: Optional[datetime] = Field(None, description="Filter to this date")
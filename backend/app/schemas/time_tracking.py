@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
 
@@ -71,6 +71,9 @@ class EmployeeTimeSummary(BaseModel):
     clock_in_count: int
     clock_out_count: int
     active_sessions: int
+    timezone: str = Field(..., description="Time zone of today and this week")
+    today_minutes: int = Field(0, description="Minutes clocked in on today")
+    week_minutes: int = Field(0, description="Minutes clocked in on this week")
 
 
 class TimeTrackingListResponse(BaseModel):
@@ -109,6 +112,12 @@ class CurrentSessionResponse(BaseModel):
     break_start: Optional[datetime] = None
     break_duration_minutes: Optional[int] = None
     notes: Optional[str] = None
+    remaining_minutes_today: Optional[int] = Field(
+        None, description="Minutes left under the daily hour limit, if any"
+    )
+    remaining_minutes_this_week: Optional[int] = Field(
+        None, description="Minutes left under the weekly hour limit, if any"
+    )
 
 
 class TimeReportRequest(BaseModel):
@@ -120,3 +129,47 @@ class TimeReportRequest(BaseModel):
     project_id: Optional[str] = Field(None, description="Filter by project")
     task_id: Optional[str] = Field(None, description="Filter by task")
     include_breaks: bool = Field(True, description="Include break time in calculations")
+
+
+class TimesheetAnomalyResponse(BaseModel):
+    kind: str = Field(
+        ...,
+        description="overlap, long_session, break_exceeds_session or "
+        "clock_out_before_clock_in",
+    )
+    entry_id: str
+    employee_id: str
+    employee_name: Optional[str] = None
+    clock_in: datetime
+    clock_out: Optional[datetime] = None
+    other_entry_id: Optional[str] = Field(
+        None, description="The earlier entry an overlapping entry runs into"
+    )
+    minutes: float = Field(..., description="Overlap, session or break length, by kind")
+
+
+class TimesheetAnomalyListResponse(BaseModel):
+    anomalies: List[TimesheetAnomalyResponse]
+    counts: Dict[str, int] = Field(..., description="Anomalies found per kind")
+    start_date: datetime
+    end_date: datetime
+
+
+class PresenceEvent(BaseModel):
+    type: str = Field(..., description="clock_in, clock_out, break_start or break_end")
+    organization_id: str
+    employee_id: str
+    session_id: str
+    project_id: Optional[str] = None
+    task_id: Optional[str] = None
+    at: datetime
+
+
+class ActiveSessionResponse(BaseModel):
+    session_id: str
+    employee_id: str
+    employee_name: str
+    project_id: Optional[str] = None
+    task_id: Optional[str] = None
+    clock_in: datetime
+    is_on_break: bool
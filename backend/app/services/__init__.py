@@ -4,3 +4,5 @@ from app.services.project_service import ProjectService
 from app.services.task_service import TaskService
 from app.services.time_tracking_service import TimeTrackingService
 from app.services.screenshot_service import ScreenshotService
+from app.services.hour_limit_service import HourLimitService
+from app.services.heartbeat_service import HeartbeatService
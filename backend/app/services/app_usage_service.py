@@ -0,0 +1,238 @@
+"""Per-hour app usage rolled up from screenshot metadata.
+
+Each stored screenshot with an app adds one to its (hour, employee, app,
+project) row of app_usage_hourly. Counts are kept in memory and written by a
+periodic flush, like heartbeats, so uploads don't contend on rollup rows.
+Reports read the rollup instead of paging through screenshots.
+
+Changing a screenshot's app or project afterwards doesn't move its count;
+rebuild() recomputes past hours from the screenshots still stored:
+
+    python -m app.services.app_usage_service --since 2026-01-01 [--until ...]
+"""
+
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, desc, and_
+from sqlalchemy.dialects.postgresql import insert
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.metrics import APP_USAGE_FLUSHED, APP_USAGE_PENDING
+from app.db.database import AsyncSessionLocal, engine
+from app.models.app_usage import app_usage_hourly
+from app.models.screenshot import Screenshot
+from app.models.screenshot_app import ScreenshotApp
+from app.utils.utils import current_time
+
+# (hour, organization_id, employee_id, project_id, app_id) -> screenshots
+# counted since the last flush
+_pending: Counter = Counter()
+
+KEY_COLUMNS = ("hour", "organization_id", "employee_id", "project_id", "app_id")
+
+
+def hour_start(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert():
+    statement = insert(app_usage_hourly)
+    return statement.on_conflict_do_update(
+        constraint="uq_app_usage_hourly_key",
+        set_={
+            "screenshots": app_usage_hourly.c.screenshots
+            + statement.excluded.screenshots
+        },
+    )
+
+
+class AppUsageService:
+    @staticmethod
+    def record(screenshot: Screenshot) -> None:
+        """Count a stored screenshot; it reaches the rollup on the next flush"""
+        if not screenshot.app_id:
+            return
+        key = (
+            hour_start(screenshot.created_at),
+            str(screenshot.organization_id),
+            str(screenshot.employee_id),
+            str(screenshot.project_id) if screenshot.project_id else None,
+            str(screenshot.app_id),
+        )
+        _pending[key] += 1
+        APP_USAGE_PENDING.set(len(_pending))
+
+    @staticmethod
+    def record_rows(rows: List[Dict[str, Any]]) -> None:
+        """Count screenshot rows once the write buffer has stored them"""
+        for row in rows:
+            AppUsageService.record(SimpleNamespace(**row))
+
+    @staticmethod
+    async def flush(db: AsyncSession) -> int:
+        """Add pending counts to the rollup in one batched upsert"""
+        if not _pending:
+            return 0
+
+        pending = Counter(_pending)
+        _pending.clear()
+        APP_USAGE_PENDING.set(0)
+
+        # A fixed row order keeps concurrent flushes from deadlocking
+        rows = [
+            {**dict(zip(KEY_COLUMNS, key)), "screenshots": count}
+            for key, count in sorted(
+                pending.items(), key=lambda item: [str(part) for part in item[0]]
+            )
+        ]
+        try:
+            await db.execute(_upsert(), rows)
+            await db.commit()
+        except Exception:
+            # Put the counts back so the next flush retries them
+            _pending.update(pending)
+            APP_USAGE_PENDING.set(len(_pending))
+            raise
+
+        APP_USAGE_FLUSHED.inc(sum(pending.values()))
+        return len(rows)
+
+    @staticmethod
+    async def top_apps(
+        db: AsyncSession,
+        start: datetime,
+        end: datetime,
+        organization_id: Optional[str] = None,
+        project_id: Optional[str] = None,
+        employee_id: Optional[str] = None,
+        limit: int = 10,
+    ) -> Tuple[List[Dict], int]:
+        """The `limit` apps with the most screenshots in [start, end) and the
+        screenshots counted across every app"""
+        usage = app_usage_hourly.c
+        conditions = [usage.hour >= hour_start(start), usage.hour < end]
+        if organization_id:
+            conditions.append(usage.organization_id == organization_id)
+        if project_id:
+            conditions.append(usage.project_id == project_id)
+        if employee_id:
+            conditions.append(usage.employee_id == employee_id)
+
+        screenshots = func.sum(usage.screenshots)
+        result = await db.execute(
+            select(
+                usage.app_id,
+                ScreenshotApp.name.label("app"),
+                screenshots.label("screenshots"),
+                func.count(func.distinct(usage.employee_id)).label("employees"),
+                # Computed before the LIMIT, so it covers every app
+                func.sum(screenshots).over().label("total"),
+            )
+            .join(ScreenshotApp, ScreenshotApp.id == usage.app_id)
+            .where(and_(*conditions))
+            .group_by(usage.app_id, ScreenshotApp.name)
+            .order_by(desc("screenshots"), ScreenshotApp.name)
+            .limit(limit)
+        )
+        rows = result.all()
+        total = int(rows[0].total) if rows else 0
+        minutes_per_screenshot = settings.screenshot_interval_seconds / 60
+        apps = [
+            {
+                "app_id": row.app_id,
+                "app": row.app,
+                "screenshots": int(row.screenshots),
+                "minutes": round(row.screenshots * minutes_per_screenshot, 1),
+                "employees": row.employees,
+                "share": round(row.screenshots / total, 4) if total else 0.0,
+            }
+            for row in rows
+        ]
+        return apps, total
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, start: datetime, end: datetime) -> int:
+        """Recount the rollup for [start, end) from stored screenshots.
+
+        Hours whose screenshots were archived lose their counts, so keep the
+        range within retention. Returns the rows written.
+        """
+        start, end = hour_start(start), hour_start(end)
+        await db.execute(
+            delete(app_usage_hourly).where(
+                app_usage_hourly.c.hour >= start, app_usage_hourly.c.hour < end
+            )
+        )
+        hour = func.date_trunc("hour", Screenshot.created_at, "UTC")
+        counts = (
+            select(
+                hour,
+                Screenshot.organization_id,
+                Screenshot.employee_id,
+                Screenshot.project_id,
+                Screenshot.app_id,
+                func.count(),
+            )
+            .where(
+                Screenshot.created_at >= start,
+                Screenshot.created_at < end,
+                Screenshot.app_id.is_not(None),
+            )
+            .group_by(
+                hour,
+                Screenshot.organization_id,
+                Screenshot.employee_id,
+                Screenshot.project_id,
+                Screenshot.app_id,
+            )
+        )
+        result = await db.execute(
+            insert(app_usage_hourly).from_select([*KEY_COLUMNS, "screenshots"], counts)
+        )
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def run_flush() -> None:
+        async with AsyncSessionLocal() as db:
+            await AppUsageService.flush(db)
+
+
+app_usage_flusher = PeriodicTask(
+    "app-usage-flush",
+    settings.app_usage_flush_interval_seconds,
+    AppUsageService.run_flush,
+)
+
+
+async def main_async(options) -> int:
+    # The current hour may still have counts waiting in a worker's memory
+    until = options.until or hour_start(current_time())
+    async with AsyncSessionLocal() as db:
+        rows = await AppUsageService.rebuild(db, options.since, until)
+    await engine.dispose()
+    print(f"Rebuilt {rows} app usage rows from {options.since} to {until}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recount hourly app usage")
+    parser.add_argument("--since", type=datetime.fromisoformat, required=True)
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    options = parser.parse_args(argv)
+    for name in ("since", "until"):
+        value = getattr(options, name)
+        if value is not None and value.tzinfo is None:
+            setattr(options, name, value.replace(tzinfo=timezone.utc))
+    return asyncio.run(main_async(options))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -46,13 +46,14 @@ class EmployeeService:
                 detail="You don't have permission to add employees to this organization",
             )
 
-        hashed_password = Security.get_password_hash(employee_data.password)
+        hashed_password = await Security.hash_password(employee_data.password)
 
         employee = Employee(
             name=employee_data.name,
             email=employee_data.email,
             hashed_password=hashed_password,
             organization_id=employee_data.organization_id,
+            timezone=employee_data.timezone,
         )
 
         db.add(employee)
@@ -117,6 +118,26 @@ class EmployeeService:
 
         return list(employees), total
 
+    @staticmethod
+    async def get_organization_employees_version(
+        db: AsyncSession, organization_id: str
+    ) -> tuple:
+        """Counts and latest changes behind get_organization_employees, in one
+        cheap query, for ETags"""
+        organization_changed = (
+            select(Organization.updated_at)
+            .where(Organization.id == organization_id)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            select(
+                func.count(Employee.id),
+                func.max(Employee.updated_at),
+                organization_changed,
+            ).where(Employee.organization_id == organization_id)
+        )
+        return tuple(result.one())
+
     @staticmethod
     async def update(
         db: AsyncSession,
@@ -151,8 +172,12 @@ class EmployeeService:
 
         update_data = employee_update.model_dump(exclude_unset=True)
 
+        # Credentials or access changed: sign the employee out everywhere
+        if update_data.keys() & {"email", "password", "is_active"}:
+            Security.revoke_tokens(employee)
+
         if "password" in update_data:
-            update_data["hashed_password"] = Security.get_password_hash(
+            update_data["hashed_password"] = await Security.hash_password(
                 update_data.pop("password")
             )
 
@@ -183,6 +208,7 @@ class EmployeeService:
             )
 
         employee.is_active = False
+        Security.revoke_tokens(employee)
         await db.commit()
         return True
 
@@ -208,6 +234,7 @@ class EmployeeService:
             )
 
         employee.is_active = False
+        Security.revoke_tokens(employee)
         await db.commit()
         return True
 
@@ -241,6 +268,8 @@ class EmployeeService:
         db: AsyncSession, user_id: str, organization_id: str
     ) -> bool:
         """Check if user can manage the organization (creator or admin)"""
+        if Security.claims_allow(user_id, organization_id):
+            return True
         user_result = await db.execute(select(User).where(User.id == user_id))
         user = user_result.scalar_one_or_none()
 
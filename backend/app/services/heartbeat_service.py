@@ -0,0 +1,205 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update, func, and_, case, bindparam, cast, Integer, Numeric
+from typing import Dict, Optional
+from datetime import datetime
+import logging
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.metrics import (
+    HEARTBEATS_RECEIVED,
+    HEARTBEATS_FLUSHED,
+    HEARTBEATS_PENDING,
+    SESSIONS_AUTO_CLOSED,
+    SESSION_SWEEPS,
+)
+from app.db.database import AsyncSessionLocal
+from app.models.time_tracking import TimeTracking
+from app.models.time_tracking_break import TimeTrackingBreak
+from app.models.employee import Employee
+from app.models.organization import Organization
+from app.services.hour_limit_service import HourLimitService
+from app.services.time_tracking_service import TimeTrackingService
+from app.utils.utils import current_time
+
+logger = logging.getLogger(__name__)
+
+
+def minutes_between(start, end):
+    """Whole minutes from start to end, in SQL"""
+    return cast(func.floor(func.extract("epoch", end - start) / 60), Integer)
+
+
+# Latest heartbeat per employee since the last flush
+_last_seen: Dict[str, datetime] = {}
+
+
+class HeartbeatService:
+    @staticmethod
+    def record(employee_id: str, seen_at: Optional[datetime] = None) -> None:
+        """Remember a heartbeat in memory; it reaches the DB on the next flush"""
+        _last_seen[employee_id] = seen_at or current_time()
+        HEARTBEATS_RECEIVED.inc()
+        HEARTBEATS_PENDING.set(len(_last_seen))
+
+    @staticmethod
+    async def flush(db: AsyncSession) -> int:
+        """Write pending heartbeats to open sessions in one batched UPDATE"""
+        if not _last_seen:
+            return 0
+
+        pending = dict(_last_seen)
+        _last_seen.clear()
+        HEARTBEATS_PENDING.set(0)
+
+        table = TimeTracking.__table__
+        statement = (
+            update(table)
+            .where(
+                and_(
+                    table.c.employee_id == bindparam("b_employee_id"),
+                    table.c.clock_out == None,
+                    table.c.is_active == True,
+                )
+            )
+            .values(last_heartbeat_at=bindparam("b_seen_at"))
+        )
+        try:
+            await db.execute(
+                statement,
+                [
+                    {"b_employee_id": employee_id, "b_seen_at": seen_at}
+                    for employee_id, seen_at in pending.items()
+                ],
+            )
+            await db.commit()
+        except Exception:
+            # Put the batch back unless a newer heartbeat arrived meanwhile
+            for employee_id, seen_at in pending.items():
+                _last_seen.setdefault(employee_id, seen_at)
+            HEARTBEATS_PENDING.set(len(_last_seen))
+            raise
+
+        HEARTBEATS_FLUSHED.inc(len(pending))
+        return len(pending)
+
+    @staticmethod
+    async def close_stale_sessions(db: AsyncSession) -> int:
+        """Close every session whose last heartbeat is older than its org's timeout.
+
+        Runs as a single UPDATE ... FROM employees, organizations and uses the
+        last heartbeat as the clock out time. Sessions that never sent one
+        (clients without heartbeats) are left open. A break in progress ends
+        at the same time.
+        """
+        last_seen = TimeTracking.last_heartbeat_at
+        timeout_minutes = func.coalesce(
+            Organization.idle_timeout_minutes, settings.session_idle_timeout_minutes
+        )
+        on_break = and_(
+            TimeTracking.break_start != None, TimeTracking.break_end == None
+        )
+        break_end = func.greatest(last_seen, TimeTracking.break_start)
+        break_minutes = func.coalesce(TimeTracking.break_duration_minutes, 0) + case(
+            (on_break, minutes_between(TimeTracking.break_start, break_end)), else_=0
+        )
+        worked_minutes = (
+            minutes_between(TimeTracking.clock_in, last_seen) - break_minutes
+        )
+
+        result = await db.execute(
+            update(TimeTracking)
+            .where(
+                and_(
+                    TimeTracking.employee_id == Employee.id,
+                    Employee.organization_id == Organization.id,
+                    TimeTracking.clock_out == None,
+                    TimeTracking.is_active == True,
+                    last_seen != None,
+                    timeout_minutes > 0,
+                    last_seen
+                    < current_time()
+                    - func.make_interval(0, 0, 0, 0, 0, timeout_minutes),
+                )
+            )
+            .values(
+                clock_out=last_seen,
+                total_minutes=worked_minutes,
+                total_hours=func.round(cast(worked_minutes, Numeric) / 60, 2),
+                notes=func.concat_ws(
+                    "\n", TimeTracking.notes, "Auto clock out: no heartbeat"
+                ),
+                break_end=case((on_break, break_end), else_=TimeTracking.break_end),
+                break_duration_minutes=case(
+                    (on_break, break_minutes), else_=TimeTracking.break_duration_minutes
+                ),
+            )
+            .returning(
+                TimeTracking.id,
+                TimeTracking.employee_id,
+                TimeTracking.project_id,
+                TimeTracking.task_id,
+                TimeTracking.clock_in,
+                TimeTracking.total_minutes,
+                Employee.organization_id,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        closed = result.all()
+        if closed:
+            # Close the break rows left open by the sessions just closed
+            ended = func.coalesce(TimeTracking.break_end, TimeTracking.clock_out)
+            await db.execute(
+                update(TimeTrackingBreak)
+                .where(
+                    and_(
+                        TimeTrackingBreak.time_tracking_id == TimeTracking.id,
+                        TimeTrackingBreak.break_end == None,
+                        TimeTracking.clock_out != None,
+                    )
+                )
+                .values(
+                    break_end=ended,
+                    duration_minutes=minutes_between(
+                        TimeTrackingBreak.break_start, ended
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+
+        SESSION_SWEEPS.inc()
+        if not closed:
+            return 0
+
+        SESSIONS_AUTO_CLOSED.inc(len(closed))
+        logger.info(f"Auto clocked out {len(closed)} idle sessions")
+
+        for session in closed:
+            HourLimitService.record_closed_session(session)
+            await TimeTrackingService.publish_presence(
+                db, "clock_out", session, organization_id=session.organization_id
+            )
+        return len(closed)
+
+    @staticmethod
+    async def run_flush() -> None:
+        async with AsyncSessionLocal() as db:
+            await HeartbeatService.flush(db)
+
+    @staticmethod
+    async def run_sweep() -> None:
+        async with AsyncSessionLocal() as db:
+            await HeartbeatService.flush(db)
+            await HeartbeatService.close_stale_sessions(db)
+
+
+heartbeat_flusher = PeriodicTask(
+    "heartbeat-flush",
+    settings.heartbeat_flush_interval_seconds,
+    HeartbeatService.run_flush,
+)
+session_sweeper = PeriodicTask(
+    "session-sweeper",
+    settings.session_sweep_interval_seconds,
+    HeartbeatService.run_sweep,
+)
@@ -0,0 +1,239 @@
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, case
+from app.core.config import settings
+from app.models.time_tracking import TimeTracking
+from app.models.project import Project
+from app.models.task import Task
+from app.utils.utils import current_time
+from fastapi import HTTPException
+
+
+@dataclass
+class RunningTotals:
+    """Closed-session minutes for one employee in the current UTC day and week"""
+
+    day_start: datetime
+    week_start: datetime
+    loaded_at: float
+    day_minutes: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    week_minutes: Dict[Tuple[str, str], int] = field(default_factory=dict)
+
+
+# Per-employee running totals, keyed by employee ID. Each worker keeps its own
+# copy; entries are re-read from the database once they are older than
+# settings.hour_limit_cache_ttl_seconds or when the day/week rolls over.
+_running_totals: Dict[str, RunningTotals] = {}
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC so they compare with timestamptz values"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def session_elapsed_minutes(session: TimeTracking, now: datetime) -> int:
+    """Worked minutes of an open session, excluding recorded break time"""
+    elapsed = now - as_utc(session.clock_in)
+    minutes = int(elapsed.total_seconds() / 60) - (session.break_duration_minutes or 0)
+    return max(minutes, 0)
+
+
+class HourLimitService:
+    @staticmethod
+    def period_starts(now: datetime) -> Tuple[datetime, datetime]:
+        """Start of the current UTC day and of the current (Monday-based) week"""
+        day_start = now.astimezone(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        week_start = day_start - timedelta(days=day_start.weekday())
+        return day_start, week_start
+
+    @staticmethod
+    async def get_running_totals(
+        db: AsyncSession, employee_id: str, now: Optional[datetime] = None
+    ) -> RunningTotals:
+        """Get cached running totals for an employee, reconciling if stale"""
+        now = now or current_time()
+        day_start, week_start = HourLimitService.period_starts(now)
+
+        totals = _running_totals.get(employee_id)
+        if (
+            totals
+            and totals.day_start == day_start
+            and time.monotonic() - totals.loaded_at
+            < settings.hour_limit_cache_ttl_seconds
+        ):
+            return totals
+
+        totals = await HourLimitService._load_running_totals(
+            db, employee_id, day_start, week_start
+        )
+        _running_totals[employee_id] = totals
+        return totals
+
+    @staticmethod
+    async def _load_running_totals(
+        db: AsyncSession, employee_id: str, day_start: datetime, week_start: datetime
+    ) -> RunningTotals:
+        """Aggregate this week's closed sessions for an employee in one query"""
+        result = await db.execute(
+            select(
+                TimeTracking.project_id,
+                TimeTracking.task_id,
+                func.coalesce(func.sum(TimeTracking.total_minutes), 0),
+                func.coalesce(
+                    func.sum(
+                        case(
+                            (
+                                TimeTracking.clock_in >= day_start,
+                                TimeTracking.total_minutes,
+                            ),
+                            else_=0,
+                        )
+                    ),
+                    0,
+                ),
+            )
+            .where(
+                and_(
+                    TimeTracking.employee_id == employee_id,
+                    TimeTracking.clock_in >= week_start,
+                    TimeTracking.clock_out != None,
+                    TimeTracking.is_active == True,
+                )
+            )
+            .group_by(TimeTracking.project_id, TimeTracking.task_id)
+        )
+
+        totals = RunningTotals(
+            day_start=day_start, week_start=week_start, loaded_at=time.monotonic()
+        )
+        for project_id, task_id, week_minutes, day_minutes in result.all():
+            for key in HourLimitService._keys(project_id, task_id):
+                totals.week_minutes[key] = totals.week_minutes.get(key, 0) + int(
+                    week_minutes
+                )
+                totals.day_minutes[key] = totals.day_minutes.get(key, 0) + int(
+                    day_minutes
+                )
+        return totals
+
+    @staticmethod
+    def _keys(
+        project_id: Optional[str], task_id: Optional[str]
+    ) -> List[Tuple[str, str]]:
+        keys = []
+        if project_id:
+            keys.append(("project", project_id))
+        if task_id:
+            keys.append(("task", task_id))
+        return keys
+
+    @staticmethod
+    def record_closed_session(session: TimeTracking) -> None:
+        """Add a just-closed session to the cached totals without a DB round trip"""
+        totals = _running_totals.get(session.employee_id)
+        if not totals or not session.total_minutes:
+            return
+
+        clock_in = as_utc(session.clock_in)
+        if clock_in < totals.week_start:
+            return
+
+        for key in HourLimitService._keys(session.project_id, session.task_id):
+            totals.week_minutes[key] = (
+                totals.week_minutes.get(key, 0) + session.total_minutes
+            )
+            if clock_in >= totals.day_start:
+                totals.day_minutes[key] = (
+                    totals.day_minutes.get(key, 0) + session.total_minutes
+                )
+
+    @staticmethod
+    def invalidate(employee_id: str) -> None:
+        """Drop cached totals so the next lookup reconciles with the database"""
+        _running_totals.pop(employee_id, None)
+
+    @staticmethod
+    def _limits(
+        project: Optional[Project], task: Optional[Task]
+    ) -> List[Tuple[Tuple[str, str], str, Optional[int], Optional[int]]]:
+        """(key, label, daily limit, weekly limit) for each limited scope, in minutes"""
+        limits = []
+        for kind, entity in (("project", project), ("task", task)):
+            if entity is None:
+                continue
+            daily = entity.max_hours_per_day
+            weekly = entity.max_hours_per_week
+            if daily or weekly:
+                limits.append(
+                    (
+                        (kind, entity.id),
+                        f"{kind} '{entity.name}'",
+                        daily * 60 if daily else None,
+                        weekly * 60 if weekly else None,
+                    )
+                )
+        return limits
+
+    @staticmethod
+    async def ensure_within_limits(
+        db: AsyncSession,
+        employee_id: str,
+        project: Optional[Project],
+        task: Optional[Task],
+    ) -> None:
+        """Reject a clock in when a project or task limit is already used up"""
+        limits = HourLimitService._limits(project, task)
+        if not limits:
+            return
+
+        totals = await HourLimitService.get_running_totals(db, employee_id)
+        for key, label, daily, weekly in limits:
+            if daily is not None and totals.day_minutes.get(key, 0) >= daily:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Daily hour limit reached for {label}",
+                )
+            if weekly is not None and totals.week_minutes.get(key, 0) >= weekly:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Weekly hour limit reached for {label}",
+                )
+
+    @staticmethod
+    async def get_remaining_allowance(
+        db: AsyncSession, session: TimeTracking, now: Optional[datetime] = None
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """Remaining minutes today and this week for an open session.
+
+        Uses the tightest limit of the session's project and task; None means
+        the session is not limited for that period.
+        """
+        limits = HourLimitService._limits(session.project, session.task)
+        if not limits:
+            return None, None
+
+        now = now or current_time()
+        totals = await HourLimitService.get_running_totals(db, session.employee_id, now)
+        elapsed = session_elapsed_minutes(session, now)
+
+        remaining_day = None
+        remaining_week = None
+        for key, _, daily, weekly in limits:
+            if daily is not None:
+                left = max(daily - totals.day_minutes.get(key, 0) - elapsed, 0)
+                remaining_day = (
+                    left if remaining_day is None else min(remaining_day, left)
+                )
+            if weekly is not None:
+                left = max(weekly - totals.week_minutes.get(key, 0) - elapsed, 0)
+                remaining_week = (
+                    left if remaining_week is None else min(remaining_week, left)
+                )
+        return remaining_day, remaining_week
@@ -0,0 +1,40 @@
+"""Local days and weeks, computed in SQL.
+
+Time entries are bucketed in their employee's time zone: employees.timezone,
+else organizations.timezone, else settings.default_timezone. Postgres converts
+each timestamp with AT TIME ZONE and truncates it, so day and week totals are
+grouped in the query and stay right across DST changes. Weeks start on Monday.
+Queries using employee_timezone() join employees and organizations.
+
+Postgres has its own tz database, so load_database_timezones() runs at startup:
+it refuses a DEFAULT_TIMEZONE Postgres doesn't know and makes check_timezone
+reject such names for organizations and employees too.
+"""
+
+from sqlalchemy import Date, cast, func, text
+from app.core.config import settings
+from app.db.database import engine
+from app.models.employee import Employee
+from app.models.organization import Organization
+from app.utils.timezones import check_timezone, set_database_timezones
+
+
+def employee_timezone():
+    return func.coalesce(
+        Employee.timezone, Organization.timezone, settings.default_timezone
+    )
+
+
+def local_date(column, zone, unit: str = "day"):
+    """Local calendar day (or the Monday of the week) of a timestamptz"""
+    return cast(func.date_trunc(unit, column.op("AT TIME ZONE")(zone)), Date)
+
+
+async def load_database_timezones() -> None:
+    async with engine.connect() as conn:
+        names = await conn.scalars(text("SELECT name FROM pg_timezone_names"))
+        set_database_timezones(names)
+    try:
+        check_timezone(settings.default_timezone)
+    except ValueError as e:
+        raise ValueError(f"DEFAULT_TIMEZONE: {str(e)}")
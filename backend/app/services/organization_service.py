@@ -2,8 +2,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
+from app.core.config import settings
 from app.models.organization import Organization
 from app.models.user import User, UserRole
+from app.core.security import Security
 from app.schemas.organization import OrganizationCreate, OrganizationUpdate
 from fastapi import HTTPException
 
@@ -80,6 +82,27 @@ class OrganizationService:
 
         return list(organizations), total
 
+    @staticmethod
+    async def get_user_organizations_version(db: AsyncSession, user_id: str) -> tuple:
+        """Count and latest change behind get_user_organizations, for ETags"""
+        result = await db.execute(
+            select(
+                func.count(Organization.id), func.max(Organization.updated_at)
+            ).where(Organization.created_by == user_id)
+        )
+        return tuple(result.one())
+
+    @staticmethod
+    async def get_user_organization_ids(db: AsyncSession, user_id: str) -> List[str]:
+        """IDs of the organizations a user created, for access token claims"""
+        result = await db.execute(
+            select(Organization.id)
+            .where(Organization.created_by == user_id)
+            .order_by(Organization.created_at.desc())
+            .limit(settings.jwt_max_organization_claims)
+        )
+        return list(result.scalars().all())
+
     @staticmethod
     async def update(
         db: AsyncSession, organization_id: str, organization_update: OrganizationUpdate
@@ -128,6 +151,8 @@ class OrganizationService:
         db: AsyncSession, user_id: str, organization_id: str
     ) -> bool:
         """Check if user can manage the organization (creator or admin)"""
+        if Security.claims_allow(user_id, organization_id):
+            return True
         # Get user
         user_result = await db.execute(select(User).where(User.id == user_id))
         user = user_result.scalar_one_or_none()
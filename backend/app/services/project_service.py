@@ -1,12 +1,14 @@
 # app/services/project_service.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, true
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from app.models.project import Project, project_employees
 from app.models.employee import Employee
 from app.models.organization import Organization
 from app.models.user import User, UserRole
+from app.core.security import Security
+from app.core.single_flight import single_flight
 from app.schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate
 from fastapi import HTTPException
 from datetime import datetime
@@ -64,6 +66,13 @@ class ProjectService:
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    @single_flight
+    async def get_by_id_shared(db: AsyncSession, project_id: str) -> Optional[Project]:
+        """Get project by ID for display; concurrent lookups share one query,
+        so callers must not modify the result"""
+        return await ProjectService.get_by_id(db, project_id)
+
     @staticmethod
     async def get_by_code(db: AsyncSession, code: str) -> Optional[Project]:
         """Get project by code"""
@@ -102,6 +111,46 @@ class ProjectService:
 
         return list(projects), total
 
+    @staticmethod
+    async def get_organization_projects_version(
+        db: AsyncSession, organization_id: str
+    ) -> tuple:
+        """Counts and latest changes behind get_organization_projects, in one
+        cheap query, for ETags"""
+        projects = (
+            select(
+                func.count(Project.id).label("projects"),
+                func.max(Project.updated_at).label("projects_changed"),
+            )
+            .where(Project.organization_id == organization_id)
+            .subquery()
+        )
+        members = (
+            select(
+                func.count().label("members"),
+                func.max(project_employees.c.assigned_at).label("assigned"),
+                func.max(Employee.updated_at).label("employees_changed"),
+            )
+            .select_from(project_employees)
+            .join(Project, Project.id == project_employees.c.project_id)
+            .join(Employee, Employee.id == project_employees.c.employee_id)
+            .where(Project.organization_id == organization_id)
+            .subquery()
+        )
+        organization_changed = (
+            select(Organization.updated_at)
+            .where(Organization.id == organization_id)
+            .scalar_subquery()
+        )
+        # Both aggregates are one row; an explicit join avoids a cartesian
+        # product warning
+        result = await db.execute(
+            select(projects, members, organization_changed.label("organization"))
+            .select_from(projects)
+            .join(members, true())
+        )
+        return tuple(result.one())
+
     @staticmethod
     async def update(
         db: AsyncSession,
@@ -326,26 +375,37 @@ class ProjectService:
         return result.scalars().all()
 
     @staticmethod
-    async def get_employee_assigned_at(
-        db: AsyncSession, project_id: str, employee_id: str
-    ) -> Optional[datetime]:
-        """Get the assigned_at timestamp for an employee in a project"""
+    async def get_assigned_at(
+        db: AsyncSession, project_ids: List[str]
+    ) -> Dict[Tuple[str, str], datetime]:
+        """assigned_at of the active assignments to these projects, by
+        (project_id, employee_id), in one query"""
+        if not project_ids:
+            return {}
         result = await db.execute(
-            select(project_employees.c.assigned_at).where(
+            select(
+                project_employees.c.project_id,
+                project_employees.c.employee_id,
+                project_employees.c.assigned_at,
+            ).where(
                 and_(
-                    project_employees.c.project_id == project_id,
-                    project_employees.c.employee_id == employee_id,
+                    project_employees.c.project_id.in_(project_ids),
                     project_employees.c.is_active == True,
                 )
             )
         )
-        return result.scalar_one_or_none()
+        return {
+            (str(project_id), str(employee_id)): assigned_at
+            for project_id, employee_id, assigned_at in result.all()
+        }
 
     @staticmethod
     async def can_user_manage_organization(
         db: AsyncSession, user_id: str, organization_id: str
     ) -> bool:
         """Check if user can manage the organization (creator or admin)"""
+        if Security.claims_allow(user_id, organization_id):
+            return True
         user_result = await db.execute(select(User).where(User.id == user_id))
         user = user_result.scalar_one_or_none()
 
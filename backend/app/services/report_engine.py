@@ -0,0 +1,381 @@
+"""Columnar time report computation.
+
+The time entries of a report are fetched as one row of arrays (one array per
+column, built by array_agg) and reduced with NumPy, instead of loading an ORM
+object per entry and summing in Python. Employee and project IDs become
+integer codes. That way every grouping is a bincount over a code, or a
+reduceat over entries sorted by employee:
+
+- totals per employee, per project, per day and per ISO week, in each
+  employee's time zone (the database computes each entry's local day)
+- overtime per employee: for each week, the larger of the minutes above
+  report_workweek_minutes and the sum of the minutes above
+  report_workday_minutes on each day
+- utilization: worked minutes over report_workday_minutes per business day
+  in the range
+- overlapping entries of the same employee, found with one running maximum
+  over clock-outs of entries sorted by (employee, clock_in)
+
+Worked minutes are the entries' total_minutes (breaks already taken out), so
+open sessions count as 0, as in the entry-by-entry report.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, cast, Float, Integer, String
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.organization import Organization
+from app.models.project import Project
+from app.models.time_tracking import TimeTracking
+from app.schemas.time_tracking import TimeReportRequest
+from app.services.local_time import employee_timezone, local_date
+from app.utils.utils import current_time
+
+DAY = 86400
+EPOCH_DATE = date(1970, 1, 1)
+# 1970-01-01 was a Thursday; shifting by 3 days starts weeks on Monday
+WEEK_OFFSET_DAYS = 3
+
+
+@dataclass
+class TimeEntries:
+    """A report's time entries as parallel arrays"""
+
+    ids: np.ndarray  # object: entry IDs
+    employee: np.ndarray  # int: index into employee_ids
+    project: np.ndarray  # int: index into project_ids
+    day: np.ndarray  # int: local day of clock_in, days since 1970-01-01
+    clock_in: np.ndarray  # float: epoch seconds
+    clock_out: np.ndarray  # float: epoch seconds, NaN while open
+    minutes: np.ndarray  # float: worked minutes, 0 while open
+    breaks: np.ndarray  # float: break minutes
+    employee_ids: List[str]
+    project_ids: List[Optional[str]]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def factorize(values: list) -> "tuple[np.ndarray, list]":
+    """Integer codes for `values` in first-seen order, and the distinct values"""
+    index: Dict = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+    return codes, list(index)
+
+
+def _epoch(column):
+    return cast(func.extract("epoch", column), Float)
+
+
+async def fetch_entries(db: AsyncSession, request: TimeReportRequest) -> TimeEntries:
+    """The entries the report covers, with the filters of the per-entry report"""
+    conditions = [
+        TimeTracking.clock_in >= request.start_date,
+        TimeTracking.clock_in <= request.end_date,
+        TimeTracking.is_active == True,
+    ]
+    if request.employee_ids:
+        conditions.append(TimeTracking.employee_id.in_(request.employee_ids))
+    if request.project_id:
+        conditions.append(TimeTracking.project_id == request.project_id)
+    if request.task_id:
+        conditions.append(TimeTracking.task_id == request.task_id)
+
+    local_day = local_date(TimeTracking.clock_in, employee_timezone()) - EPOCH_DATE
+    # Text keeps the driver from building a UUID object per ID
+    result = await db.execute(
+        select(
+            func.array_agg(cast(TimeTracking.id, String)),
+            func.array_agg(cast(TimeTracking.employee_id, String)),
+            func.array_agg(cast(TimeTracking.project_id, String)),
+            func.array_agg(cast(local_day, Integer)),
+            func.array_agg(_epoch(TimeTracking.clock_in)),
+            func.array_agg(_epoch(TimeTracking.clock_out)),
+            func.array_agg(func.coalesce(TimeTracking.total_minutes, 0)),
+            func.array_agg(func.coalesce(TimeTracking.break_duration_minutes, 0)),
+        )
+        .join(Employee, Employee.id == TimeTracking.employee_id)
+        .join(Organization, Organization.id == Employee.organization_id)
+        .where(and_(*conditions))
+    )
+    ids, employees, projects, days, clock_in, clock_out, minutes, breaks = result.one()
+    if ids is None:
+        ids = employees = projects = days = clock_in = clock_out = minutes = breaks = []
+
+    employee, employee_ids = factorize(employees)
+    project, project_ids = factorize(projects)
+    return TimeEntries(
+        ids=np.array(ids, dtype=object),
+        employee=employee,
+        project=project,
+        day=np.array(days, dtype=np.int64),
+        clock_in=np.array(clock_in, dtype=np.float64),
+        # None (still open) becomes NaN
+        clock_out=np.array(clock_out, dtype=np.float64),
+        minutes=np.array(minutes, dtype=np.float64),
+        breaks=np.array(breaks, dtype=np.float64),
+        employee_ids=employee_ids,
+        project_ids=project_ids,
+    )
+
+
+def find_overlaps(entries: TimeEntries, now: float) -> Dict[str, np.ndarray]:
+    """Entries that start before an earlier entry of the same employee ends.
+
+    Sorted by (employee, clock_in), entry i overlaps when its clock-in is
+    before the latest clock-out among the employee's earlier entries. Adding
+    employee * span to every time makes one running maximum serve all
+    employees: an earlier employee's times are always below a later one's.
+    """
+    n = len(entries)
+    if n < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return {"entry": empty, "previous": empty, "minutes": np.empty(0)}
+
+    order = np.lexsort((entries.clock_in, entries.employee))
+    # Open sessions run until now
+    end = np.where(np.isnan(entries.clock_out), now, entries.clock_out)
+    end = np.fmax(end, entries.clock_in)[order]
+    start = entries.clock_in[order]
+    origin = start.min()
+    span = end.max() - origin + 1
+    offset = entries.employee[order] * span
+    start = start - origin + offset
+    end = end - origin + offset
+
+    latest_end = np.maximum.accumulate(end)
+    # Index of the entry holding the running maximum
+    holder = np.maximum.accumulate(np.where(end == latest_end, np.arange(n), 0))
+    overlapping = np.flatnonzero(start[1:] < latest_end[:-1]) + 1
+    previous = holder[overlapping - 1]
+    minutes = (
+        np.minimum(latest_end[overlapping - 1], end[overlapping]) - start[overlapping]
+    ) / 60
+    return {
+        "entry": order[overlapping],
+        "previous": order[previous],
+        "minutes": minutes,
+    }
+
+
+def _business_days(start: datetime, end: datetime) -> int:
+    return int(np.busday_count(start.date(), (end + timedelta(days=1)).date()))
+
+
+def _day(day_index: int) -> str:
+    return datetime.fromtimestamp(day_index * DAY, tz=timezone.utc).date().isoformat()
+
+
+def compute(
+    entries: TimeEntries,
+    start_date: datetime,
+    end_date: datetime,
+    now: Optional[datetime] = None,
+) -> Dict:
+    """Report sections over `entries`; IDs are returned as codes' values"""
+    now = now or current_time()
+    workday = settings.report_workday_minutes
+    workweek = settings.report_workweek_minutes
+    n_employees = len(entries.employee_ids)
+    n_projects = len(entries.project_ids)
+
+    # Day and week indexes relative to the first one in the report
+    days = entries.day.copy()
+    first_day = int(days.min()) if len(entries) else 0
+    days -= first_day
+    n_days = int(days.max()) + 1 if len(entries) else 0
+    absolute_days = np.arange(n_days) + first_day
+    week_of_day = (absolute_days + WEEK_OFFSET_DAYS) // 7
+    first_week = int(week_of_day[0]) if n_days else 0
+    week_of_day -= first_week
+    n_weeks = int(week_of_day[-1]) + 1 if n_days else 0
+
+    # Per employee: reduceat over entries sorted by employee
+    order = np.argsort(entries.employee, kind="stable")
+    sorted_employee = entries.employee[order]
+    starts = np.flatnonzero(np.r_[True, sorted_employee[1:] != sorted_employee[:-1]])
+    employee_minutes = np.zeros(n_employees)
+    employee_breaks = np.zeros(n_employees)
+    employee_entries = np.zeros(n_employees, dtype=np.int64)
+    if len(entries):
+        present = sorted_employee[starts]
+        employee_minutes[present] = np.add.reduceat(entries.minutes[order], starts)
+        employee_breaks[present] = np.add.reduceat(entries.breaks[order], starts)
+        employee_entries[present] = np.diff(np.r_[starts, len(entries)])
+
+    # Employee x day and employee x week grids
+    employee_day = np.bincount(
+        entries.employee * n_days + days,
+        weights=entries.minutes,
+        minlength=n_employees * n_days,
+    ).reshape(n_employees, n_days)
+    daily_excess = np.clip(employee_day - workday, 0, None)
+    week_index = np.broadcast_to(week_of_day, employee_day.shape)
+    rows = np.arange(n_employees)[:, None] * n_weeks
+    employee_week = np.bincount(
+        (rows + week_index).ravel(),
+        weights=employee_day.ravel(),
+        minlength=n_employees * n_weeks,
+    ).reshape(n_employees, n_weeks)
+    week_daily_excess = np.bincount(
+        (rows + week_index).ravel(),
+        weights=daily_excess.ravel(),
+        minlength=n_employees * n_weeks,
+    ).reshape(n_employees, n_weeks)
+    overtime = np.maximum(
+        np.clip(employee_week - workweek, 0, None), week_daily_excess
+    ).sum(axis=1)
+
+    capacity = _business_days(start_date, end_date) * workday
+    utilization = employee_minutes / capacity if capacity else None
+
+    overlaps = find_overlaps(entries, now.timestamp())
+    overlap_counts = np.bincount(
+        entries.employee[overlaps["entry"]], minlength=n_employees
+    )
+
+    # Per project, counting each employee once
+    project_minutes = np.bincount(
+        entries.project, weights=entries.minutes, minlength=n_projects
+    )
+    project_entries = np.bincount(entries.project, minlength=n_projects)
+    pairs = np.unique(entries.project * max(n_employees, 1) + entries.employee)
+    project_employees = np.bincount(pairs // max(n_employees, 1), minlength=n_projects)
+
+    day_entries = np.bincount(days, minlength=n_days)
+    week_entries = np.bincount(week_of_day[days], minlength=n_weeks)
+
+    total_minutes = float(entries.minutes.sum())
+    return {
+        "summary": {
+            "total_hours": round(total_minutes / 60, 2),
+            "total_minutes": int(total_minutes),
+            "total_entries": len(entries),
+            "unique_employees": n_employees,
+            "break_minutes": int(entries.breaks.sum()),
+            "overtime_minutes": int(overtime.sum()),
+            "overlapping_entries": len(overlaps["entry"]),
+            "utilization": (
+                round(total_minutes / (capacity * n_employees), 4)
+                if capacity and n_employees
+                else None
+            ),
+        },
+        "employees": [
+            {
+                "employee_id": employee_id,
+                "total_hours": round(float(employee_minutes[i]) / 60, 2),
+                "total_minutes": int(employee_minutes[i]),
+                "entries": int(employee_entries[i]),
+                "break_minutes": int(employee_breaks[i]),
+                "overtime_minutes": int(overtime[i]),
+                "utilization": (
+                    round(float(utilization[i]), 4) if utilization is not None else None
+                ),
+                "overlapping_entries": int(overlap_counts[i]),
+            }
+            for i, employee_id in enumerate(entries.employee_ids)
+        ],
+        "projects": [
+            {
+                "project_id": project_id,
+                "total_hours": round(float(project_minutes[i]) / 60, 2),
+                "total_minutes": int(project_minutes[i]),
+                "entries": int(project_entries[i]),
+                "employees": int(project_employees[i]),
+            }
+            for i, project_id in enumerate(entries.project_ids)
+        ],
+        "daily": [
+            {
+                "date": _day(int(absolute_days[d])),
+                "total_hours": round(float(employee_day[:, d].sum()) / 60, 2),
+                "entries": int(day_entries[d]),
+                "employees": int((employee_day[:, d] > 0).sum()),
+            }
+            for d in np.flatnonzero(day_entries)
+        ],
+        "weekly": [
+            {
+                "week_start": _day(int((w + first_week) * 7 - WEEK_OFFSET_DAYS)),
+                "total_hours": round(float(employee_week[:, w].sum()) / 60, 2),
+                "entries": int(week_entries[w]),
+                "employees": int((employee_week[:, w] > 0).sum()),
+            }
+            for w in np.flatnonzero(week_entries)
+        ],
+        "overlaps": [
+            {
+                "employee_id": entries.employee_ids[entries.employee[entry]],
+                "entry_id": entries.ids[entry],
+                "overlaps_entry_id": entries.ids[previous],
+                "overlap_minutes": round(float(minutes), 1),
+            }
+            for entry, previous, minutes in zip(
+                overlaps["entry"][: settings.report_max_overlaps],
+                overlaps["previous"][: settings.report_max_overlaps],
+                overlaps["minutes"][: settings.report_max_overlaps],
+            )
+        ],
+    }
+
+
+class ReportEngine:
+    @staticmethod
+    async def generate_report(
+        db: AsyncSession, report_request: TimeReportRequest
+    ) -> Dict:
+        """Aggregated time report: totals, breakdowns, overtime, utilization
+        and overlaps, without the per-entry log"""
+        entries = await fetch_entries(db, report_request)
+        report = compute(entries, report_request.start_date, report_request.end_date)
+
+        # Names for the few distinct employees and projects
+        employees = {}
+        if entries.employee_ids:
+            result = await db.execute(
+                select(Employee.id, Employee.name, Employee.email).where(
+                    Employee.id.in_(entries.employee_ids)
+                )
+            )
+            employees = {row.id: row for row in result}
+        projects = {}
+        project_ids = [p for p in entries.project_ids if p is not None]
+        if project_ids:
+            result = await db.execute(
+                select(Project.id, Project.name).where(Project.id.in_(project_ids))
+            )
+            projects = {row.id: row.name for row in result}
+
+        employee_breakdown = {}
+        for row in report.pop("employees"):
+            employee_id = row.pop("employee_id")
+            employee = employees.get(employee_id)
+            employee_breakdown[employee_id] = {
+                "employee_name": employee.name if employee else None,
+                "employee_email": employee.email if employee else None,
+                **row,
+            }
+        for row in report["projects"]:
+            row["project_name"] = projects.get(row["project_id"])
+
+        return {
+            "report_period": {
+                "start_date": report_request.start_date,
+                "end_date": report_request.end_date,
+            },
+            "summary": report["summary"],
+            "employee_breakdown": employee_breakdown,
+            "project_breakdown": report["projects"],
+            "daily": report["daily"],
+            "weekly": report["weekly"],
+            "overlaps": report["overlaps"],
+        }
@@ -0,0 +1,214 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, text, tuple_
+from typing import Dict, Iterable, Optional, Set, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import logging
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.metrics import (
+    SCREENSHOTS_ARCHIVED,
+    STORAGE_OBJECTS_PURGED,
+    SCREENSHOT_ARCHIVAL_LAST_SUCCESS,
+)
+from app.core.rate_limit import MemoryBucketStore, Rate
+from app.core.storage import MAX_DELETE_KEYS, delete_objects, screenshot_key
+from app.db.database import AsyncSessionLocal, engine
+from app.db.partitions import detach_partition, expired_partitions, is_partitioned
+from app.db.types import NIL_UUID
+from app.models.organization import Organization
+from app.models.screenshot import Screenshot
+from app.utils.utils import current_time
+
+logger = logging.getLogger(__name__)
+
+# Keeps two workers from archiving the same rows at once
+ARCHIVAL_LOCK_ID = 0x6D6F6D61
+
+# Paces DeleteObjects calls to settings.screenshot_archival_delete_rate
+_delete_calls = MemoryBucketStore(max_keys=1)
+
+
+class RetentionService:
+    @staticmethod
+    async def get_policies(db: AsyncSession) -> Dict[str, int]:
+        """Screenshot retention in days per organization (0 keeps everything)"""
+        result = await db.execute(
+            select(
+                Organization.id,
+                func.coalesce(
+                    Organization.screenshot_retention_days,
+                    settings.screenshot_retention_days,
+                ),
+            )
+        )
+        return dict(result.all())
+
+    @staticmethod
+    async def purge_objects(paths: Iterable[str]) -> Set[str]:
+        """Delete the stored objects of `paths` in bulk; returns the paths
+        whose objects are gone"""
+        rate = Rate.parse(settings.screenshot_archival_delete_rate)
+        paths = list(dict.fromkeys(paths))
+        purged = set()
+        for start in range(0, len(paths), MAX_DELETE_KEYS):
+            if rate:
+                while (wait := await _delete_calls.take("delete", rate)) > 0:
+                    await asyncio.sleep(wait)
+            keys = {
+                screenshot_key(path): path
+                for path in paths[start : start + MAX_DELETE_KEYS]
+            }
+            deleted = await delete_objects(keys)
+            purged.update(keys[key] for key in deleted)
+            STORAGE_OBJECTS_PURGED.labels("deleted").inc(len(deleted))
+            STORAGE_OBJECTS_PURGED.labels("failed").inc(len(keys) - len(deleted))
+        return purged
+
+    @staticmethod
+    async def archive_batch(
+        db: AsyncSession, organization_id: str, cutoff: datetime, batch_size: int
+    ) -> Tuple[int, bool]:
+        """Purge and delete up to `batch_size` of an organization's screenshots
+        created before `cutoff`. Returns the rows deleted and whether more
+        may be left"""
+        result = await db.execute(
+            select(Screenshot.id, Screenshot.created_at, Screenshot.path)
+            .where(
+                Screenshot.organization_id == organization_id,
+                Screenshot.created_at < cutoff,
+            )
+            .limit(batch_size)
+        )
+        rows = result.all()
+        # Don't hold the transaction open across the storage calls
+        await db.commit()
+        if not rows:
+            return 0, False
+
+        purged = await RetentionService.purge_objects(row.path for row in rows)
+        keys = [(row.id, row.created_at) for row in rows if row.path in purged]
+        if keys:
+            await db.execute(
+                delete(Screenshot).where(
+                    tuple_(Screenshot.id, Screenshot.created_at).in_(keys)
+                )
+            )
+            await db.commit()
+            SCREENSHOTS_ARCHIVED.labels("batch").inc(len(keys))
+        if len(keys) < len(rows):
+            logger.warning(
+                f"Kept {len(rows) - len(keys)} expired screenshots of organization "
+                f"{organization_id} whose objects could not be deleted"
+            )
+            return len(keys), False
+        return len(keys), len(rows) == batch_size
+
+    @staticmethod
+    async def purge_partition(
+        db: AsyncSession, partition: str, batch_size: int
+    ) -> Optional[int]:
+        """Purge the objects of every screenshot in a partition; returns the
+        row count, or None if some objects could not be deleted"""
+        after, count = NIL_UUID, 0
+        while True:
+            result = await db.execute(
+                text(
+                    f"SELECT id, path FROM {partition} "
+                    "WHERE id > CAST(:after AS uuid) ORDER BY id LIMIT :limit"
+                ),
+                {"after": str(after), "limit": batch_size},
+            )
+            rows = result.all()
+            await db.commit()
+            if not rows:
+                return count
+            paths = {row.path for row in rows}
+            if len(await RetentionService.purge_objects(paths)) < len(paths):
+                return None
+            after, count = rows[-1].id, count + len(rows)
+
+    @staticmethod
+    async def drop_expired_partitions(
+        db: AsyncSession, policies: Dict[str, int], now: datetime, batch_size: int
+    ) -> int:
+        """Drop whole months of screenshots once every organization's retention
+        has passed them, purging their objects first"""
+        if not policies or min(policies.values()) <= 0:
+            return 0
+        cutoff = now - timedelta(days=max(policies.values()))
+        conn = await db.connection()
+        if not await is_partitioned(conn, Screenshot.__tablename__):
+            return 0
+
+        archived = 0
+        for partition in await expired_partitions(
+            conn, Screenshot.__tablename__, cutoff
+        ):
+            count = await RetentionService.purge_partition(
+                db, partition.name, batch_size
+            )
+            if count is None:
+                logger.warning(f"Kept {partition.name}: some objects remain")
+                continue
+            await detach_partition(
+                await db.connection(),
+                Screenshot.__tablename__,
+                partition.name,
+                drop=not settings.partition_detach_only,
+            )
+            await db.commit()
+            SCREENSHOTS_ARCHIVED.labels("partition").inc(count)
+            archived += count
+        return archived
+
+    @staticmethod
+    async def archive(db: AsyncSession, now: Optional[datetime] = None) -> int:
+        """Remove every screenshot past its organization's retention"""
+        now = now or current_time()
+        batch_size = settings.screenshot_archival_batch_size
+        policies = await RetentionService.get_policies(db)
+        await db.commit()
+
+        archived = await RetentionService.drop_expired_partitions(
+            db, policies, now, batch_size
+        )
+        for organization_id, days in policies.items():
+            if days <= 0:
+                continue
+            more = True
+            while more:
+                deleted, more = await RetentionService.archive_batch(
+                    db, organization_id, now - timedelta(days=days), batch_size
+                )
+                archived += deleted
+
+        SCREENSHOT_ARCHIVAL_LAST_SUCCESS.set_to_current_time()
+        if archived:
+            logger.info(f"Archived {archived} expired screenshots")
+        return archived
+
+    @staticmethod
+    async def run_archival() -> None:
+        async with engine.connect() as lock:
+            locked = await lock.scalar(
+                text("SELECT pg_try_advisory_lock(:id)"), {"id": ARCHIVAL_LOCK_ID}
+            )
+            await lock.commit()
+            if not locked:
+                return
+            try:
+                async with AsyncSessionLocal() as db:
+                    await RetentionService.archive(db)
+            finally:
+                await lock.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": ARCHIVAL_LOCK_ID}
+                )
+                await lock.commit()
+
+
+screenshot_archiver = PeriodicTask(
+    "screenshot-archival",
+    settings.screenshot_archival_interval_seconds,
+    RetentionService.run_archival,
+)
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, event
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.db.trigram import trigrams_available
+from app.models.screenshot_app import ScreenshotApp
+from app.utils.ids import new_id
+
+# (organization_id, name) -> catalog ID, so uploads skip the upsert
+_app_ids: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+# Session.info key of IDs upserted in the session's open transaction
+_PENDING = "screenshot_app_ids"
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed(session):
+    for key, app_id in session.info.pop(_PENDING, {}).items():
+        _app_ids[key] = app_id
+        _app_ids.move_to_end(key)
+    while len(_app_ids) > settings.screenshot_app_cache_size:
+        _app_ids.popitem(last=False)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_uncommitted(session, transaction):
+    # Rolled back or closed without a commit (after_commit ran first otherwise)
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class ScreenshotAppService:
+    @staticmethod
+    async def resolve(
+        db: AsyncSession, organization_id: str, name: Optional[str]
+    ) -> Optional[str]:
+        """Catalog ID of an app name, adding the name on first sight.
+
+        The upsert runs in the caller's transaction, and its ID is cached only
+        once that transaction commits, so a rollback can't leave a cached ID
+        with no catalog row behind it.
+        """
+        if not name:
+            return None
+        key = (str(organization_id), name)
+        app_id = _app_ids.get(key)
+        if app_id is not None:
+            _app_ids.move_to_end(key)
+            return app_id
+        pending: Dict[Tuple[str, str], str] = db.info.setdefault(_PENDING, {})
+        if key in pending:
+            return pending[key]
+
+        statement = insert(ScreenshotApp).values(
+            id=new_id(), organization_id=organization_id, name=name
+        )
+        # The no-op update makes RETURNING yield the existing row's ID too
+        statement = statement.on_conflict_do_update(
+            index_elements=[ScreenshotApp.organization_id, ScreenshotApp.name],
+            set_={"name": statement.excluded.name},
+        ).returning(ScreenshotApp.id)
+        app_id = pending[key] = str(await db.scalar(statement))
+        return app_id
+
+    @staticmethod
+    async def search_apps(
+        db: AsyncSession, organization_id: str, q: Optional[str] = None, limit: int = 10
+    ) -> List[ScreenshotApp]:
+        """App names of an organization containing `q`, prefix matches first
+        and then by trigram similarity (when pg_trgm is installed)"""
+        query = select(ScreenshotApp).where(
+            ScreenshotApp.organization_id == organization_id
+        )
+        if q:
+            pattern = _escape_like(q)
+            query = query.where(ScreenshotApp.name.ilike(f"%{pattern}%")).order_by(
+                ScreenshotApp.name.ilike(f"{pattern}%").desc()
+            )
+            connection = await db.connection()
+            if await connection.run_sync(trigrams_available):
+                query = query.order_by(func.similarity(ScreenshotApp.name, q).desc())
+        result = await db.execute(query.order_by(ScreenshotApp.name).limit(limit))
+        return list(result.scalars().all())
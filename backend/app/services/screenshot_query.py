@@ -0,0 +1,211 @@
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Select, and_, asc, bindparam, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.core.config import settings
+from app.core.metrics import QUERY_BUILDER_LOOKUPS
+from app.models.employee import Employee
+from app.models.organization import Organization
+from app.models.project import Project
+from app.models.screenshot import Screenshot
+from app.models.task import Task
+from app.schemas.screenshot import ScreenshotFilters
+
+# List scope -> the column it pins
+SCOPES = {
+    "employee": "employee_id",
+    "organization": "organization_id",
+    "project": "project_id",
+    "task": "task_id",
+}
+# Filters matched exactly against the column of the same name
+EQUAL_FILTERS = (
+    "employee_id",
+    "organization_id",
+    "tracking_id",
+    "project_id",
+    "task_id",
+    "app_id",
+    "permission",
+)
+# Filters matched as a case-insensitive substring (trigram indexed)
+CONTAINS_FILTERS = ("app", "os")
+SORT_COLUMNS = ("created_at", "updated_at", "app")
+
+
+@dataclass(slots=True)
+class ScreenshotRow:
+    """A screenshot as list endpoints return it. The fields match
+    ScreenshotResponse, so rows are serialized without a model per row."""
+
+    id: str
+    employee_id: str
+    employee_name: Optional[str]
+    employee_email: Optional[str]
+    organization_id: str
+    organization_name: Optional[str]
+    tracking_id: Optional[str]
+    project_id: Optional[str]
+    project_name: Optional[str]
+    task_id: Optional[str]
+    task_name: Optional[str]
+    path: str
+    permission: bool
+    os: Optional[str]
+    geo_location: Optional[str]
+    ip_address: Optional[str]
+    app: Optional[str]
+    app_id: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """Everything about a list request that changes its SQL; values don't"""
+
+    scope: str
+    equal: Tuple[str, ...]
+    contains: Tuple[str, ...]
+    start_date: bool
+    end_date: bool
+    sort_by: str
+    descending: bool
+
+
+def shape_of(scope: str, filters: ScreenshotFilters) -> Tuple[QueryShape, Dict]:
+    """Split a scope plus filters into the statement shape and its parameters"""
+    params: Dict[str, Any] = {}
+    equal = []
+    for name in EQUAL_FILTERS:
+        value = getattr(filters, name)
+        # The scope's own column is bound by the scope; falsy IDs mean unset
+        if name == SCOPES[scope] or value is None or value == "":
+            continue
+        equal.append(name)
+        params[name] = value
+    contains = []
+    for name in CONTAINS_FILTERS:
+        if getattr(filters, name):
+            contains.append(name)
+            params[name] = f"%{getattr(filters, name)}%"
+    for name in ("start_date", "end_date"):
+        if getattr(filters, name):
+            params[name] = getattr(filters, name)
+
+    shape = QueryShape(
+        scope=scope,
+        equal=tuple(equal),
+        contains=tuple(contains),
+        start_date="start_date" in params,
+        end_date="end_date" in params,
+        sort_by=filters.sort_by if filters.sort_by in SORT_COLUMNS else "created_at",
+        descending=filters.sort_order.lower() != "asc",
+    )
+    return shape, params
+
+
+def _sort(shape: QueryShape, entity):
+    column = getattr(entity, shape.sort_by)
+    return desc(column) if shape.descending else asc(column)
+
+
+def build(shape: QueryShape) -> Tuple[Select, Select]:
+    """Count and page statements for a shape, with every value a bound
+    parameter: scope_id, the filter names, offset and limit"""
+    conditions = [getattr(Screenshot, SCOPES[shape.scope]) == bindparam("scope_id")]
+    conditions += [getattr(Screenshot, name) == bindparam(name) for name in shape.equal]
+    conditions += [
+        getattr(Screenshot, name).ilike(bindparam(name)) for name in shape.contains
+    ]
+    if shape.start_date:
+        conditions.append(Screenshot.created_at >= bindparam("start_date"))
+    if shape.end_date:
+        conditions.append(Screenshot.created_at <= bindparam("end_date"))
+    where = and_(*conditions)
+
+    count = select(func.count()).select_from(Screenshot).where(where)
+
+    # Page the screenshots first, then join the names onto that page only
+    page = aliased(
+        Screenshot,
+        select(Screenshot)
+        .where(where)
+        .order_by(_sort(shape, Screenshot))
+        .offset(bindparam("offset"))
+        .limit(bindparam("limit"))
+        .subquery("page"),
+    )
+    names = {
+        "employee_name": Employee.name,
+        "employee_email": Employee.email,
+        "organization_name": Organization.name,
+        "project_name": Project.name,
+        "task_name": Task.name,
+    }
+    columns = [
+        names.get(field.name, getattr(page, field.name, None)).label(field.name)
+        for field in fields(ScreenshotRow)
+    ]
+    rows = (
+        select(*columns)
+        .select_from(page)
+        .outerjoin(Employee, page.employee_id == Employee.id)
+        .outerjoin(Organization, page.organization_id == Organization.id)
+        .outerjoin(Project, page.project_id == Project.id)
+        .outerjoin(Task, page.task_id == Task.id)
+        .order_by(_sort(shape, page))
+    )
+    return count, rows
+
+
+class ScreenshotQuery:
+    """Screenshot list queries for every scope, built once per shape.
+
+    Requests of the same shape reuse the same statement objects, so they also
+    hit SQLAlchemy's compiled cache and send identical SQL, which asyncpg
+    keeps prepared per connection.
+    """
+
+    def __init__(self, max_shapes: int):
+        self.max_shapes = max_shapes
+        self._statements: "OrderedDict[QueryShape, Tuple[Select, Select]]" = (
+            OrderedDict()
+        )
+
+    def statements(self, shape: QueryShape) -> Tuple[Select, Select]:
+        statements = self._statements.get(shape)
+        if statements is not None:
+            self._statements.move_to_end(shape)
+            QUERY_BUILDER_LOOKUPS.labels("screenshots", "hit").inc()
+            return statements
+
+        QUERY_BUILDER_LOOKUPS.labels("screenshots", "miss").inc()
+        statements = self._statements[shape] = build(shape)
+        if len(self._statements) > self.max_shapes:
+            self._statements.popitem(last=False)
+        return statements
+
+    async def fetch(
+        self,
+        db: AsyncSession,
+        scope: str,
+        scope_id: str,
+        filters: ScreenshotFilters,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Tuple[List[ScreenshotRow], int]:
+        """One page of a scope's screenshots matching `filters`, and the total"""
+        shape, params = shape_of(scope, filters)
+        count, rows = self.statements(shape)
+        params["scope_id"] = scope_id
+
+        total = await db.scalar(count, params)
+        result = await db.execute(rows, {**params, "offset": skip, "limit": limit})
+        return [ScreenshotRow(*row) for row in result], total
+
+
+screenshot_query = ScreenshotQuery(max_shapes=settings.query_builder_max_shapes)
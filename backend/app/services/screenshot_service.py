@@ -1,8 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
+from sqlalchemy import select, delete, and_, or_
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Tuple
-from datetime import datetime
+from datetime import timedelta
+from app.core.config import settings
+from app.core.security import Security
+from app.core.write_buffer import WriteBuffer
 from app.models.screenshot import Screenshot
 from app.models.employee import Employee
 from app.models.organization import Organization
@@ -16,8 +19,42 @@ from app.schemas.screenshot import (
     ScreenshotFilters,
     ScreenshotUploadRequest,
 )
+from app.services.app_usage_service import AppUsageService
+from app.services.screenshot_app_service import ScreenshotAppService
+from app.services.screenshot_query import ScreenshotRow, screenshot_query
+from app.utils.ids import new_id, uuid7_time
+from app.utils.utils import current_time
 from fastapi import HTTPException
 
+# Screenshot metadata rows waiting for a batched COPY (opt-in, see config)
+screenshot_buffer = WriteBuffer(
+    Screenshot.__table__,
+    columns=[column.name for column in Screenshot.__table__.columns],
+    batch_size=settings.write_buffer_batch_size,
+    flush_interval_ms=settings.write_buffer_flush_interval_ms,
+    max_pending=settings.write_buffer_max_pending,
+    # Usage counts only rows that are stored
+    on_written=AppUsageService.record_rows,
+)
+
+# How far created_at may be from the time in a screenshot's ID (the ID is
+# generated at flush, created_at defaults to the transaction start)
+ID_TIME_SLACK = timedelta(days=1)
+
+
+def _by_id(screenshot_id: str):
+    """Filter on a screenshot ID that lets the planner skip every monthly
+    partition but the one the ID was created in"""
+    condition = Screenshot.id == screenshot_id
+    created = uuid7_time(screenshot_id)
+    if created is None:
+        return condition
+    return and_(
+        condition,
+        Screenshot.created_at >= created - ID_TIME_SLACK,
+        Screenshot.created_at < created + ID_TIME_SLACK,
+    )
+
 
 class ScreenshotService:
     @staticmethod
@@ -112,11 +149,32 @@ class ScreenshotService:
             geo_location=screenshot_data.geo_location,
             ip_address=screenshot_data.ip_address,
             app=screenshot_data.app,
+            app_id=await ScreenshotAppService.resolve(
+                db, screenshot_data.organization_id, screenshot_data.app
+            ),
         )
 
+        if settings.screenshot_write_buffer_enabled:
+            # Respond from the in-memory row; the buffer writes it shortly.
+            # Commit first so a newly cataloged app exists when it does.
+            await db.commit()
+            now = current_time()
+            screenshot.id = new_id()
+            screenshot.permission = bool(screenshot.permission)
+            screenshot.created_at = now
+            screenshot.updated_at = now
+            screenshot_buffer.add(
+                {
+                    column: getattr(screenshot, column)
+                    for column in screenshot_buffer.columns
+                }
+            )
+            return screenshot
+
         db.add(screenshot)
         await db.commit()
         await db.refresh(screenshot)
+        AppUsageService.record(screenshot)
 
         return screenshot
 
@@ -154,7 +212,7 @@ class ScreenshotService:
             .options(selectinload(Screenshot.time_tracking))
             .options(selectinload(Screenshot.project))
             .options(selectinload(Screenshot.task))
-            .where(Screenshot.id == screenshot_id)
+            .where(_by_id(screenshot_id))
         )
         return result.scalar_one_or_none()
 
@@ -165,68 +223,11 @@ class ScreenshotService:
         filters: ScreenshotFilters,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[List[Screenshot], int]:
+    ) -> Tuple[List[ScreenshotRow], int]:
         """Get screenshots for an employee with filters"""
-        query = select(Screenshot).where(Screenshot.employee_id == employee_id)
-
-        # Apply filters
-        if filters.tracking_id:
-            query = query.where(Screenshot.tracking_id == filters.tracking_id)
-
-        if filters.project_id:
-            query = query.where(Screenshot.project_id == filters.project_id)
-
-        if filters.task_id:
-            query = query.where(Screenshot.task_id == filters.task_id)
-
-        if filters.permission is not None:
-            query = query.where(Screenshot.permission == filters.permission)
-
-        if filters.app:
-            query = query.where(Screenshot.app.ilike(f"%{filters.app}%"))
-
-        if filters.os:
-            query = query.where(Screenshot.os.ilike(f"%{filters.os}%"))
-
-        if filters.start_date:
-            query = query.where(Screenshot.created_at >= filters.start_date)
-
-        if filters.end_date:
-            query = query.where(Screenshot.created_at <= filters.end_date)
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await db.scalar(count_query)
-
-        # Apply sorting
-        if filters.sort_by == "created_at":
-            sort_column = Screenshot.created_at
-        elif filters.sort_by == "updated_at":
-            sort_column = Screenshot.updated_at
-        elif filters.sort_by == "app":
-            sort_column = Screenshot.app
-        else:
-            sort_column = Screenshot.created_at
-
-        if filters.sort_order.lower() == "asc":
-            query = query.order_by(asc(sort_column))
-        else:
-            query = query.order_by(desc(sort_column))
-
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-
-        # Add relationships
-        query = query.options(selectinload(Screenshot.employee))
-        query = query.options(selectinload(Screenshot.organization))
-        query = query.options(selectinload(Screenshot.time_tracking))
-        query = query.options(selectinload(Screenshot.project))
-        query = query.options(selectinload(Screenshot.task))
-
-        result = await db.execute(query)
-        screenshots = result.scalars().all()
-
-        return list(screenshots), total
+        return await screenshot_query.fetch(
+            db, "employee", employee_id, filters, skip, limit
+        )
 
     @staticmethod
     async def get_organization_screenshots(
@@ -235,71 +236,11 @@ class ScreenshotService:
         filters: ScreenshotFilters,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[List[Screenshot], int]:
+    ) -> Tuple[List[ScreenshotRow], int]:
         """Get screenshots for an organization with filters"""
-        query = select(Screenshot).where(Screenshot.organization_id == organization_id)
-
-        # Apply filters
-        if filters.employee_id:
-            query = query.where(Screenshot.employee_id == filters.employee_id)
-
-        if filters.tracking_id:
-            query = query.where(Screenshot.tracking_id == filters.tracking_id)
-
-        if filters.project_id:
-            query = query.where(Screenshot.project_id == filters.project_id)
-
-        if filters.task_id:
-            query = query.where(Screenshot.task_id == filters.task_id)
-
-        if filters.permission is not None:
-            query = query.where(Screenshot.permission == filters.permission)
-
-        if filters.app:
-            query = query.where(Screenshot.app.ilike(f"%{filters.app}%"))
-
-        if filters.os:
-            query = query.where(Screenshot.os.ilike(f"%{filters.os}%"))
-
-        if filters.start_date:
-            query = query.where(Screenshot.created_at >= filters.start_date)
-
-        if filters.end_date:
-            query = query.where(Screenshot.created_at <= filters.end_date)
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await db.scalar(count_query)
-
-        # Apply sorting
-        if filters.sort_by == "created_at":
-            sort_column = Screenshot.created_at
-        elif filters.sort_by == "updated_at":
-            sort_column = Screenshot.updated_at
-        elif filters.sort_by == "app":
-            sort_column = Screenshot.app
-        else:
-            sort_column = Screenshot.created_at
-
-        if filters.sort_order.lower() == "asc":
-            query = query.order_by(asc(sort_column))
-        else:
-            query = query.order_by(desc(sort_column))
-
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-
-        # Add relationships
-        query = query.options(selectinload(Screenshot.employee))
-        query = query.options(selectinload(Screenshot.organization))
-        query = query.options(selectinload(Screenshot.time_tracking))
-        query = query.options(selectinload(Screenshot.project))
-        query = query.options(selectinload(Screenshot.task))
-
-        result = await db.execute(query)
-        screenshots = result.scalars().all()
-
-        return list(screenshots), total
+        return await screenshot_query.fetch(
+            db, "organization", organization_id, filters, skip, limit
+        )
 
     @staticmethod
     async def get_project_screenshots(
@@ -308,71 +249,11 @@ class ScreenshotService:
         filters: ScreenshotFilters,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[List[Screenshot], int]:
+    ) -> Tuple[List[ScreenshotRow], int]:
         """Get screenshots for a project with filters"""
-        query = select(Screenshot).where(Screenshot.project_id == project_id)
-
-        # Apply filters
-        if filters.employee_id:
-            query = query.where(Screenshot.employee_id == filters.employee_id)
-
-        if filters.organization_id:
-            query = query.where(Screenshot.organization_id == filters.organization_id)
-
-        if filters.tracking_id:
-            query = query.where(Screenshot.tracking_id == filters.tracking_id)
-
-        if filters.task_id:
-            query = query.where(Screenshot.task_id == filters.task_id)
-
-        if filters.permission is not None:
-            query = query.where(Screenshot.permission == filters.permission)
-
-        if filters.app:
-            query = query.where(Screenshot.app.ilike(f"%{filters.app}%"))
-
-        if filters.os:
-            query = query.where(Screenshot.os.ilike(f"%{filters.os}%"))
-
-        if filters.start_date:
-            query = query.where(Screenshot.created_at >= filters.start_date)
-
-        if filters.end_date:
-            query = query.where(Screenshot.created_at <= filters.end_date)
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await db.scalar(count_query)
-
-        # Apply sorting
-        if filters.sort_by == "created_at":
-            sort_column = Screenshot.created_at
-        elif filters.sort_by == "updated_at":
-            sort_column = Screenshot.updated_at
-        elif filters.sort_by == "app":
-            sort_column = Screenshot.app
-        else:
-            sort_column = Screenshot.created_at
-
-        if filters.sort_order.lower() == "asc":
-            query = query.order_by(asc(sort_column))
-        else:
-            query = query.order_by(desc(sort_column))
-
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-
-        # Add relationships
-        query = query.options(selectinload(Screenshot.employee))
-        query = query.options(selectinload(Screenshot.organization))
-        query = query.options(selectinload(Screenshot.time_tracking))
-        query = query.options(selectinload(Screenshot.project))
-        query = query.options(selectinload(Screenshot.task))
-
-        result = await db.execute(query)
-        screenshots = result.scalars().all()
-
-        return list(screenshots), total
+        return await screenshot_query.fetch(
+            db, "project", project_id, filters, skip, limit
+        )
 
     @staticmethod
     async def get_task_screenshots(
@@ -381,71 +262,9 @@ class ScreenshotService:
         filters: ScreenshotFilters,
         skip: int = 0,
         limit: int = 100,
-    ) -> Tuple[List[Screenshot], int]:
+    ) -> Tuple[List[ScreenshotRow], int]:
         """Get screenshots for a task with filters"""
-        query = select(Screenshot).where(Screenshot.task_id == task_id)
-
-        # Apply filters
-        if filters.employee_id:
-            query = query.where(Screenshot.employee_id == filters.employee_id)
-
-        if filters.organization_id:
-            query = query.where(Screenshot.organization_id == filters.organization_id)
-
-        if filters.tracking_id:
-            query = query.where(Screenshot.tracking_id == filters.tracking_id)
-
-        if filters.project_id:
-            query = query.where(Screenshot.project_id == filters.project_id)
-
-        if filters.permission is not None:
-            query = query.where(Screenshot.permission == filters.permission)
-
-        if filters.app:
-            query = query.where(Screenshot.app.ilike(f"%{filters.app}%"))
-
-        if filters.os:
-            query = query.where(Screenshot.os.ilike(f"%{filters.os}%"))
-
-        if filters.start_date:
-            query = query.where(Screenshot.created_at >= filters.start_date)
-
-        if filters.end_date:
-            query = query.where(Screenshot.created_at <= filters.end_date)
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await db.scalar(count_query)
-
-        # Apply sorting
-        if filters.sort_by == "created_at":
-            sort_column = Screenshot.created_at
-        elif filters.sort_by == "updated_at":
-            sort_column = Screenshot.updated_at
-        elif filters.sort_by == "app":
-            sort_column = Screenshot.app
-        else:
-            sort_column = Screenshot.created_at
-
-        if filters.sort_order.lower() == "asc":
-            query = query.order_by(asc(sort_column))
-        else:
-            query = query.order_by(desc(sort_column))
-
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-
-        # Add relationships
-        query = query.options(selectinload(Screenshot.employee))
-        query = query.options(selectinload(Screenshot.organization))
-        query = query.options(selectinload(Screenshot.time_tracking))
-        query = query.options(selectinload(Screenshot.project))
-        query = query.options(selectinload(Screenshot.task))
-
-        result = await db.execute(query)
-        screenshots = result.scalars().all()
-
-        return list(screenshots), total
+        return await screenshot_query.fetch(db, "task", task_id, filters, skip, limit)
 
     @staticmethod
     async def update_screenshot(
@@ -462,6 +281,10 @@ class ScreenshotService:
         # Update fields
         for field, value in update_data.model_dump(exclude_unset=True).items():
             setattr(screenshot, field, value)
+            if field == "app":
+                screenshot.app_id = await ScreenshotAppService.resolve(
+                    db, screenshot.organization_id, value
+                )
 
         await db.commit()
         await db.refresh(screenshot)
@@ -471,12 +294,11 @@ class ScreenshotService:
     @staticmethod
     async def delete_screenshot(db: AsyncSession, screenshot_id: str) -> bool:
         """Delete a screenshot"""
-        screenshot = await ScreenshotService.get_screenshot(db, screenshot_id)
+        result = await db.execute(delete(Screenshot).where(_by_id(screenshot_id)))
 
-        if not screenshot:
+        if not result.rowcount:
             raise HTTPException(status_code=404, detail="Screenshot not found")
 
-        await db.delete(screenshot)
         await db.commit()
 
         return True
@@ -486,6 +308,8 @@ class ScreenshotService:
         db: AsyncSession, user_id: str, screenshot_id: str
     ) -> bool:
         """Check if user can manage a screenshot"""
+        if Security.claims_allow(user_id):
+            return True
         user = await db.execute(select(User).where(User.id == user_id))
         user = user.scalar_one_or_none()
 
@@ -496,9 +320,7 @@ class ScreenshotService:
             return True
 
         # Check if user is the employee who owns the screenshot
-        screenshot = await db.execute(
-            select(Screenshot).where(Screenshot.id == screenshot_id)
-        )
+        screenshot = await db.execute(select(Screenshot).where(_by_id(screenshot_id)))
         screenshot = screenshot.scalar_one_or_none()
 
         if not screenshot:
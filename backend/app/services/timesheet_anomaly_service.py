@@ -0,0 +1,209 @@
+"""Timesheet anomalies: overlapping sessions, overlong sessions, breaks longer
+than their session and clock-outs before clock-ins.
+
+Overlaps are found with a sweep over each employee's entries in clock-in
+order: an entry overlaps when it starts before the latest clock-out seen so far
+for that employee. The organization scan streams one query ordered by
+(employee_id, clock_in), so the database does the sorting (O(n log n), or an
+index scan) and the sweep holds one employee's state at a time.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, or_
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.time_tracking import TimeTracking
+from app.services.hour_limit_service import as_utc
+from app.utils.utils import current_time
+from fastapi import HTTPException
+
+OVERLAP = "overlap"
+LONG_SESSION = "long_session"
+BREAK_EXCEEDS_SESSION = "break_exceeds_session"
+CLOCK_OUT_BEFORE_CLOCK_IN = "clock_out_before_clock_in"
+KINDS = (OVERLAP, LONG_SESSION, BREAK_EXCEEDS_SESSION, CLOCK_OUT_BEFORE_CLOCK_IN)
+
+
+@dataclass
+class Interval:
+    """The parts of a time entry the sweep looks at"""
+
+    id: str
+    employee_id: str
+    employee_name: Optional[str]
+    clock_in: datetime
+    clock_out: Optional[datetime]  # None while the session is open
+    break_minutes: int = 0
+
+
+class OverlapSweep:
+    """Anomalies of intervals pushed in (employee_id, clock_in) order"""
+
+    def __init__(self, now: datetime):
+        self.now = now
+        self.max_session = timedelta(hours=settings.timesheet_max_session_hours)
+        self.employee_id = None
+        # Entry with the latest clock-out so far, and that clock-out
+        self.latest: Optional[Interval] = None
+        self.latest_end: Optional[datetime] = None
+
+    def end_of(self, interval: Interval) -> datetime:
+        # Open sessions run until now
+        return max(interval.clock_out or self.now, interval.clock_in)
+
+    def push(self, interval: Interval) -> List[Dict]:
+        if interval.employee_id != self.employee_id:
+            self.employee_id, self.latest, self.latest_end = (
+                interval.employee_id,
+                None,
+                None,
+            )
+
+        anomalies = []
+        end = self.end_of(interval)
+        if interval.clock_out and interval.clock_out < interval.clock_in:
+            anomalies.append(self._anomaly(CLOCK_OUT_BEFORE_CLOCK_IN, interval, 0))
+        else:
+            length = end - interval.clock_in
+            if length > self.max_session:
+                anomalies.append(
+                    self._anomaly(LONG_SESSION, interval, length.total_seconds() / 60)
+                )
+            if interval.break_minutes > length.total_seconds() / 60:
+                anomalies.append(
+                    self._anomaly(
+                        BREAK_EXCEEDS_SESSION, interval, interval.break_minutes
+                    )
+                )
+
+        if self.latest is not None and interval.clock_in < self.latest_end:
+            overlap = min(self.latest_end, end) - interval.clock_in
+            anomalies.append(
+                self._anomaly(
+                    OVERLAP, interval, overlap.total_seconds() / 60, self.latest
+                )
+            )
+        if self.latest is None or end > self.latest_end:
+            self.latest, self.latest_end = interval, end
+        return anomalies
+
+    @staticmethod
+    def _anomaly(
+        kind: str, interval: Interval, minutes: float, other: Optional[Interval] = None
+    ) -> Dict:
+        return {
+            "kind": kind,
+            "entry_id": interval.id,
+            "employee_id": interval.employee_id,
+            "employee_name": interval.employee_name,
+            "clock_in": interval.clock_in,
+            "clock_out": interval.clock_out,
+            "other_entry_id": other.id if other else None,
+            "minutes": round(minutes, 1),
+        }
+
+
+class TimesheetAnomalyService:
+    @staticmethod
+    async def validate_entry(db: AsyncSession, time_entry: TimeTracking) -> None:
+        """Reject edited times that run backwards, leave less time than the
+        recorded breaks, or overlap another entry of the same employee"""
+        clock_in = as_utc(time_entry.clock_in)
+        clock_out = as_utc(time_entry.clock_out) if time_entry.clock_out else None
+        if clock_out and clock_out <= clock_in:
+            raise HTTPException(
+                status_code=400, detail="clock_out must be after clock_in"
+            )
+        if (
+            clock_out
+            and (time_entry.break_duration_minutes or 0)
+            > (clock_out - clock_in).total_seconds() / 60
+        ):
+            raise HTTPException(
+                status_code=400, detail="The session is shorter than its breaks"
+            )
+
+        # The entry itself is not flushed until the edit is accepted
+        with db.no_autoflush:
+            other = (
+                await db.execute(
+                    select(
+                        TimeTracking.id, TimeTracking.clock_in, TimeTracking.clock_out
+                    )
+                    .where(
+                        and_(
+                            TimeTracking.employee_id == time_entry.employee_id,
+                            TimeTracking.id != time_entry.id,
+                            TimeTracking.is_active == True,
+                            TimeTracking.clock_in < (clock_out or current_time()),
+                            or_(
+                                TimeTracking.clock_out.is_(None),
+                                TimeTracking.clock_out > clock_in,
+                            ),
+                        )
+                    )
+                    .order_by(TimeTracking.clock_in)
+                    .limit(1)
+                )
+            ).first()
+        if other:
+            raise HTTPException(
+                status_code=409,
+                detail=(
+                    f"Overlaps time entry {other.id} "
+                    f"({other.clock_in.isoformat()} to "
+                    f"{other.clock_out.isoformat() if other.clock_out else 'now'})"
+                ),
+            )
+
+    @staticmethod
+    async def scan_organization(
+        db: AsyncSession,
+        organization_id: str,
+        start: datetime,
+        end: datetime,
+        kinds: Optional[List[str]] = None,
+        limit: int = 100,
+    ) -> Tuple[List[Dict], Dict[str, int]]:
+        """Anomalies among an organization's entries clocked in between start
+        and end: the first `limit` in (employee, clock-in) order, and a count
+        per kind. Entries clocked in before start are not compared."""
+        query = (
+            select(
+                TimeTracking.id,
+                TimeTracking.employee_id,
+                Employee.name,
+                TimeTracking.clock_in,
+                TimeTracking.clock_out,
+                func.coalesce(TimeTracking.break_duration_minutes, 0),
+            )
+            .join(Employee, Employee.id == TimeTracking.employee_id)
+            .where(
+                and_(
+                    Employee.organization_id == organization_id,
+                    TimeTracking.clock_in >= start,
+                    TimeTracking.clock_in < end,
+                    TimeTracking.is_active == True,
+                )
+            )
+            .order_by(TimeTracking.employee_id, TimeTracking.clock_in)
+            .execution_options(yield_per=settings.timesheet_anomaly_scan_batch_size)
+        )
+
+        sweep = OverlapSweep(current_time())
+        wanted = set(kinds or KINDS)
+        anomalies: List[Dict] = []
+        counts = dict.fromkeys(KINDS, 0)
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            for row in rows:
+                for anomaly in sweep.push(Interval(*row)):
+                    if anomaly["kind"] not in wanted:
+                        continue
+                    counts[anomaly["kind"]] += 1
+                    if len(anomalies) < limit:
+                        anomalies.append(anomaly)
+        return anomalies, {kind: counts[kind] for kind in KINDS if kind in wanted}
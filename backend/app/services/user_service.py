@@ -40,8 +40,10 @@ class UserService:
             return None
 
         update_data = user_update.model_dump(exclude_unset=True)
+        if update_data.keys() & {"email", "password", "is_active", "role"}:
+            Security.revoke_tokens(db_user)
         if "password" in update_data:
-            update_data["hashed_password"] = Security.get_password_hash(
+            update_data["hashed_password"] = await Security.hash_password(
                 update_data.pop("password")
             )
 
@@ -0,0 +1 @@
+# Helpers for the API test suite
@@ -0,0 +1,58 @@
+"""Pytest plugin for asserting SQL query budgets in endpoint tests.
+
+Registered by conftest.py (`pytest_plugins = ["app.testing.query_budget"]`):
+
+    async def test_list_projects(client, query_budget):
+        with query_budget(max_queries=4, max_repeats=2):
+            response = await client.get("/api/v1/projects/")
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.db.database import engine
+from app.db.instrumentation import QueryStats
+
+
+class QueryBudget:
+    """Count every statement the engine runs inside a `with` block"""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    @contextmanager
+    def __call__(
+        self, max_queries: Optional[int] = None, max_repeats: Optional[int] = None
+    ) -> Iterator[QueryStats]:
+        stats = QueryStats(statements=Counter())
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            stats.record(statement)
+
+        event.listen(self.engine.sync_engine, "after_cursor_execute", listener)
+        try:
+            yield stats
+        finally:
+            event.remove(self.engine.sync_engine, "after_cursor_execute", listener)
+
+        if max_queries is not None and stats.count > max_queries:
+            raise AssertionError(
+                f"Expected at most {max_queries} queries, ran {stats.count}:\n"
+                + "\n".join(stats.statements)
+            )
+        if max_repeats is not None:
+            repeated = stats.repeated(max_repeats + 1)
+            if repeated:
+                raise AssertionError(
+                    "Statements repeated more than "
+                    f"{max_repeats} times (N+1?):\n"
+                    + "\n".join(f"{count}x {sql}" for sql, count in repeated)
+                )
+
+
+@pytest.fixture
+def query_budget() -> QueryBudget:
+    return QueryBudget(engine)
@@ -0,0 +1,68 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Sequence
+from fastapi import Request, Response
+
+
+def version_etag(version: Sequence, *variant) -> str:
+    """Weak ETag for a collection version (counts and timestamps from a probe
+    query) plus whatever else shapes the response, e.g. page and size"""
+    digest = hashlib.blake2b(
+        repr((tuple(version), variant)).encode(), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def version_last_modified(version: Sequence) -> Optional[datetime]:
+    timestamps = [value for value in version if isinstance(value, datetime)]
+    if not timestamps:
+        return None
+    return max(timestamps).astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def _not_modified_since(header: str, last_modified: Optional[datetime]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    # Only an exact match counts: a hard delete can move the newest
+    # updated_at backwards, which "<=" would mistake for no change
+    return since == last_modified
+
+
+def conditional_response(
+    request: Request, response: Response, version: Sequence, *variant
+) -> Optional[Response]:
+    """Set ETag/Last-Modified on `response` and return a 304 response when
+    the client's copy is still current, before the collection is loaded"""
+    etag = version_etag(version, *variant)
+    last_modified = version_last_modified(version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = if_modified_since is not None and _not_modified_since(
+            if_modified_since, last_modified
+        )
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,27 @@
+from typing import Annotated, FrozenSet, Iterable, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from pydantic import AfterValidator
+
+# Zone names the database accepts in AT TIME ZONE, once loaded at startup;
+# its tz database can differ from Python's
+_database_zones: Optional[FrozenSet[str]] = None
+
+
+def set_database_timezones(names: Iterable[str]) -> None:
+    global _database_zones
+    _database_zones = frozenset(names)
+
+
+def check_timezone(name: str) -> str:
+    """Accept IANA time zone names such as "Europe/Berlin" """
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {name}")
+    if _database_zones is not None and name not in _database_zones:
+        raise ValueError(f"Time zone not supported by the database: {name}")
+    return name
+
+
+# Organization and employee time zone settings
+TimezoneName = Annotated[str, AfterValidator(check_timezone)]
@@ -0,0 +1 @@
+# Load tests and benchmarks for the Momentum API (see benchmarks/README.md)
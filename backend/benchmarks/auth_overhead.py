@@ -0,0 +1,151 @@
+"""Per-request cost of access token verification.
+
+Compares the old path (python-jose decode with the key passed as a string on
+every call) with TokenVerifier, with and without its verified-token cache.
+Requests cycle through --tokens distinct tokens, like a fleet of clients each
+sending its own token repeatedly. No database is needed.
+
+    python -m benchmarks.auth_overhead --algorithms HS256,RS256,ES256
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwt
+
+
+def write_key_pair(directory: str, algorithm: str) -> str:
+    """Write private.pem and public/bench.pem; returns the private key path"""
+    if algorithm.startswith("RS"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ec.generate_private_key(ec.SECP256R1())
+
+    private_path = os.path.join(directory, "private.pem")
+    with open(private_path, "wb") as f:
+        f.write(
+            private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    os.makedirs(os.path.join(directory, "public"), exist_ok=True)
+    with open(os.path.join(directory, "public", "bench.pem"), "wb") as f:
+        f.write(
+            private_key.public_key().public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+        )
+    return private_path
+
+
+def measure(verify: Callable[[str], dict], tokens: List[str], requests: int) -> Dict:
+    # Batches of calls keep timer overhead out of the per-call numbers
+    batch = 100
+    per_call = []
+    for start in range(0, requests, batch):
+        chunk = [tokens[(start + i) % len(tokens)] for i in range(batch)]
+        started = time.perf_counter()
+        for token in chunk:
+            verify(token)
+        per_call.append((time.perf_counter() - started) / batch * 1e6)
+    return {
+        "mean_us": round(statistics.fmean(per_call), 2),
+        "p50_us": round(statistics.median(per_call), 2),
+        "max_batch_us": round(max(per_call), 2),
+        "verifications_per_second": round(1e6 / statistics.fmean(per_call)),
+    }
+
+
+def bench_algorithm(algorithm: str, options: argparse.Namespace) -> Dict:
+    from app.core.tokens import TokenVerifier
+
+    with tempfile.TemporaryDirectory() as directory:
+        if algorithm.startswith("HS"):
+            secret = "benchmark-secret"
+            kwargs = {"secret_key": secret}
+            legacy_key = secret
+        else:
+            private_path = write_key_pair(directory, algorithm)
+            kwargs = {
+                "signing_kid": "bench",
+                "private_key_file": private_path,
+                "public_keys_dir": os.path.join(directory, "public"),
+            }
+            with open(os.path.join(directory, "public", "bench.pem")) as f:
+                legacy_key = f.read()
+
+        cached = TokenVerifier(algorithm, cache_size=options.cache_size, **kwargs)
+        uncached = TokenVerifier(algorithm, cache_size=0, **kwargs)
+
+    expires = int(time.time()) + 3600
+    tokens = [
+        cached.sign(
+            {
+                "email": f"emp{i}@bench.momentum.dev",
+                "id": f"employee-{i}",
+                "role": "employee",
+                "account_type": "employee",
+                "exp": expires,
+            }
+        )
+        for i in range(options.tokens)
+    ]
+
+    # Fill the cache once so the cached run measures steady state
+    for token in tokens:
+        cached.verify(token)
+
+    return {
+        "legacy_decode": measure(
+            lambda token: jwt.decode(token, legacy_key, algorithms=[algorithm]),
+            tokens,
+            options.requests,
+        ),
+        "verifier_uncached": measure(uncached.verify, tokens, options.requests),
+        "verifier_cached": measure(cached.verify, tokens, options.requests),
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Access token verification cost")
+    parser.add_argument("--algorithms", default="HS256,RS256,ES256")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct tokens")
+    parser.add_argument("--cache-size", type=int, default=10000)
+    parser.add_argument("--output", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    options = parse_args(argv)
+    results = {}
+    for algorithm in options.algorithms.split(","):
+        algorithm = algorithm.strip()
+        results[algorithm] = bench_algorithm(algorithm, options)
+        print(algorithm)
+        for mode, numbers in results[algorithm].items():
+            print(
+                f"  {mode:18} {numbers['mean_us']:>9.1f}us/request "
+                f"(p50 {numbers['p50_us']}us, "
+                f"{numbers['verifications_per_second']}/s)"
+            )
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump({"options": vars(options), "results": results}, f, indent=2)
+        print(f"\nResults written to {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
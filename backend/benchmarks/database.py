@@ -0,0 +1,46 @@
+import os
+from typing import Optional
+
+
+def embedded_database_url(data_dir: str, database: str) -> str:
+    """Start (or reuse) a containerless Postgres from the pgserver package"""
+    try:
+        import pgserver
+    except ImportError:
+        raise SystemExit(
+            "--embedded needs pgserver: pip install -r benchmarks/requirements.txt"
+        )
+
+    data_dir = os.path.abspath(data_dir)
+    # pgserver creates data_dir itself but not its parents (e.g. .benchmarks/)
+    os.makedirs(os.path.dirname(data_dir), exist_ok=True)
+    server = pgserver.get_server(data_dir, cleanup_mode=None)
+    exists = server.psql(
+        f"SELECT 1 FROM pg_database WHERE datname = '{database}';"
+    ).strip()
+    if "1 row" not in exists:
+        server.psql(f'CREATE DATABASE "{database}";')
+    return f"postgresql://postgres:@/{database}?host={data_dir}"
+
+
+def configure_environment(
+    database_url: Optional[str], embedded: bool, data_dir: str, database: str
+) -> str:
+    """Point the app at the benchmark database before any app module is imported.
+
+    app.db.database reads DATABASE_URL at import time, so this has to run first.
+    """
+    if embedded:
+        database_url = embedded_database_url(data_dir, database)
+    database_url = database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("Set DATABASE_URL, pass --database-url or use --embedded")
+
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("JWT_ALGORITHM", "HS256")
+    os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "600")
+    # Simulated clients share one address and would trip the per-IP limits;
+    # benchmarks.flood switches limiting on itself
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    return database_url
@@ -0,0 +1,434 @@
+"""Synthetic desktop-client fleet.
+
+Each simulated client follows the Electron app: log in, load its tasks, clock
+in, then every capture interval (30s by default, with jitter) presign an upload,
+PUT the image to storage and post the screenshot metadata, and finally clock
+out. The fleet grows in stages; each stage reports client-side latencies and
+errors plus server gauges scraped from /metrics. The first stage that breaks
+the latency SLO, the error budget or the offered load is the saturation point.
+
+Seed accounts first (python -m benchmarks.run --embedded --seed-only ...),
+then, against a running server started with AWS_S3_ENDPOINT_URL pointing at
+the stand-in (printed on start):
+
+    python -m benchmarks.fleet --base-url http://localhost:8000 --stages 100,500,1000
+
+Without --base-url the app runs in-process against --database-url/--embedded.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+import httpx
+from aiohttp import web
+from benchmarks.database import configure_environment
+from benchmarks.seed import BENCH_PASSWORD, EMAIL_DOMAIN, SCALES
+from benchmarks.stats import ScenarioResult
+
+SERVER_GAUGES = [
+    "momentum_db_pool_in_use",
+    "momentum_bcrypt_queue_depth",
+    "momentum_write_buffer_pending_rows",
+    "momentum_heartbeats_pending",
+]
+
+
+class StorageStandIn:
+    """Minimal S3-compatible PUT target; counts objects and discards the bytes"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.objects = 0
+        self.bytes = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _put(self, request: web.Request) -> web.Response:
+        async for chunk in request.content.iter_chunked(65536):
+            self.bytes += len(chunk)
+        self.objects += 1
+        return web.Response(status=200, headers={"ETag": '"bench"'})
+
+    async def start(self) -> None:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route("PUT", "/{key:.*}", self._put)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+@dataclass
+class StageReport:
+    clients: int
+    seconds: float
+    offered_captures: int
+    completed_captures: int
+    operations: Dict[str, dict] = field(default_factory=dict)
+    server_gauges: Dict[str, float] = field(default_factory=dict)
+    saturated: bool = False
+    reasons: List[str] = field(default_factory=list)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, List[int]] = {}
+        self.offered = 0
+        self.completed = 0
+
+    def add(self, operation: str, seconds: float, status: int) -> None:
+        self.latencies.setdefault(operation, []).append(seconds)
+        self.statuses.setdefault(operation, []).append(status)
+
+    def results(self, elapsed: float) -> Dict[str, ScenarioResult]:
+        return {
+            name: ScenarioResult.from_samples(
+                name, self.latencies[name], self.statuses[name], elapsed
+            )
+            for name in self.latencies
+        }
+
+
+class SimulatedClient:
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        storage: httpx.AsyncClient,
+        email: str,
+        options,
+        recorder: Recorder,
+        rng: random.Random,
+    ):
+        self.http = http
+        self.storage = storage
+        self.email = email
+        self.options = options
+        self.recorder = recorder
+        self.rng = rng
+        self.token = ""
+        self.employee: dict = {}
+        self.task: dict = {}
+        self.tracking_id: Optional[str] = None
+        self.image = os.urandom(options.image_bytes)
+
+    async def call(self, operation: str, method: str, url: str, **kwargs):
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, url, headers=headers, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 599
+        self.recorder.add(operation, time.perf_counter() - started, status)
+        if response is None or status >= 400:
+            return None
+        body = response.json()
+        return body.get("data", body) if isinstance(body, dict) else body
+
+    async def run(self, stop_at: float) -> None:
+        # Stagger start-up like machines booting over the ramp window
+        await asyncio.sleep(self.rng.uniform(0, self.options.ramp_seconds))
+
+        login = await self.call(
+            "login",
+            "POST",
+            "/api/v1/auth/login",
+            json={"email": self.email, "password": BENCH_PASSWORD},
+        )
+        if not login:
+            return
+        self.token = login["access_token"]
+        self.employee = login["user"]
+
+        tasks = await self.call(
+            "get_tasks", "GET", f"/api/v1/tasks/employee/{self.employee['id']}"
+        )
+        if tasks and tasks.get("tasks"):
+            self.task = tasks["tasks"][0]
+
+        session = await self.call(
+            "clock_in",
+            "POST",
+            f"/api/v1/time-tracking/clock-in/{self.employee['id']}",
+            json={
+                "project_id": self.task.get("project_id"),
+                "task_id": self.task.get("id"),
+            },
+        )
+        if session:
+            self.tracking_id = session["id"]
+
+        while time.perf_counter() < stop_at:
+            interval = self.options.capture_interval
+            jitter = interval * self.options.jitter
+            await asyncio.sleep(max(interval + self.rng.uniform(-jitter, jitter), 0))
+            if time.perf_counter() >= stop_at:
+                break
+            self.recorder.offered += 1
+            if await self.capture():
+                self.recorder.completed += 1
+
+        await self.call(
+            "clock_out",
+            "POST",
+            f"/api/v1/time-tracking/clock-out/{self.employee['id']}",
+            json={},
+        )
+
+    async def capture(self) -> bool:
+        file_name = f"{self.employee['id']}-{time.time_ns()}.png"
+        presigned = await self.call(
+            "presign",
+            "POST",
+            "/api/v1/screenshots/s3/presigned-url",
+            params={"file_name": file_name, "content_type": "image/png"},
+        )
+        if not presigned:
+            return False
+        # The endpoint wraps its own payload in {"success", "data"} too
+        presigned = presigned.get("data", presigned)
+
+        started = time.perf_counter()
+        try:
+            response = await self.storage.put(
+                presigned["uploadUrl"],
+                content=self.image,
+                headers={"Content-Type": "image/png"},
+            )
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 599
+        self.recorder.add("storage_put", time.perf_counter() - started, status)
+        if status >= 400:
+            return False
+
+        if self.options.heartbeat:
+            await self.call(
+                "heartbeat",
+                "POST",
+                f"/api/v1/time-tracking/heartbeat/{self.employee['id']}",
+            )
+
+        uploaded = await self.call(
+            "screenshot_upload",
+            "POST",
+            "/api/v1/screenshots/upload",
+            json={
+                "employee_id": self.employee["id"],
+                "organization_id": self.employee["organization_id"],
+                "tracking_id": self.tracking_id,
+                "project_id": self.task.get("project_id"),
+                "task_id": self.task.get("id"),
+                "path": presigned["path"],
+                "permission": True,
+                "os": "macOS 14",
+                "app": "Visual Studio Code",
+            },
+        )
+        return uploaded is not None
+
+
+async def scrape_gauges(http: httpx.AsyncClient, peaks: Dict[str, float]) -> None:
+    """Keep the highest value seen for each server gauge"""
+    try:
+        text = (await http.get("/metrics")).text
+    except httpx.HTTPError:
+        return
+    for line in text.splitlines():
+        match = re.match(r"^([a-z_]+)(?:\{[^}]*\})? ([0-9.e+-]+)$", line)
+        if match and match.group(1) in SERVER_GAUGES:
+            name, value = match.group(1), float(match.group(2))
+            peaks[name] = max(peaks.get(name, 0.0), value)
+
+
+def fleet_emails(scale: str, clients: int) -> List[str]:
+    organizations, per_org = SCALES[scale][0], SCALES[scale][1]
+    emails = [
+        f"emp{o}-{e}@{EMAIL_DOMAIN}"
+        for e in range(per_org)
+        for o in range(organizations)
+    ]
+    if clients > len(emails):
+        raise SystemExit(
+            f"Scale '{scale}' seeds {len(emails)} employees; use a larger --scale"
+        )
+    return emails[:clients]
+
+
+async def run_stage(
+    http: httpx.AsyncClient, storage: httpx.AsyncClient, clients: int, options
+) -> StageReport:
+    recorder = Recorder()
+    rng = random.Random(options.random_seed + clients)
+    started = time.perf_counter()
+    stop_at = started + options.ramp_seconds + options.stage_seconds
+
+    fleet = [
+        SimulatedClient(http, storage, email, options, recorder, rng)
+        for email in fleet_emails(options.scale, clients)
+    ]
+    peaks: Dict[str, float] = {}
+    runners = asyncio.gather(*(client.run(stop_at) for client in fleet))
+    while not runners.done():
+        await scrape_gauges(http, peaks)
+        await asyncio.sleep(1)
+    await runners
+    elapsed = time.perf_counter() - started
+
+    report = StageReport(
+        clients=clients,
+        seconds=round(elapsed, 1),
+        offered_captures=recorder.offered,
+        completed_captures=recorder.completed,
+        operations={
+            name: asdict(result) for name, result in recorder.results(elapsed).items()
+        },
+        server_gauges=peaks,
+    )
+
+    upload = report.operations.get("screenshot_upload")
+    if upload and upload["p95_ms"] > options.slo_ms:
+        report.reasons.append(f"upload p95 {upload['p95_ms']}ms > {options.slo_ms}ms")
+    for name, result in report.operations.items():
+        if result["requests"] and result["errors"] / result["requests"] > 0.01:
+            report.reasons.append(f"{name} errors {result['errors']}")
+    if recorder.offered and recorder.completed < 0.95 * recorder.offered:
+        report.reasons.append(
+            f"completed {recorder.completed}/{recorder.offered} captures"
+        )
+    report.saturated = bool(report.reasons)
+    return report
+
+
+async def run(options) -> int:
+    storage_server = StorageStandIn(options.storage_host, options.storage_port)
+    await storage_server.start()
+    print(f"Storage stand-in on {storage_server.endpoint_url}")
+    print(
+        f"Start the API with AWS_S3_ENDPOINT_URL={storage_server.endpoint_url} "
+        "AWS_S3_BUCKET=bench AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=x "
+        "AWS_REGION=us-east-1"
+    )
+
+    limits = httpx.Limits(max_connections=options.max_connections)
+    storage = httpx.AsyncClient(timeout=60, limits=limits)
+    lifespan = None
+    if options.base_url:
+        http = httpx.AsyncClient(base_url=options.base_url, timeout=60, limits=limits)
+    else:
+        from app.main import app
+
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        http = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://fleet",
+            timeout=60,
+        )
+
+    reports: List[StageReport] = []
+    try:
+        for clients in [int(n) for n in options.stages.split(",")]:
+            print(f"\nStage: {clients} clients")
+            report = await run_stage(http, storage, clients, options)
+            reports.append(report)
+            for name, result in report.operations.items():
+                print(
+                    f"  {name:<18} {result['requests']:>7} req "
+                    f"{result['errors']:>5} err  p50 {result['p50_ms']:>8}ms "
+                    f"p95 {result['p95_ms']:>8}ms p99 {result['p99_ms']:>8}ms"
+                )
+            print(f"  captures {report.completed_captures}/{report.offered_captures}")
+            print(f"  server peaks {report.server_gauges}")
+            if report.saturated:
+                print(f"  SATURATED: {'; '.join(report.reasons)}")
+                if not options.keep_going:
+                    break
+    finally:
+        await http.aclose()
+        await storage.aclose()
+        await storage_server.stop()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    saturation = next((r.clients for r in reports if r.saturated), None)
+    with open(options.output, "w") as f:
+        json.dump(
+            {
+                "saturation_clients": saturation,
+                "storage": {
+                    "objects": storage_server.objects,
+                    "bytes": storage_server.bytes,
+                },
+                "stages": [asdict(r) for r in reports],
+            },
+            f,
+            indent=2,
+        )
+    print(
+        f"\nSaturation point: {saturation or 'not reached'}"
+        f"\nReport written to {options.output}"
+    )
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Desktop-client fleet simulator")
+    parser.add_argument("--base-url", help="running API; default is in-process")
+    parser.add_argument("--database-url")
+    parser.add_argument("--embedded", action="store_true")
+    parser.add_argument("--pgdata", default=".benchmarks/pgdata")
+    parser.add_argument("--database", default="momentum_bench")
+    parser.add_argument(
+        "--scale", choices=list(SCALES), default="small", help="scale seeded with"
+    )
+    parser.add_argument("--stages", default="50,100,200", help="clients per stage")
+    parser.add_argument("--stage-seconds", type=float, default=120)
+    parser.add_argument("--ramp-seconds", type=float, default=15)
+    parser.add_argument("--capture-interval", type=float, default=30)
+    parser.add_argument("--jitter", type=float, default=0.2, help="fraction")
+    parser.add_argument("--image-bytes", type=int, default=150_000)
+    parser.add_argument("--heartbeat", action="store_true")
+    parser.add_argument("--slo-ms", type=float, default=500)
+    parser.add_argument("--keep-going", action="store_true")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--storage-host", default="127.0.0.1")
+    parser.add_argument("--storage-port", type=int, default=9900)
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--output", default="fleet-results.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    options = parse_args(argv)
+    if not options.base_url:
+        configure_environment(
+            options.database_url, options.embedded, options.pgdata, options.database
+        )
+        # The in-process app presigns against the stand-in
+        endpoint = f"http://{options.storage_host}:{options.storage_port}"
+        os.environ.setdefault("AWS_S3_ENDPOINT_URL", endpoint)
+        os.environ.setdefault("AWS_S3_BUCKET", "bench")
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+        os.environ.setdefault("AWS_REGION", "us-east-1")
+    return asyncio.run(run(options))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
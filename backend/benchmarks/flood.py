@@ -0,0 +1,179 @@
+"""Flood protection benchmark.
+
+One misbehaving client floods the API while well-behaved clients keep
+working. Each flood runs twice in-process, first with rate limiting off and
+then on, so the victims' latency and errors can be compared:
+
+- upload_flood: one employee posts screenshot metadata at --flood-rate,
+  while other employees upload at --victim-rate in total.
+- report_flood: the admin of one organization requests time reports at
+  --report-flood-rate, while the admin of another loads the employee summary.
+
+    python -m benchmarks.flood --embedded --duration 20
+
+Seed first with python -m benchmarks.run --embedded --seed-only.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+from datetime import timedelta
+from typing import List
+from benchmarks.database import configure_environment
+from benchmarks.stats import ScenarioResult
+
+
+async def upload_flood(client, data, options, label: str) -> List[ScenarioResult]:
+    from benchmarks.scenarios import open_loop, request
+
+    rng = random.Random(11)
+    attacker, victims = data.employees[0], data.employees[1:]
+
+    def upload(e):
+        return request(
+            client,
+            "POST",
+            "/api/v1/screenshots/upload",
+            e.token,
+            json={
+                "employee_id": e.id,
+                "organization_id": e.organization_id,
+                "project_id": e.project_id,
+                "task_id": e.task_id,
+                "path": f"flood/{e.id}/{rng.getrandbits(48)}.png",
+                "permission": True,
+                "os": "macOS 14",
+                "app": "Visual Studio Code",
+            },
+        )
+
+    return list(
+        await asyncio.gather(
+            open_loop(
+                f"upload_flood_attacker_{label}",
+                lambda: upload(attacker),
+                options.flood_rate,
+                options.duration,
+            ),
+            open_loop(
+                f"upload_flood_victims_{label}",
+                lambda: upload(rng.choice(victims)),
+                options.victim_rate,
+                options.duration,
+            ),
+        )
+    )
+
+
+async def report_flood(client, data, options, label: str) -> List[ScenarioResult]:
+    from app.utils.utils import current_time
+    from benchmarks.scenarios import open_loop, request
+
+    (attacker_org, attacker), (_, victim) = list(data.admins.items())[:2]
+    end = current_time()
+    dates = {
+        "start_date": (end - timedelta(days=30)).isoformat(),
+        "end_date": end.isoformat(),
+    }
+    employee_ids = [e.id for e in data.employees if e.organization_id == attacker_org]
+
+    return list(
+        await asyncio.gather(
+            open_loop(
+                f"report_flood_attacker_{label}",
+                lambda: request(
+                    client,
+                    "POST",
+                    "/api/v1/time-tracking/report",
+                    attacker,
+                    json={**dates, "employee_ids": employee_ids[:50]},
+                ),
+                options.report_flood_rate,
+                options.duration,
+            ),
+            open_loop(
+                f"report_flood_victim_{label}",
+                lambda: request(
+                    client,
+                    "GET",
+                    "/api/v1/time-tracking/employees/summary",
+                    victim,
+                    params={**dates, "size": 50},
+                ),
+                options.victim_report_rate,
+                options.duration,
+            ),
+        )
+    )
+
+
+FLOODS = {"upload_flood": upload_flood, "report_flood": report_flood}
+
+
+async def run(options) -> int:
+    import httpx
+    from app.core.config import settings
+    from app.main import app
+    from benchmarks.scenarios import load_bench_data
+    from benchmarks.stats import write_results
+
+    results = []
+    async with app.router.lifespan_context(app):
+        data = await load_bench_data()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://flood", timeout=120
+        )
+        async with client:
+            for name in options.floods.split(","):
+                name = name.strip()
+                if name == "report_flood" and len(data.admins) < 2:
+                    print("report_flood needs two organizations; seed --scale small")
+                    continue
+                for label, enabled in (("unlimited", False), ("limited", True)):
+                    settings.rate_limit_enabled = enabled
+                    print(f"Running {name} ({label})...")
+                    for result in await FLOODS[name](client, data, options, label):
+                        print(
+                            f"  {result.name}: {result.requests} requests, "
+                            f"statuses {result.status_codes}, "
+                            f"p50 {result.p50_ms}ms p95 {result.p95_ms}ms "
+                            f"p99 {result.p99_ms}ms"
+                        )
+                        results.append(result)
+
+    write_results(options.output, {"options": vars(options)}, results)
+    print(f"\nResults written to {options.output}")
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rate limiting under a flood")
+    parser.add_argument("--database-url")
+    parser.add_argument("--embedded", action="store_true")
+    parser.add_argument("--pgdata", default=".benchmarks/pgdata")
+    parser.add_argument("--database", default="momentum_bench")
+    parser.add_argument("--floods", default="upload_flood,report_flood")
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--flood-rate", type=float, default=50, help="requests/s")
+    parser.add_argument("--victim-rate", type=float, default=20, help="requests/s")
+    parser.add_argument("--report-flood-rate", type=float, default=10)
+    parser.add_argument("--victim-report-rate", type=float, default=1)
+    parser.add_argument("--output", default="flood-results.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    options = parse_args(argv)
+    configure_environment(
+        options.database_url, options.embedded, options.pgdata, options.database
+    )
+    # In-process clients all share one address, so only principal and
+    # organization buckets can tell the attacker apart
+    os.environ["RATE_LIMIT_UPLOAD_PER_IP"] = ""
+    return asyncio.run(run(options))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
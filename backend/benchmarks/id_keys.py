@@ -0,0 +1,144 @@
+"""Primary key layout: text UUIDv4 vs native UUIDv4 vs native UUIDv7.
+
+Loads --rows screenshot-shaped rows (primary key, employee foreign key,
+created_at, path) into one scratch table per layout, in batches of --batch
+like the screenshot write buffer, and reports insert throughput plus table
+and index sizes. IDs are generated before timing, so only the database work
+is measured.
+
+    python -m benchmarks.id_keys --embedded --rows 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+from benchmarks.database import configure_environment
+
+LAYOUTS = {
+    # name: (column type, id generator)
+    "text_uuid4": ("varchar", lambda at: str(uuid.uuid4())),
+    "uuid_uuid4": ("uuid", lambda at: uuid.uuid4()),
+    "uuid_uuid7": ("uuid", None),  # app.utils.ids.uuid7, imported in run()
+}
+
+
+def generate_rows(
+    make_id: Callable, rows: int, employees: List, started: datetime
+) -> List[tuple]:
+    step = timedelta(seconds=1)
+    return [
+        (
+            make_id(started + i * step),
+            employees[i % len(employees)],
+            started + i * step,
+            f"bench/{i}.png",
+        )
+        for i in range(rows)
+    ]
+
+
+async def bench_layout(connection, name: str, column_type: str, records, batch: int):
+    table = f"bench_ids_{name}"
+    await connection.execute(f"DROP TABLE IF EXISTS {table}")
+    await connection.execute(f"""
+        CREATE TABLE {table} (
+            id {column_type} PRIMARY KEY,
+            employee_id {column_type} NOT NULL,
+            created_at timestamptz NOT NULL,
+            path varchar NOT NULL
+        )
+        """)
+    await connection.execute(
+        f"CREATE INDEX ix_{table}_employee ON {table} (employee_id)"
+    )
+
+    columns = ["id", "employee_id", "created_at", "path"]
+    started = time.perf_counter()
+    for start in range(0, len(records), batch):
+        await connection.copy_records_to_table(
+            table, records=records[start : start + batch], columns=columns
+        )
+    seconds = time.perf_counter() - started
+
+    sizes = await connection.fetchrow(f"""
+        SELECT pg_relation_size('{table}') AS heap,
+               pg_relation_size('{table}_pkey') AS primary_key,
+               pg_relation_size('ix_{table}_employee') AS employee_index
+        """)
+    await connection.execute(f"DROP TABLE {table}")
+    return {
+        "seconds": round(seconds, 2),
+        "rows_per_second": round(len(records) / seconds),
+        "heap_mb": round(sizes["heap"] / 2**20, 1),
+        "primary_key_mb": round(sizes["primary_key"] / 2**20, 1),
+        "employee_index_mb": round(sizes["employee_index"] / 2**20, 1),
+    }
+
+
+async def run(options, database_url: str) -> Dict:
+    import asyncpg
+    from app.utils.ids import uuid7
+
+    rng = random.Random(7)
+    started = datetime.now(timezone.utc) - timedelta(seconds=options.rows)
+    connection = await asyncpg.connect(
+        database_url.replace("postgresql+asyncpg://", "postgresql://")
+    )
+    results = {}
+    try:
+        for name in options.layouts.split(","):
+            name = name.strip()
+            column_type, make_id = LAYOUTS[name]
+            make_id = make_id or uuid7
+            employees = [make_id(started) for _ in range(options.employees)]
+            rng.shuffle(employees)
+            records = generate_rows(make_id, options.rows, employees, started)
+            results[name] = await bench_layout(
+                connection, name, column_type, records, options.batch
+            )
+            r = results[name]
+            print(
+                f"{name:12} {r['rows_per_second']:>8}/s  heap {r['heap_mb']}MB  "
+                f"pkey {r['primary_key_mb']}MB  employee index "
+                f"{r['employee_index_mb']}MB"
+            )
+    finally:
+        await connection.close()
+    return results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Primary key layouts compared")
+    parser.add_argument("--database-url")
+    parser.add_argument("--embedded", action="store_true")
+    parser.add_argument("--pgdata", default=".benchmarks/pgdata")
+    parser.add_argument("--database", default="momentum_bench")
+    parser.add_argument("--layouts", default=",".join(LAYOUTS))
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--batch", type=int, default=500, help="rows per COPY")
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--output", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    options = parse_args(argv)
+    database_url = configure_environment(
+        options.database_url, options.embedded, options.pgdata, options.database
+    )
+    results = asyncio.run(run(options, database_url))
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump({"options": vars(options), "results": results}, f, indent=2)
+        print(f"\nResults written to {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Time reports: per-entry ORM report vs the columnar report engine.
+
+Loads --entries synthetic time entries for the employees and projects of the
+largest seeded organization, then builds a report over all of them in two
+ways, on the same connection:
+
+- orm: TimeTrackingService.generate_time_report, an ORM object per entry
+  with its employee, task and project, summed in Python
+- engine: ReportEngine.generate_report, one row of column arrays reduced
+  with NumPy, plus overtime, utilization and overlaps
+
+The entries are written with COPY inside a transaction that is rolled back at
+the end, so the seeded data is left as it was. They start at --start, long
+before the seeded data, so the report covers only them. Each employee works
+three sessions a day, and about 1% of sessions start during the previous one.
+
+    python -m benchmarks.report_engine --embedded --entries 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from benchmarks.database import configure_environment
+
+COLUMNS = [
+    "id",
+    "employee_id",
+    "project_id",
+    "clock_in",
+    "clock_out",
+    "total_hours",
+    "total_minutes",
+    "break_duration_minutes",
+    "is_active",
+    "created_at",
+    "updated_at",
+]
+
+
+def generate_entries(
+    entries: int, employees: List[str], projects: List[str], start: datetime, rng
+) -> List[tuple]:
+    from decimal import Decimal
+    from app.utils.ids import new_id
+
+    rows = []
+    for i in range(entries):
+        employee = i % len(employees)
+        session = i // len(employees)
+        day, slot = divmod(session, 3)
+        clock_in = start + timedelta(
+            days=day, hours=8 + slot * 3, minutes=rng.randrange(30)
+        )
+        if rng.random() < 0.01:
+            clock_in -= timedelta(hours=1)
+        breaks = rng.choice((0, 0, 15, 30))
+        minutes = rng.randrange(60, 120)
+        clock_out = clock_in + timedelta(minutes=minutes + breaks)
+        rows.append(
+            (
+                new_id(),
+                employees[employee],
+                projects[(employee + slot) % len(projects)] if projects else None,
+                clock_in,
+                clock_out,
+                Decimal(minutes) / 60,
+                minutes,
+                breaks,
+                True,
+                clock_out,
+                clock_out,
+            )
+        )
+    return rows
+
+
+async def timed(name: str, build) -> Dict:
+    started = time.perf_counter()
+    report = await build()
+    seconds = time.perf_counter() - started
+    summary = report["summary"]
+    print(
+        f"{name:7} {seconds:8.2f}s  {summary['total_entries'] / seconds:>10.0f} "
+        f"entries/s  {summary['total_minutes']} minutes"
+    )
+    return {"seconds": round(seconds, 3), "report": report}
+
+
+async def run(options) -> Dict:
+    from sqlalchemy import func, select
+    from app.db.database import AsyncSessionLocal, engine
+    from app.models.employee import Employee
+    from app.models.project import Project
+    from app.schemas.time_tracking import TimeReportRequest
+    from app.services.report_engine import ReportEngine
+    from app.services.time_tracking_service import TimeTrackingService
+
+    async with AsyncSessionLocal() as db:
+        organization_id = await db.scalar(
+            select(Employee.organization_id)
+            .group_by(Employee.organization_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        if organization_id is None:
+            raise SystemExit(
+                "No employees; seed first: python -m benchmarks.run --seed"
+            )
+        employees = list(
+            await db.scalars(
+                select(Employee.id)
+                .where(Employee.organization_id == organization_id)
+                .limit(options.employees)
+            )
+        )
+        projects = list(
+            await db.scalars(
+                select(Project.id).where(Project.organization_id == organization_id)
+            )
+        )
+
+        rng = random.Random(options.random_seed)
+        start = datetime.fromisoformat(options.start).replace(tzinfo=timezone.utc)
+        rows = generate_entries(options.entries, employees, projects, start, rng)
+        end = max(row[3] for row in rows)
+        print(
+            f"{len(rows)} entries for {len(employees)} employees, "
+            f"{start.date()} to {end.date()}"
+        )
+
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        started = time.perf_counter()
+        await raw.driver_connection.copy_records_to_table(
+            "time_tracking", records=rows, columns=COLUMNS
+        )
+        print(f"loaded in {time.perf_counter() - started:.1f}s")
+        del rows
+
+        request = TimeReportRequest(start_date=start, end_date=end)
+        modes = {
+            "orm": lambda: TimeTrackingService.generate_time_report(db, request),
+            "engine": lambda: ReportEngine.generate_report(db, request),
+        }
+        results = {}
+        try:
+            for name in options.modes.split(","):
+                name = name.strip()
+                results[name] = await timed(name, modes[name])
+                db.expunge_all()
+        finally:
+            await db.rollback()
+    await engine.dispose()
+
+    if "orm" in results and "engine" in results:
+        orm, vectorized = results["orm"]["report"], results["engine"]["report"]
+        assert orm["summary"]["total_minutes"] == vectorized["summary"]["total_minutes"]
+        assert orm["summary"]["total_entries"] == vectorized["summary"]["total_entries"]
+        assert {
+            employee_id: row["total_minutes"]
+            for employee_id, row in orm["employee_breakdown"].items()
+        } == {
+            employee_id: row["total_minutes"]
+            for employee_id, row in vectorized["employee_breakdown"].items()
+        }
+        print(
+            f"totals match; engine {results['orm']['seconds'] / results['engine']['seconds']:.1f}x"
+            " faster"
+        )
+    if "engine" in results:
+        summary = results["engine"]["report"]["summary"]
+        print(
+            f"overtime {summary['overtime_minutes']} minutes, "
+            f"{summary['overlapping_entries']} overlapping entries, "
+            f"utilization {summary['utilization']}"
+        )
+    return {
+        name: {"seconds": result["seconds"], "summary": result["report"]["summary"]}
+        for name, result in results.items()
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time report computation cost")
+    parser.add_argument("--database-url")
+    parser.add_argument("--embedded", action="store_true")
+    parser.add_argument("--pgdata", default=".benchmarks/pgdata")
+    parser.add_argument("--database", default="momentum_bench")
+    parser.add_argument("--modes", default="orm,engine")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--start", default="2015-01-05", help="first day (UTC)")
+    parser.add_argument("--random-seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    options = parse_args(argv)
+    configure_environment(
+        options.database_url, options.embedded, options.pgdata, options.database
+    )
+    results = asyncio.run(run(options))
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(
+                {"options": vars(options), "results": results},
+                f,
+                indent=2,
+                default=str,
+            )
+        print(f"\nResults written to {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""Run the benchmark suite.
+
+    python -m benchmarks.run --embedded --seed --scale small
+    python -m benchmarks.run --embedded --output results.json --baseline benchmarks/baseline.json
+
+See benchmarks/README.md for details.
+"""
+
+import argparse
+import asyncio
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from benchmarks.database import configure_environment
+from benchmarks.seed import SCALES
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Momentum API benchmarks")
+    db = parser.add_argument_group("database")
+    db.add_argument("--database-url", help="defaults to $DATABASE_URL")
+    db.add_argument(
+        "--embedded",
+        action="store_true",
+        help="run against an embedded Postgres (pgserver) instead",
+    )
+    db.add_argument("--pgdata", default=".benchmarks/pgdata")
+    db.add_argument("--database", default="momentum_bench")
+
+    seed = parser.add_argument_group("seeding")
+    seed.add_argument("--seed", action="store_true", help="reset and seed the DB")
+    seed.add_argument("--seed-only", action="store_true")
+    seed.add_argument("--scale", choices=list(SCALES), default="small")
+    seed.add_argument("--random-seed", type=int, default=42)
+
+    run = parser.add_argument_group("scenarios")
+    run.add_argument(
+        "--scenarios",
+        default="clock_in_storm,screenshot_ingest,admin_reports",
+        help="comma separated",
+    )
+    run.add_argument("--base-url", help="benchmark a running server instead")
+    run.add_argument("--concurrency", type=int, default=100)
+    run.add_argument("--storm-employees", type=int, default=500)
+    run.add_argument("--ingest-rate", type=float, default=200, help="requests/s")
+    run.add_argument("--duration", type=float, default=20, help="seconds")
+    run.add_argument("--report-requests", type=int, default=60)
+    run.add_argument("--report-concurrency", type=int, default=10)
+
+    out = parser.add_argument_group("results")
+    out.add_argument("--output", default="benchmark-results.json")
+    out.add_argument("--baseline", help="compare with a previous results file")
+    out.add_argument(
+        "--fail-threshold",
+        type=float,
+        default=0.2,
+        help="exit 1 when p95 or throughput regresses by more than this",
+    )
+    return parser.parse_args(argv)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+async def run(options: argparse.Namespace) -> int:
+    import httpx
+    from app.main import app
+    from benchmarks.scenarios import SCENARIOS, load_bench_data
+    from benchmarks.seed import SeedConfig, seed
+    from benchmarks.stats import compare, write_results
+
+    async with app.router.lifespan_context(app):
+        if options.seed or options.seed_only:
+            summary = await seed(
+                SeedConfig.from_scale(options.scale, options.random_seed)
+            )
+            print(f"Seeded in {summary.seconds:.1f}s: {summary.rows}")
+            if options.seed_only:
+                return 0
+
+        data = await load_bench_data()
+        if options.base_url:
+            client = httpx.AsyncClient(base_url=options.base_url, timeout=60)
+        else:
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://bench",
+                timeout=60,
+            )
+
+        results = []
+        async with client:
+            for name in options.scenarios.split(","):
+                print(f"Running {name}...")
+                for result in await SCENARIOS[name.strip()](client, data, options):
+                    print(
+                        f"  {result.name}: {result.requests} requests, "
+                        f"{result.errors} errors, {result.throughput_rps} rps, "
+                        f"p50 {result.p50_ms}ms p95 {result.p95_ms}ms "
+                        f"p99 {result.p99_ms}ms"
+                    )
+                    results.append(result)
+
+    meta = {
+        "commit": git_commit(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "seeded_scale": options.scale if options.seed else None,
+        "python": platform.python_version(),
+        "target": options.base_url or "in-process",
+        "employees": len(data.employees),
+        "options": {
+            key: getattr(options, key)
+            for key in (
+                "concurrency",
+                "storm_employees",
+                "ingest_rate",
+                "duration",
+                "report_requests",
+                "report_concurrency",
+            )
+        },
+    }
+    write_results(options.output, meta, results)
+    print(f"\nResults written to {options.output}")
+
+    if options.baseline:
+        regressions = compare(options.baseline, results, options.fail_threshold)
+        if regressions:
+            print(f"\nRegressed: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    options = parse_args(argv)
+    configure_environment(
+        options.database_url, options.embedded, options.pgdata, options.database
+    )
+    return asyncio.run(run(options))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""Scripted load scenarios.
+
+Each scenario drives the API through an httpx client (in-process ASGI by
+default, or a running server with --base-url) and returns a ScenarioResult.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, List, Tuple
+import httpx
+from benchmarks.stats import ScenarioResult
+
+Call = Callable[[], Awaitable[Tuple[float, int]]]
+
+
+@dataclass
+class BenchEmployee:
+    id: str
+    email: str
+    organization_id: str
+    project_id: str
+    task_id: str
+    token: str = ""
+
+
+@dataclass
+class BenchData:
+    """IDs and tokens for seeded accounts, loaded once per run"""
+
+    admins: Dict[str, str] = field(default_factory=dict)  # org id -> token
+    employees: List[BenchEmployee] = field(default_factory=list)
+
+
+async def load_bench_data() -> BenchData:
+    from sqlalchemy import select, func
+    from app.core.security import Security
+    from app.db.database import AsyncSessionLocal
+    from app.models import Employee, Organization, User
+    from app.models.task import Task, task_employees
+    from benchmarks.seed import EMAIL_DOMAIN
+
+    data = BenchData()
+    async with AsyncSessionLocal() as db:
+        admins = await db.execute(
+            select(Organization.id, User.id, User.email, User.role)
+            .join(User, User.id == Organization.created_by)
+            .where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+        )
+        for organization_id, user_id, email, role in admins.all():
+            data.admins[organization_id] = Security.create_access_token(
+                SimpleNamespace(id=user_id, email=email, role=role.value),
+                organization_ids=[organization_id],
+            )
+
+        # One assigned task (and its project) per employee
+        first_task = (
+            select(task_employees.c.employee_id, task_employees.c.task_id)
+            .distinct(task_employees.c.employee_id)
+            .order_by(task_employees.c.employee_id, task_employees.c.task_id)
+            .subquery()
+        )
+        employees = await db.execute(
+            select(
+                Employee.id,
+                Employee.email,
+                Employee.organization_id,
+                Task.project_id,
+                Task.id,
+            )
+            .join(first_task, first_task.c.employee_id == Employee.id)
+            .join(Task, Task.id == first_task.c.task_id)
+            .where(Employee.email.like(f"%@{EMAIL_DOMAIN}"))
+            .order_by(Employee.email)
+        )
+        for row in employees.all():
+            employee = BenchEmployee(*row)
+            employee.token = Security.create_access_token(
+                SimpleNamespace(
+                    id=employee.id,
+                    email=employee.email,
+                    organization_id=employee.organization_id,
+                )
+            )
+            data.employees.append(employee)
+
+    if not data.employees:
+        raise SystemExit("No benchmark data found; run with --seed first")
+    return data
+
+
+async def close_open_sessions() -> None:
+    """Clock out leftovers so scenarios start from the same state"""
+    from sqlalchemy import update
+    from app.db.database import AsyncSessionLocal
+    from app.models import TimeTracking
+    from app.utils.utils import current_time
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(TimeTracking)
+            .where(TimeTracking.clock_out == None)
+            .values(clock_out=current_time(), total_minutes=0, total_hours=0)
+        )
+        await db.commit()
+
+
+def request(client: httpx.AsyncClient, method: str, url: str, token: str, **kwargs):
+    async def call() -> Tuple[float, int]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs
+            )
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 599
+        return time.perf_counter() - started, status
+
+    return call
+
+
+async def closed_loop(name: str, calls: List[Call], concurrency: int) -> ScenarioResult:
+    """Run `calls` with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(call: Call):
+        async with semaphore:
+            return await call()
+
+    started = time.perf_counter()
+    samples = await asyncio.gather(*(bounded(call) for call in calls))
+    seconds = time.perf_counter() - started
+    return ScenarioResult.from_samples(
+        name, [s[0] for s in samples], [s[1] for s in samples], seconds
+    )
+
+
+async def open_loop(
+    name: str, next_call: Callable[[], Call], rate: float, duration: float
+) -> ScenarioResult:
+    """Start calls at a fixed arrival rate, regardless of how fast they finish"""
+    interval = 1 / rate
+    tasks = []
+    started = time.perf_counter()
+    deadline = started + duration
+    next_at = started
+    while next_at < deadline:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(next_call()()))
+        next_at += interval
+
+    samples = await asyncio.gather(*tasks)
+    seconds = time.perf_counter() - started
+    return ScenarioResult.from_samples(
+        name, [s[0] for s in samples], [s[1] for s in samples], seconds
+    )
+
+
+async def morning_clock_in_storm(
+    client: httpx.AsyncClient, data: BenchData, options
+) -> List[ScenarioResult]:
+    """Everyone clocks in within a few seconds, then clocks out"""
+    await close_open_sessions()
+    employees = data.employees[: options.storm_employees]
+
+    clock_in = await closed_loop(
+        "clock_in_storm",
+        [
+            request(
+                client,
+                "POST",
+                f"/api/v1/time-tracking/clock-in/{e.id}",
+                e.token,
+                json={"project_id": e.project_id, "task_id": e.task_id},
+            )
+            for e in employees
+        ],
+        options.concurrency,
+    )
+    clock_out = await closed_loop(
+        "clock_out_storm",
+        [
+            request(
+                client,
+                "POST",
+                f"/api/v1/time-tracking/clock-out/{e.id}",
+                e.token,
+                json={},
+            )
+            for e in employees
+        ],
+        options.concurrency,
+    )
+    return [clock_in, clock_out]
+
+
+async def screenshot_ingest(
+    client: httpx.AsyncClient, data: BenchData, options
+) -> List[ScenarioResult]:
+    """Steady stream of screenshot metadata uploads from the whole fleet"""
+    rng = random.Random(7)
+
+    def next_call() -> Call:
+        e = rng.choice(data.employees)
+        return request(
+            client,
+            "POST",
+            "/api/v1/screenshots/upload",
+            e.token,
+            json={
+                "employee_id": e.id,
+                "organization_id": e.organization_id,
+                "project_id": e.project_id,
+                "task_id": e.task_id,
+                "path": f"bench/{e.organization_id}/{e.id}/{rng.getrandbits(48)}.png",
+                "permission": True,
+                "os": "macOS 14",
+                "app": "Visual Studio Code",
+            },
+        )
+
+    return [
+        await open_loop(
+            "screenshot_ingest", next_call, options.ingest_rate, options.duration
+        )
+    ]
+
+
+async def admin_reports(
+    client: httpx.AsyncClient, data: BenchData, options
+) -> List[ScenarioResult]:
+    """Dashboard summaries, 30-day reports and screenshot galleries"""
+    from app.utils.utils import current_time
+
+    end = current_time()
+    start = end - timedelta(days=30)
+    dates = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+    employee_ids: Dict[str, List[str]] = {}
+    for e in data.employees:
+        employee_ids.setdefault(e.organization_id, []).append(e.id)
+
+    results = []
+    for name, build in (
+        (
+            "admin_summary",
+            lambda org, token: request(
+                client,
+                "GET",
+                "/api/v1/time-tracking/employees/summary",
+                token,
+                params={**dates, "size": 50},
+            ),
+        ),
+        (
+            "admin_report",
+            lambda org, token: request(
+                client,
+                "POST",
+                "/api/v1/time-tracking/report",
+                token,
+                json={**dates, "employee_ids": employee_ids.get(org, [])[:50]},
+            ),
+        ),
+        (
+            "admin_screenshots",
+            lambda org, token: request(
+                client,
+                "GET",
+                f"/api/v1/screenshots/organization/{org}/screenshots",
+                token,
+                params={"size": 50},
+            ),
+        ),
+    ):
+        admins = list(data.admins.items())
+        calls = [
+            build(*admins[i % len(admins)]) for i in range(options.report_requests)
+        ]
+        results.append(await closed_loop(name, calls, options.report_concurrency))
+    return results
+
+
+SCENARIOS = {
+    "clock_in_storm": morning_clock_in_storm,
+    "screenshot_ingest": screenshot_ingest,
+    "admin_reports": admin_reports,
+}
@@ -0,0 +1,172 @@
+"""Screenshot list pages: ORM objects vs projection rows.
+
+Fetches --pages pages of --size screenshots of the largest organization in
+the seeded benchmark database, the way the list endpoints do:
+
+- orm: select(Screenshot) plus selectin loads of its five relationships,
+  then a ScreenshotResponse model per row and a JSON dump of the page
+  (the list endpoints before projection rows)
+- projection: the list endpoints' prebuilt statement paging the screenshots
+  and joining the names onto that page, into ScreenshotRow objects
+  serialized straight to JSON
+
+Both count the matching screenshots first. Each page uses its own session,
+like a request. Timing and memory are measured in separate passes, since
+tracemalloc slows allocation down.
+
+    python -m benchmarks.screenshot_rows --embedded --pages 200 --size 100
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict
+from benchmarks.database import configure_environment
+
+
+async def orm_page(db, organization_id, skip, size) -> bytes:
+    from sqlalchemy import desc, func, select
+    from sqlalchemy.orm import selectinload
+    from app.models.screenshot import Screenshot
+    from app.schemas.screenshot import ScreenshotListResponse, ScreenshotResponse
+
+    query = select(Screenshot).where(Screenshot.organization_id == organization_id)
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    result = await db.execute(
+        query.order_by(desc(Screenshot.created_at))
+        .offset(skip)
+        .limit(size)
+        .options(
+            selectinload(Screenshot.employee),
+            selectinload(Screenshot.organization),
+            selectinload(Screenshot.time_tracking),
+            selectinload(Screenshot.project),
+            selectinload(Screenshot.task),
+        )
+    )
+    screenshots = [
+        ScreenshotResponse.model_validate(screenshot)
+        for screenshot in result.scalars().all()
+    ]
+    return (
+        ScreenshotListResponse(
+            screenshots=screenshots, total=total, page=1, size=len(screenshots)
+        )
+        .model_dump_json()
+        .encode()
+    )
+
+
+async def projection_page(db, organization_id, skip, size) -> bytes:
+    from pydantic_core import to_json
+    from app.schemas.screenshot import ScreenshotFilters
+    from app.services.screenshot_query import screenshot_query
+
+    rows, total = await screenshot_query.fetch(
+        db, "organization", organization_id, ScreenshotFilters(), skip, size
+    )
+    return to_json({"screenshots": rows, "total": total, "page": 1, "size": len(rows)})
+
+
+async def measure(fetch: Callable[..., Awaitable[bytes]], pages, trace: bool) -> Dict:
+    from app.db.database import AsyncSessionLocal
+
+    timings, peaks, rows = [], [], 0
+    for page in pages:
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            body = await fetch(db, *page)
+        elapsed = time.perf_counter() - started
+        if trace:
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        timings.append(elapsed)
+        rows += len(json.loads(body)["screenshots"])
+
+    if trace:
+        return {"peak_kb_per_page": round(statistics.median(peaks) / 1024, 1)}
+    return {
+        "rows_per_second": round(rows / sum(timings)),
+        "p50_ms_per_page": round(statistics.median(timings) * 1000, 2),
+        "p95_ms_per_page": round(statistics.quantiles(timings, n=20)[-1] * 1000, 2),
+    }
+
+
+async def run(options) -> Dict:
+    from sqlalchemy import func, select
+    from app.db.database import AsyncSessionLocal, engine
+    from app.models.screenshot import Screenshot
+
+    async with AsyncSessionLocal() as db:
+        organization_id = await db.scalar(
+            select(Screenshot.organization_id)
+            .group_by(Screenshot.organization_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+    if organization_id is None:
+        raise SystemExit("No screenshots; seed first: python -m benchmarks.run --seed")
+
+    pages = [
+        (organization_id, (page % options.distinct_pages) * options.size, options.size)
+        for page in range(options.pages)
+    ]
+
+    modes = {"orm": orm_page, "projection": projection_page}
+    results = {}
+    for name in options.modes.split(","):
+        name = name.strip()
+        # Warm the connection pool and statement caches
+        await measure(modes[name], pages[:5], trace=False)
+        results[name] = await measure(modes[name], pages, trace=False)
+        results[name].update(
+            await measure(modes[name], pages[: options.memory_pages], trace=True)
+        )
+        r = results[name]
+        print(
+            f"{name:11} {r['rows_per_second']:>7} rows/s  "
+            f"p50 {r['p50_ms_per_page']}ms  p95 {r['p95_ms_per_page']}ms  "
+            f"peak {r['peak_kb_per_page']}KB per page"
+        )
+    await engine.dispose()
+    return results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Screenshot list page cost")
+    parser.add_argument("--database-url")
+    parser.add_argument("--embedded", action="store_true")
+    parser.add_argument("--pgdata", default=".benchmarks/pgdata")
+    parser.add_argument("--database", default="momentum_bench")
+    parser.add_argument("--modes", default="orm,projection")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--size", type=int, default=100, help="rows per page")
+    parser.add_argument(
+        "--distinct-pages", type=int, default=20, help="cycle over this many pages"
+    )
+    parser.add_argument("--memory-pages", type=int, default=20)
+    parser.add_argument("--output", help="also write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    options = parse_args(argv)
+    configure_environment(
+        options.database_url, options.embedded, options.pgdata, options.database
+    )
+    results = asyncio.run(run(options))
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump({"options": vars(options), "results": results}, f, indent=2)
+        print(f"\nResults written to {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""Bulk seeder for benchmark data.
+
+Rows are generated deterministically from --random-seed and written with COPY
+in chunks, so millions of screenshot rows load in minutes and memory stays flat.
+Every row is completed from the model's column defaults, so the seeder keeps
+working as columns are added.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+SCALES = {
+    # orgs, employees/org, projects/org, tasks/project, days, screenshots/hour
+    "tiny": (1, 20, 3, 3, 14, 4),
+    "small": (2, 100, 5, 4, 60, 6),
+    "medium": (5, 400, 10, 5, 90, 6),
+    "large": (10, 1000, 20, 6, 120, 6),
+}
+
+BENCH_PASSWORD = "Benchmark1!"
+EMAIL_DOMAIN = "bench.momentum.dev"
+APPS = [
+    "Google Chrome",
+    "Visual Studio Code",
+    "Slack",
+    "Figma",
+    "Terminal",
+    "Microsoft Excel",
+    "Zoom",
+    "Notion",
+]
+OPERATING_SYSTEMS = ["macOS 14", "Windows 11", "Ubuntu 22.04"]
+CHUNK_ROWS = 50000
+# Parents before children, so a chunk never references rows still in a buffer
+FLUSH_ORDER = [
+    "users",
+    "organizations",
+    "projects",
+    "tasks",
+    "employees",
+    "project_employees",
+    "task_employees",
+    "time_tracking",
+    "screenshots",
+]
+
+
+@dataclass
+class SeedConfig:
+    organizations: int
+    employees_per_org: int
+    projects_per_org: int
+    tasks_per_project: int
+    days: int
+    screenshots_per_hour: int
+    random_seed: int = 42
+
+    @classmethod
+    def from_scale(cls, scale: str, random_seed: int = 42) -> "SeedConfig":
+        return cls(*SCALES[scale], random_seed=random_seed)
+
+
+@dataclass
+class SeedSummary:
+    rows: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def complete_row(table, row: Dict[str, Any], now: datetime) -> tuple:
+    """Fill columns missing from `row` from their Python-side defaults, in table order"""
+    values = []
+    for column in table.columns:
+        if column.name in row:
+            values.append(row[column.name])
+            continue
+        default = column.default
+        if default is None:
+            values.append(None)
+        elif default.is_callable:
+            values.append(default.arg(None))
+        elif default.is_clause_element:
+            values.append(now)  # func.now() and friends
+        else:
+            values.append(default.arg)
+    return tuple(values)
+
+
+class Seeder:
+    def __init__(self, connection, config: SeedConfig):
+        # connection is a raw asyncpg connection
+        self.connection = connection
+        self.config = config
+        self.random = random.Random(config.random_seed)
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.summary = SeedSummary()
+        self._buffers: Dict[str, List[tuple]] = {}
+        self._tables: Dict[str, Any] = {}
+
+    async def copy(self, table, rows: Iterable[Dict[str, Any]]) -> None:
+        self._tables[table.name] = table
+        buffer = self._buffers.setdefault(table.name, [])
+        for row in rows:
+            buffer.append(complete_row(table, row, self.now))
+            if len(buffer) >= CHUNK_ROWS:
+                await self.flush(table.name)
+
+    async def flush(self, table_name: Optional[str] = None) -> None:
+        """COPY buffered rows of `table_name` and every table it depends on"""
+        last = FLUSH_ORDER.index(table_name) if table_name else len(FLUSH_ORDER) - 1
+        for name in FLUSH_ORDER[: last + 1]:
+            buffer = self._buffers.get(name)
+            if not buffer:
+                continue
+            table = self._tables[name]
+            await self.connection.copy_records_to_table(
+                name, records=buffer, columns=[c.name for c in table.columns]
+            )
+            self.summary.rows[name] = self.summary.rows.get(name, 0) + len(buffer)
+            buffer.clear()
+
+    async def run(self, hashed_password: str) -> SeedSummary:
+        from app.models import (
+            Employee,
+            Organization,
+            Project,
+            Screenshot,
+            Task,
+            TimeTracking,
+            User,
+            UserRole,
+        )
+        from app.models.project import project_employees
+        from app.models.task import task_employees
+        from app.utils.ids import new_id
+
+        started = time.perf_counter()
+        config = self.config
+
+        for o in range(config.organizations):
+            admin_id = new_id(self.now)
+            await self.copy(
+                User.__table__,
+                [
+                    {
+                        "id": admin_id,
+                        "name": f"Bench Admin {o}",
+                        "email": f"admin{o}@{EMAIL_DOMAIN}",
+                        "hashed_password": hashed_password,
+                        "is_active": True,
+                        "email_verified": True,
+                        "role": UserRole.ADMIN.name,
+                    }
+                ],
+            )
+
+            organization_id = new_id(self.now)
+            await self.copy(
+                Organization.__table__,
+                [
+                    {
+                        "id": organization_id,
+                        "name": f"Bench Org {o}",
+                        "domain": f"org{o}.{EMAIL_DOMAIN}",
+                        "created_by": admin_id,
+                    }
+                ],
+            )
+
+            projects = []
+            for p in range(config.projects_per_org):
+                project_id = new_id(self.now)
+                task_ids = [new_id(self.now) for _ in range(config.tasks_per_project)]
+                projects.append((project_id, task_ids))
+                await self.copy(
+                    Project.__table__,
+                    [
+                        {
+                            "id": project_id,
+                            "name": f"Project {o}-{p}",
+                            "code": f"B{o}-P{p}",
+                            "organization_id": organization_id,
+                        }
+                    ],
+                )
+                await self.copy(
+                    Task.__table__,
+                    [
+                        {
+                            "id": task_id,
+                            "name": f"Task {o}-{p}-{t}",
+                            "code": f"T{t}",
+                            "project_id": project_id,
+                            "is_default": t == 0,
+                        }
+                        for t, task_id in enumerate(task_ids)
+                    ],
+                )
+
+            for e in range(config.employees_per_org):
+                employee_id = new_id(self.now)
+                await self.copy(
+                    Employee.__table__,
+                    [
+                        {
+                            "id": employee_id,
+                            "name": f"Bench Employee {o}-{e}",
+                            "email": f"emp{o}-{e}@{EMAIL_DOMAIN}",
+                            "hashed_password": hashed_password,
+                            "organization_id": organization_id,
+                            "email_verified": True,
+                        }
+                    ],
+                )
+
+                assigned = self.random.sample(projects, k=min(2, len(projects)))
+                await self.copy(
+                    project_employees,
+                    [
+                        {"project_id": project_id, "employee_id": employee_id}
+                        for project_id, _ in assigned
+                    ],
+                )
+                await self.copy(
+                    task_employees,
+                    [
+                        {"task_id": task_id, "employee_id": employee_id}
+                        for _, task_ids in assigned
+                        for task_id in task_ids
+                    ],
+                )
+                await self._seed_activity(
+                    TimeTracking.__table__,
+                    Screenshot.__table__,
+                    organization_id,
+                    employee_id,
+                    assigned,
+                )
+
+        await self.flush()
+        await self.connection.execute("ANALYZE")
+        self.summary.seconds = time.perf_counter() - started
+        return self.summary
+
+    async def _seed_activity(
+        self, time_table, screenshot_table, organization_id, employee_id, assigned
+    ) -> None:
+        """Workday sessions for the last `days` days plus their screenshots"""
+        from app.utils.ids import new_id
+
+        config = self.config
+        today = self.now.replace(hour=0, minute=0, second=0)
+        screenshot_gap = 60 / max(config.screenshots_per_hour, 1)
+        os_name = self.random.choice(OPERATING_SYSTEMS)
+
+        for day in range(config.days, 0, -1):
+            date = today - timedelta(days=day)
+            if date.weekday() >= 5:
+                continue
+
+            start = date + timedelta(hours=8, minutes=self.random.randint(0, 90))
+            for _ in range(self.random.randint(1, 3)):
+                project_id, task_ids = self.random.choice(assigned)
+                task_id = self.random.choice(task_ids)
+                minutes = self.random.randint(60, 240)
+                breaks = self.random.choice([0, 0, 10, 15, 30])
+                clock_in = start
+                clock_out = clock_in + timedelta(minutes=minutes)
+                worked = minutes - breaks
+                session_id = new_id(clock_in)
+
+                await self.copy(
+                    time_table,
+                    [
+                        {
+                            "id": session_id,
+                            "employee_id": employee_id,
+                            "project_id": project_id,
+                            "task_id": task_id,
+                            "clock_in": clock_in,
+                            "clock_out": clock_out,
+                            "total_minutes": worked,
+                            "total_hours": round(worked / 60, 2),
+                            "break_duration_minutes": breaks or None,
+                            "created_at": clock_in,
+                            "updated_at": clock_out,
+                        }
+                    ],
+                )
+
+                shots = []
+                at = clock_in + timedelta(
+                    minutes=self.random.uniform(0, screenshot_gap)
+                )
+                while at < clock_out:
+                    shots.append(
+                        {
+                            "id": new_id(at),
+                            "employee_id": employee_id,
+                            "organization_id": organization_id,
+                            "tracking_id": session_id,
+                            "project_id": project_id,
+                            "task_id": task_id,
+                            "path": f"bench/{organization_id}/{employee_id}/{int(at.timestamp())}.png",
+                            "permission": True,
+                            "os": os_name,
+                            "app": self.random.choice(APPS),
+                            "created_at": at,
+                            "updated_at": at,
+                        }
+                    )
+                    at += timedelta(minutes=screenshot_gap)
+                await self.copy(screenshot_table, shots)
+
+                start = clock_out + timedelta(minutes=self.random.randint(15, 60))
+
+
+async def reset_schema() -> None:
+    """Drop and recreate every table through the app's own metadata"""
+    from app.db.database import Base, engine, init_db
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await init_db()
+
+
+async def seed(config: SeedConfig, reset: bool = True) -> SeedSummary:
+    from app.core.security import Security
+    from app.db.database import engine
+    from app.db.partitions import ensure_months
+
+    if reset:
+        await reset_schema()
+
+    # Monthly partitions for the whole seeded range, so COPY doesn't pile
+    # history into the default partitions
+    now = datetime.now(timezone.utc)
+    async with engine.begin() as conn:
+        await ensure_months(conn, now - timedelta(days=config.days + 1), now)
+
+    hashed_password = Security.get_password_hash(BENCH_PASSWORD)
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        seeder = Seeder(raw.driver_connection, config)
+        return await seeder.run(hashed_password)
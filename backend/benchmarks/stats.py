@@ -0,0 +1,97 @@
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    throughput_rps: float = 0.0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    status_codes: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_samples(
+        cls,
+        name: str,
+        latencies: List[float],
+        statuses: List[int],
+        seconds: float,
+    ) -> "ScenarioResult":
+        ordered = sorted(latencies)
+        codes: Dict[str, int] = {}
+        for status in statuses:
+            codes[str(status)] = codes.get(str(status), 0) + 1
+        return cls(
+            name=name,
+            requests=len(ordered),
+            errors=sum(1 for status in statuses if status >= 400),
+            seconds=round(seconds, 3),
+            throughput_rps=round(len(ordered) / seconds, 2) if seconds else 0.0,
+            p50_ms=round(percentile(ordered, 0.50) * 1000, 2),
+            p95_ms=round(percentile(ordered, 0.95) * 1000, 2),
+            p99_ms=round(percentile(ordered, 0.99) * 1000, 2),
+            max_ms=round((ordered[-1] if ordered else 0.0) * 1000, 2),
+            status_codes=codes,
+        )
+
+
+def write_results(path: str, meta: dict, results: List[ScenarioResult]) -> None:
+    with open(path, "w") as f:
+        json.dump(
+            {"meta": meta, "scenarios": {r.name: asdict(r) for r in results}},
+            f,
+            indent=2,
+        )
+
+
+def compare(
+    baseline_path: str, results: List[ScenarioResult], threshold: float
+) -> List[str]:
+    """Print a comparison with a saved baseline and return the regressions.
+
+    A scenario regresses when p95 latency grows or throughput drops by more
+    than `threshold` (0.2 = 20%).
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["scenarios"]
+
+    regressions = []
+    print(f"\n{'scenario':<24}{'p95 ms':>22}{'throughput rps':>26}")
+    for result in results:
+        before: Optional[dict] = baseline.get(result.name)
+        if before is None:
+            print(f"{result.name:<24}{'(new)':>22}")
+            continue
+
+        p95_change = _change(before["p95_ms"], result.p95_ms)
+        rps_change = _change(before["throughput_rps"], result.throughput_rps)
+        print(
+            f"{result.name:<24}"
+            f"{before['p95_ms']:>9.1f} → {result.p95_ms:<7.1f}{p95_change:>+6.0%}"
+            f"{before['throughput_rps']:>11.1f} → {result.throughput_rps:<7.1f}"
+            f"{rps_change:>+6.0%}"
+        )
+        if p95_change > threshold or rps_change < -threshold:
+            regressions.append(result.name)
+    return regressions
+
+
+def _change(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import insert
+from app.models.employee import Employee
+from app.models.organization import Organization
+from app.models.project import Project, project_employees
+
+
+async def add_projects(db, organization, count: int, employees_each: int) -> None:
+    for i in range(count):
+        project = Project(
+            name=f"Project {i}",
+            code=f"{organization.domain}-{i}",
+            organization_id=organization.id,
+        )
+        db.add(project)
+        await db.flush()
+        for j in range(employees_each):
+            employee = Employee(
+                name=f"Employee {i}-{j}",
+                email=f"e{i}-{j}@{organization.domain}",
+                hashed_password="x",
+                organization_id=organization.id,
+            )
+            db.add(employee)
+            await db.flush()
+            await db.execute(
+                insert(project_employees).values(
+                    project_id=project.id, employee_id=employee.id
+                )
+            )
+    await db.commit()
+
+
+async def add_organization(db, admin, domain: str) -> Organization:
+    organization = Organization(name=domain, domain=domain, created_by=admin.id)
+    db.add(organization)
+    await db.commit()
+    return organization
+
+
+@pytest.mark.asyncio
+async def test_organization_projects_queries_do_not_grow_with_rows(
+    db, client, admin, admin_headers, query_budget
+):
+    small = await add_organization(db, admin, "small.example.com")
+    large = await add_organization(db, admin, "large.example.com")
+    await add_projects(db, small, count=1, employees_each=1)
+    await add_projects(db, large, count=10, employees_each=5)
+
+    counts = {}
+    for organization in (small, large):
+        with query_budget(max_queries=10, max_repeats=1) as stats:
+            response = await client.get(
+                f"/api/v1/projects/organization/{organization.id}?size=100",
+                headers=admin_headers,
+            )
+        assert response.status_code == 200
+        counts[organization.domain] = stats.count
+
+    data = response.json()["data"]
+    assert data["total"] == 10
+    assert all(
+        employee["assigned_at"]
+        for project in data["projects"]
+        for employee in project["employees"]
+    )
+    # One query per kind of data, not per project or employee
+    assert counts["large.example.com"] == counts["small.example.com"]